@@ -7,3 +7,7 @@ class MyappConfig(AppConfig):
     """Configuração do aplicativo 'app'."""
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        """Registra os receivers de sinais do app."""
+        from . import signals # pylint: disable=import-outside-toplevel, unused-import
@@ -0,0 +1,107 @@
+"""Mineração de produtos comprados juntos (co-ocorrência e lift) nos pedidos aprovados."""
+
+from itertools import groupby
+
+import numpy as np
+from scipy import sparse
+from django.db import transaction
+
+from .models import Produto, ProdutoAssociacao, ProdutoCarrinho
+from .sales import APPROVED_STATUSES
+
+# Carrinhos por bloco da matriz esparsa carrinho x produto.
+CHUNK_SIZE = 10000
+TOP_K = 10
+# Pares vistos em menos pedidos que isso são descartados como ruído.
+MIN_OCCURRENCES = 2
+
+
+def iter_baskets(chunk_size):
+    """
+    Percorre os itens dos pedidos aprovados ordenados por carrinho, gerando listas de
+    até 'chunk_size' cestas (listas de ids de produto) sem carregar a tabela inteira.
+    """
+    lines = (
+        ProdutoCarrinho.objects # pylint: disable=no-member
+        .filter(id_carrinho__pedido__status__in=APPROVED_STATUSES)
+        .order_by('id_carrinho', 'id_produto')
+        .values_list('id_carrinho', 'id_produto')
+        .distinct()
+        .iterator(chunk_size=chunk_size)
+    )
+    chunk = []
+    for _, rows in groupby(lines, key=lambda row: row[0]):
+        chunk.append([produto for _, produto in rows])
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def cooccurrence(chunks, columns):
+    """
+    Soma B.T @ B sobre os blocos, onde B é a matriz binária cesta x produto do bloco.
+    Retorna a matriz de co-ocorrência (a diagonal é o suporte de cada produto) e o
+    número de cestas.
+    """
+    size = len(columns)
+    total = sparse.csr_matrix((size, size), dtype=np.int64)
+    baskets = 0
+    for chunk in chunks:
+        rows, cols = [], []
+        for i, basket in enumerate(chunk):
+            known = [columns[p] for p in basket if p in columns]
+            rows.extend([i] * len(known))
+            cols.extend(known)
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, cols)), shape=(len(chunk), size)
+        )
+        total = total + (matrix.T @ matrix).tocsr()
+        baskets += len(chunk)
+    return total, baskets
+
+
+def top_associations(counts, baskets, ids, top_k=TOP_K, min_occurrences=MIN_OCCURRENCES):
+    """
+    Calcula lift e confiança de todos os pares da matriz de uma vez e gera
+    (produto, associado, ocorrencias, lift, confianca) com os 'top_k' maiores lifts
+    de cada produto.
+    """
+    counts = counts.tocoo()
+    support = counts.diagonal().astype(np.float64)
+    keep = (counts.row != counts.col) & (counts.data >= min_occurrences)
+    row, col, data = counts.row[keep], counts.col[keep], counts.data[keep].astype(np.float64)
+    confidence = data / support[row]
+    lift = confidence * baskets / support[col]
+
+    # Ordena por produto, lift decrescente, ocorrências decrescentes e id do associado.
+    order = np.lexsort((col, -data, -lift, row))
+    row, col, data, lift, confidence = (a[order] for a in (row, col, data, lift, confidence))
+    starts = np.flatnonzero(np.r_[True, row[1:] != row[:-1]]) if len(row) else []
+    for start, end in zip(starts, list(starts[1:]) + [len(row)]):
+        for i in range(start, min(end, start + top_k)):
+            yield ids[row[i]], ids[col[i]], int(data[i]), float(lift[i]), float(confidence[i])
+
+
+def mine_associations(chunk_size=CHUNK_SIZE, top_k=TOP_K, min_occurrences=MIN_OCCURRENCES):
+    """
+    Recalcula a tabela produto_associacao a partir dos pedidos aprovados.
+    Retorna (número de cestas, número de associações gravadas).
+    """
+    ids = list(Produto.objects.order_by('id').values_list('id', flat=True)) # pylint: disable=no-member
+    columns = {pid: i for i, pid in enumerate(ids)}
+    counts, baskets = cooccurrence(iter_baskets(chunk_size), columns)
+
+    associacoes = [
+        ProdutoAssociacao(
+            produto_id=produto, associado_id=associado,
+            ocorrencias=ocorrencias, lift=lift, confianca=confianca,
+        )
+        for produto, associado, ocorrencias, lift, confianca
+        in top_associations(counts, baskets, ids, top_k, min_occurrences)
+    ]
+    with transaction.atomic():
+        ProdutoAssociacao.objects.all().delete() # pylint: disable=no-member
+        ProdutoAssociacao.objects.bulk_create(associacoes, batch_size=1000) # pylint: disable=no-member
+    return baskets, len(associacoes)
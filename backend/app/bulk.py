@@ -0,0 +1,251 @@
+"""Importação e exportação em lote de produtos (CSV e NDJSON), em streaming."""
+
+import csv
+import io
+import json
+import os
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, BigIntegerField, Value, When
+from django.utils import timezone
+
+from .models import Produto
+from .serializers import ProductListSerializer
+from .signals import catalog_changed
+
+FIELDS = [
+    'id', 'titulo', 'descricao', 'categoria', 'preco', 'quantidade',
+    'material', 'cor_padrao', 'altura', 'comprimento', 'largura',
+]
+FORMATS = ('csv', 'ndjson')
+CHUNK_SIZE = 1000
+# Quantidade máxima de erros detalhados no relatório; os demais são apenas contados.
+MAX_REPORTED_ERRORS = 1000
+
+
+class ProductImportSerializer(ProductListSerializer):
+    """Valida uma linha de importação com as mesmas regras do cadastro, sem imagem."""
+
+    imagens = None
+    imagem = None
+
+    class Meta(ProductListSerializer.Meta):
+        fields = [f for f in FIELDS if f != 'id']
+
+
+def detect_format(filename, default='csv'):
+    """Descobre o formato pela extensão do arquivo ('.ndjson'/'.jsonl' ou '.csv')."""
+    ext = os.path.splitext(filename or '')[1].lower()
+    if ext in ('.ndjson', '.jsonl'):
+        return 'ndjson'
+    if ext == '.csv':
+        return 'csv'
+    return default
+
+
+class UnreadableFile(Exception):
+    """O restante do arquivo não pode ser lido (codificação inválida ou CSV malformado)."""
+
+    def __init__(self, line, message):
+        super().__init__(message)
+        self.line = line
+
+
+def iter_rows(binary_file, fmt):
+    """
+    Lê o arquivo linha a linha, sem carregá-lo inteiro, gerando (número, dict).
+    Se o arquivo não for UTF-8 ou o CSV estiver malformado, gera por último
+    (número, UnreadableFile) e para a leitura.
+    """
+    text = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+    number = 1
+    try:
+        if fmt == 'csv':
+            reader = csv.DictReader(text)
+            for row in reader:
+                number = reader.line_num
+                # Células vazias são tratadas como colunas não enviadas.
+                yield number, {k: v for k, v in row.items() if k and v not in (None, '')}
+        else:
+            for number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    yield number, None
+                    continue
+                yield number, row if isinstance(row, dict) else None
+    except UnicodeDecodeError:
+        yield number, UnreadableFile(
+            number, 'O arquivo deve estar em UTF-8; a leitura parou neste ponto.'
+        )
+    except csv.Error as exc:
+        yield number, UnreadableFile(number, f'CSV malformado: {exc}.')
+
+
+class ImportReport:
+    """Contadores e erros por linha de uma importação."""
+
+    def __init__(self):
+        self.criados = 0
+        self.atualizados = 0
+        self.total_erros = 0
+        self.erros = []
+
+    def add_error(self, line, errors):
+        """Registra o erro de uma linha, guardando no máximo MAX_REPORTED_ERRORS."""
+        self.total_erros += 1
+        if len(self.erros) < MAX_REPORTED_ERRORS:
+            self.erros.append({'linha': line, 'erros': errors})
+
+    def as_dict(self):
+        """Relatório serializável em JSON."""
+        return {
+            'criados': self.criados,
+            'atualizados': self.atualizados,
+            'total_erros': self.total_erros,
+            'erros': self.erros,
+        }
+
+
+def _parse_id(value):
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return False
+
+
+def _write_chunk(chunk, report):
+    """
+    Grava um lote: linhas com 'id' atualizam só as colunas enviadas do produto
+    existente, as demais criam um novo produto.
+    """
+    ids = [pid for _, pid, _ in chunk if pid is not None]
+    existing = Produto.objects.in_bulk(ids) if ids else {} # pylint: disable=no-member
+
+    now = timezone.now()
+    to_create, to_update, update_fields = [], [], {'atualizado_em'}
+    for line, pid, data in chunk:
+        if pid is None:
+            to_create.append(Produto(**data))
+        elif pid in existing:
+            produto = existing[pid]
+            for field, value in data.items():
+                setattr(produto, field, value)
+            produto.atualizado_em = now
+            update_fields.update(data)
+            to_update.append(produto)
+        else:
+            report.add_error(line, {'id': [f'Produto {pid} não encontrado.']})
+
+    with transaction.atomic():
+        if to_create:
+            Produto.objects.bulk_create(to_create, batch_size=CHUNK_SIZE) # pylint: disable=no-member
+        if to_update:
+            Produto.objects.bulk_update( # pylint: disable=no-member
+                to_update, sorted(update_fields), batch_size=CHUNK_SIZE
+            )
+    report.criados += len(to_create)
+    report.atualizados += len(to_update)
+
+
+def import_products(binary_file, fmt, chunk_size=CHUNK_SIZE):
+    """
+    Importa produtos de um arquivo CSV ou NDJSON em lotes de 'chunk_size' linhas,
+    validando cada linha com as regras do ProductListSerializer. Linhas com 'id'
+    são atualizações parciais. Linhas inválidas entram no relatório e não impedem
+    a gravação das demais; um arquivo que deixa de ser legível (codificação ou CSV
+    malformado) encerra a importação com um erro 'arquivo' no relatório, mantendo
+    os lotes já gravados.
+    """
+    report = ImportReport()
+    rows = iter_rows(binary_file, fmt)
+    while True:
+        batch = list(islice(rows, chunk_size))
+        if not batch:
+            break
+
+        chunk = []
+        for line, row in batch:
+            if isinstance(row, UnreadableFile):
+                report.add_error(line, {'arquivo': [str(row)]})
+                continue
+            if row is None:
+                report.add_error(line, {'linha': ['JSON inválido.']})
+                continue
+            pid = _parse_id(row.pop('id', None))
+            if pid is False:
+                report.add_error(line, {'id': ['O id deve ser um número inteiro.']})
+                continue
+            serializer = ProductImportSerializer(data=row, partial=pid is not None)
+            if not serializer.is_valid():
+                report.add_error(line, serializer.errors)
+                continue
+            chunk.append((line, pid, serializer.validated_data))
+
+        if chunk:
+            _write_chunk(chunk, report)
+
+    if report.criados or report.atualizados:
+        catalog_changed()
+    return report
+
+
+class MissingProducts(Exception):
+    """Alguns ids do lote não existem; a transação foi desfeita."""
+
+    def __init__(self, ids):
+        super().__init__(ids)
+        self.ids = ids
+
+
+def update_prices_and_stock(items):
+    """
+    Aplica preço e/ou quantidade de vários produtos com um único UPDATE,
+    usando CASE WHEN por id e mantendo o valor atual onde o campo não foi enviado.
+    Se algum id não existir, nada é gravado e MissingProducts é lançada.
+    """
+    if not items:
+        return 0
+    ids = [item['id'] for item in items]
+    changes = {'atualizado_em': timezone.now()}
+    for field, output_field in (('preco', FloatField()), ('quantidade', BigIntegerField())):
+        whens = [When(pk=item['id'], then=Value(item[field])) for item in items if field in item]
+        if whens:
+            changes[field] = Case(*whens, default=F(field), output_field=output_field)
+
+    with transaction.atomic():
+        updated = Produto.objects.filter(pk__in=ids).update(**changes) # pylint: disable=no-member
+        if updated != len(ids):
+            found = set(
+                Produto.objects.filter(pk__in=ids).values_list('pk', flat=True) # pylint: disable=no-member
+            )
+            raise MissingProducts([pid for pid in ids if pid not in found])
+
+    catalog_changed()
+    return updated
+
+
+class _Echo:
+    """Pseudo-buffer que devolve o que o csv.writer escreveria."""
+
+    def write(self, value):
+        """Retorna o valor em vez de guardá-lo."""
+        return value
+
+
+def export_products(fmt, chunk_size=2000):
+    """Gera o catálogo em CSV ou NDJSON, uma linha por vez, lendo o banco em lotes."""
+    rows = Produto.objects.order_by('id').values_list(*FIELDS) # pylint: disable=no-member
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(FIELDS)
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield writer.writerow(['' if v is None else v for v in row])
+    else:
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + '\n'
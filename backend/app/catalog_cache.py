@@ -0,0 +1,199 @@
+"""Cache read-through do catálogo, versionado por uma versão global do catálogo."""
+
+import hashlib
+import threading
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from rest_framework.response import Response
+
+from .conditional import ConditionalGetMixin, not_modified_response, set_validator_headers
+from .models import VersaoCatalogo
+
+CACHE_TIMEOUT = 60 * 60
+GENERATION_KEY = 'catalogo:geracao'
+HITS_KEY = 'catalogo:hits'
+MISSES_KEY = 'catalogo:misses'
+VERSION_ID = 1
+
+
+def catalog_version():
+    """
+    Versão atual do catálogo, guardada no banco (VersaoCatalogo): muda a cada escrita
+    confirmada em produtos ou imagens, seja qual for o processo que escreveu.
+    """
+    version = VersaoCatalogo.objects.filter( # pylint: disable=no-member
+        pk=VERSION_ID
+    ).values_list('valor', flat=True).first()
+    return version or 0
+
+
+def cache_namespace():
+    """
+    Prefixo das chaves do cache do catálogo: a versão do banco e a geração local, que
+    muda já na escrita, antes do commit, e só vale para o processo que escreveu.
+    """
+    return f'{catalog_version()}.{cache.get_or_set(GENERATION_KEY, 1, None)}'
+
+
+def _incr(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # A chave expirou ou ainda não existe (incr não cria chaves).
+        cache.add(key, 0, None)
+        return cache.incr(key)
+
+
+def _next_version():
+    """Incrementa a versão no banco e retorna o valor gravado por este incremento."""
+    with transaction.atomic():
+        versions = VersaoCatalogo.objects.filter(pk=VERSION_ID) # pylint: disable=no-member
+        if not versions.update(valor=F('valor') + 1):
+            VersaoCatalogo.objects.get_or_create(pk=VERSION_ID) # pylint: disable=no-member
+        # A linha fica travada pelo UPDATE até o fim do bloco, então a leitura vê o próprio incremento.
+        return catalog_version()
+
+
+def bump_catalog_version(indexes=()):
+    """
+    Invalida tudo o que está em cache para o catálogo trocando a versão.
+
+    A geração local muda imediatamente, para que o próprio processo não sirva o cache
+    antigo durante a transação. A versão do banco, que vale para todos os processos,
+    muda uma vez, logo ou após o commit: incrementá-la dentro da transação travaria a
+    linha até o commit e um leitor concorrente ainda não veria a escrita.
+
+    'indexes' são pares (VersionedIndex, change) que acompanham a escrita: cada
+    índice segue a versão do banco e 'change' (ou None) só é aplicada quando a
+    escrita fica visível. Se a transação for desfeita, o índice continua refletindo
+    o banco sem a mudança.
+    """
+    _incr(GENERATION_KEY)
+
+    def committed():
+        version = _next_version()
+        for index, change in indexes:
+            index.advance(version, change)
+
+    transaction.on_commit(committed)
+
+
+class VersionedIndex:
+    """
+    Base para índices em memória derivados do catálogo.
+
+    O índice é montado uma vez por processo, na primeira consulta, e guarda a versão
+    do catálogo que reflete. Os sinais de Produto passam o índice e a mudança para
+    'bump_catalog_version', que chama 'advance' quando a versão do banco é
+    incrementada; se o índice não estava na versão anterior (escrita em outro
+    processo ou em lote) ele é remontado na próxima consulta.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._version = None
+
+    def _build(self):
+        """Monta o índice a partir do banco."""
+        raise NotImplementedError
+
+    def invalidate(self):
+        """Descarta o índice; ele será remontado na próxima consulta."""
+        with self._lock:
+            self._built = False
+
+    def ensure_current(self):
+        """Monta o índice se ele ainda não existe ou está numa versão antiga."""
+        with self._lock:
+            version = catalog_version()
+            if not self._built or self._version != version:
+                self._build()
+                self._built = True
+                self._version = version
+
+    def advance(self, version, change=None):
+        """
+        Acompanha uma escrita no catálogo. 'version' é a versão já incrementada por
+        ela; se o índice estava na versão anterior, 'change' é aplicada nele, senão
+        o índice é descartado. 'change' pode chamar 'invalidate' se não conseguir
+        aplicar a mudança.
+        """
+        with self._lock:
+            if not self._built:
+                return
+            if self._version != version - 1:
+                self._built = False
+                return
+            self._version = version
+            if change is not None:
+                change()
+
+
+def request_cache_key(prefix, request, **kwargs):
+    """Chave para a requisição: versão, rota, argumentos e query string normalizada."""
+    query = urlencode(sorted(
+        (k, v) for k in request.query_params for v in request.query_params.getlist(k)
+    ))
+    raw = '|'.join([
+        request.get_host(), request.path, query,
+        urlencode(sorted(kwargs.items())), request.accepted_renderer.format or '',
+    ])
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    return f'catalogo:{cache_namespace()}:{prefix}:{digest}'
+
+
+def cache_stats():
+    """Contadores de acertos e faltas do cache do catálogo."""
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'versao': catalog_version(),
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
+
+
+class CatalogCacheMixin(ConditionalGetMixin):
+    """
+    Mixin para views do catálogo que guarda em cache o resultado já serializado
+    das requisições GET, junto com o ETag e o Last-Modified. Os dados não dependem
+    do usuário, então a mesma entrada atende visitantes anônimos e autenticados.
+    """
+
+    cache_prefix = None
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        """
+        Responde 304 ou o 'response.data' do cache; numa falta calcula os validadores,
+        executa 'handler' e guarda o resultado.
+        """
+        key = request_cache_key(self.cache_prefix, request, **kwargs)
+        entry = cache.get(key)
+        hit = entry is not None
+        if entry is None:
+            etag, last_modified = self.get_validators(request)
+            entry = {'etag': etag, 'last_modified': last_modified}
+            cache.set(key, entry, CACHE_TIMEOUT)
+
+        response = not_modified_response(request, entry['etag'], entry['last_modified'])
+        if response is None:
+            if 'data' in entry:
+                response = Response(entry['data'])
+            else:
+                hit = False
+                response = handler(request, *args, **kwargs)
+                if response.status_code == 200:
+                    entry['data'] = response.data
+                    cache.set(key, entry, CACHE_TIMEOUT)
+            if response.status_code == 200:
+                set_validator_headers(response, entry['etag'], entry['last_modified'])
+
+        _incr(HITS_KEY if hit else MISSES_KEY)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
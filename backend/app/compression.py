@@ -0,0 +1,114 @@
+"""Compressão Brotli/gzip das respostas, reaproveitando os bytes das respostas com ETag."""
+
+import gzip
+import hashlib
+
+import brotli
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+# Respostas menores que isso não compensam a compressão.
+MIN_SIZE = 1024
+CACHE_TIMEOUT = 60 * 60
+# Níveis altos são aceitáveis porque cada representação é comprimida uma única vez.
+BROTLI_QUALITY = 9
+GZIP_LEVEL = 9
+# Mesmo padding aleatório do GZipMiddleware do Django contra ataques BREACH.
+MAX_RANDOM_BYTES = 100
+
+
+def accepted_encodings(header):
+    """Codificações aceitas no Accept-Encoding (as com q=0 ficam de fora)."""
+    accepted = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name and quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def compress(content, encoding):
+    """Comprime 'content' com a codificação informada ('br' ou 'gzip')."""
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Comprime respostas JSON e de texto conforme o Accept-Encoding.
+
+    Respostas 200 de GET/HEAD que têm ETag (as rotas do catálogo e de pedidos) são
+    comprimidas em Brotli ou gzip uma vez e guardadas no cache pelo hash do próprio
+    corpo e pela codificação: enquanto o corpo não muda, as próximas requisições
+    reutilizam os mesmos bytes, mesmo em rotas cujo ETag não cobre todo o corpo.
+    As demais respostas recebem gzip na hora, como no GZipMiddleware do Django.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+        if response.streaming:
+            if 'gzip' not in accepted or response.is_async:
+                return response
+            response.streaming_content = compress_sequence(
+                response.streaming_content, max_random_bytes=MAX_RANDOM_BYTES
+            )
+            del response.headers['Content-Length']
+            return self._mark(response, 'gzip')
+
+        if (request.method in ('GET', 'HEAD') and response.status_code == 200
+                and response.has_header('ETag') and accepted & {'br', 'gzip'}):
+            encoding = 'br' if 'br' in accepted else 'gzip'
+            body, hit = self._cached(response, encoding)
+            response['X-Compression-Cache'] = 'HIT' if hit else 'MISS'
+        elif 'gzip' in accepted:
+            encoding = 'gzip'
+            body = compress_string(response.content, max_random_bytes=MAX_RANDOM_BYTES)
+        else:
+            return response
+
+        if len(body) >= len(response.content):
+            return response
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        return self._mark(response, encoding)
+
+    def _cached(self, response, encoding):
+        """Bytes comprimidos da representação, do cache ou comprimidos agora."""
+        # A chave é o conteúdo, não o ETag: calcular o hash custa bem menos que comprimir.
+        digest = hashlib.sha256(response.content).hexdigest()
+        key = f'comprimido:{encoding}:{digest}'
+        body = cache.get(key)
+        if body is not None:
+            return body, True
+        body = compress(response.content, encoding)
+        cache.set(key, body, CACHE_TIMEOUT)
+        return body, False
+
+    def _mark(self, response, encoding):
+        # O corpo muda com a codificação, então um ETag forte passa a ser fraco.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,89 @@
+"""Suporte a GET condicional (ETag / Last-Modified) calculado a partir de agregações."""
+
+import hashlib
+from urllib.parse import urlencode
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def set_validator_headers(response, etag, last_modified):
+    """Adiciona os cabeçalhos ETag e Last-Modified à resposta."""
+    if etag:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def not_modified_response(request, etag, last_modified):
+    """Retorna um 304 (ou 412) se as pré-condições da requisição casarem, senão None."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validator_headers(response, etag, last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Mixin para views genéricas que calcula ETag e Last-Modified com uma única
+    consulta de agregação (máximo dos timestamps e contagem de linhas) sobre o
+    queryset filtrado, sem serializar o corpo da resposta.
+    """
+
+    # Campos datetime cujo maior valor é o Last-Modified da resposta.
+    validator_timestamps = ()
+    # Contagens distintas que entram no ETag para detectar remoções.
+    validator_counts = ('pk',)
+    # Sem Last-Modified quando os timestamps não cobrem todas as mudanças do corpo
+    # (remoções ou linhas relacionadas sem timestamp); fica só o ETag.
+    send_last_modified = True
+
+    def get_validator_queryset(self):
+        """Queryset que a resposta vai serializar (lista filtrada ou um único objeto)."""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_validator_rows(self, queryset): # pylint: disable=unused-argument
+        """Linhas relacionadas sem timestamp próprio que também entram no ETag."""
+        return ()
+
+    def get_validators(self, request):
+        """Retorna o par (etag, last_modified) da requisição."""
+        aggregates = {f'ts_{f}': Max(f) for f in self.validator_timestamps}
+        aggregates.update({f'count_{f}': Count(f, distinct=True) for f in self.validator_counts})
+        queryset = self.get_validator_queryset()
+        values = queryset.order_by().aggregate(**aggregates)
+        rows = list(self.get_validator_rows(queryset))
+
+        timestamps = [values[f'ts_{f}'] for f in self.validator_timestamps
+                      if values[f'ts_{f}'] is not None]
+        last_modified = None
+        if timestamps and self.send_last_modified:
+            last_modified = int(max(timestamps).timestamp())
+
+        query = urlencode(sorted(
+            (k, v) for k in request.query_params for v in request.query_params.getlist(k)
+        ))
+        raw = '|'.join([
+            request.path, query, request.accepted_renderer.format or '',
+            repr(sorted((k, str(v)) for k, v in values.items())), repr(rows),
+        ])
+        etag = quote_etag(hashlib.sha1(raw.encode('utf-8')).hexdigest())
+        return etag, last_modified
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        """Responde 304 se o cliente já tem a versão atual; senão executa 'handler'."""
+        etag, last_modified = self.get_validators(request)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validator_headers(response, etag, last_modified)
+        return response
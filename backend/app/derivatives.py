@@ -0,0 +1,113 @@
+"""
+Versões reduzidas das imagens de produtos (WebP, AVIF quando o Pillow suporta e
+JPEG como fallback), gravadas no bucket ao lado do original.
+"""
+
+import io
+import posixpath
+from urllib.parse import unquote, urlparse
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from PIL import Image, ImageOps
+
+STORAGE_ALIAS = 'product_images'
+BUCKET = 'imagens-produtos'
+# Larguras geradas; nenhuma passa da largura do original.
+WIDTHS = (320, 640, 1024)
+QUALITY = {'webp': 80, 'avif': 60, 'jpeg': 82}
+CONTENT_TYPES = {'webp': 'image/webp', 'avif': 'image/avif', 'jpeg': 'image/jpeg'}
+EXTENSIONS = {'webp': 'webp', 'avif': 'avif', 'jpeg': 'jpg'}
+
+
+def available_formats():
+    """Formatos de saída suportados pelo Pillow instalado, do mais compacto ao fallback."""
+    Image.init()
+    return [fmt for fmt in ('avif', 'webp', 'jpeg') if fmt.upper() in Image.SAVE]
+
+
+def object_name(url):
+    """
+    Caminho do objeto no bucket a partir da URL pública (no Supabase ou no storage
+    local, que também serve em '.../imagens-produtos/'), ou None se for de outro lugar.
+    """
+    path = unquote(urlparse(url).path)
+    marker = f'/{BUCKET}/'
+    if marker not in path:
+        return None
+    return path.split(marker, 1)[1]
+
+
+def target_widths(width):
+    """Larguras a gerar para um original com 'width' pixels."""
+    widths = [w for w in WIDTHS if w < width]
+    if len(widths) < len(WIDTHS):
+        widths.append(width)
+    return widths
+
+
+def render_derivatives(source):
+    """
+    Gera as versões reduzidas de uma imagem ('source' em bytes, caminho ou arquivo).
+    Retorna {(formato, largura): bytes}. A orientação do EXIF é aplicada aos pixels
+    e os metadados não são copiados.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+    has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    results = {}
+    for width in target_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in available_formats():
+            frame = resized
+            if fmt == 'jpeg' and has_alpha:
+                frame = Image.new('RGB', resized.size, 'white')
+                frame.paste(resized, mask=resized.getchannel('A'))
+            buffer = io.BytesIO()
+            frame.save(buffer, fmt.upper(), quality=QUALITY[fmt], optimize=fmt == 'jpeg')
+            results[fmt, width] = buffer.getvalue()
+    return results
+
+
+def store_derivatives(url, source):
+    """
+    Gera e grava as versões da imagem em '<original sem extensão>/<largura>.<ext>'.
+    Retorna o mapa {formato: {largura: url}} guardado em ProdutoImagem.derivadas.
+    """
+    name = object_name(url)
+    if name is None:
+        raise ValueError(f"A URL {url} não é do bucket {BUCKET}.")
+    base = posixpath.splitext(name)[0]
+    storage = storages[STORAGE_ALIAS]
+
+    derivadas = {}
+    for (fmt, width), body in render_derivatives(source).items():
+        path = f'{base}/{width}.{EXTENSIONS[fmt]}'
+        storage.save(path, ContentFile(body))
+        derivadas.setdefault(fmt, {})[str(width)] = storage.url(path)
+    return derivadas
+
+
+def load_original(url):
+    """Bytes do original a partir do bucket."""
+    name = object_name(url)
+    if name is None:
+        raise ValueError(f"A URL {url} não é do bucket {BUCKET}.")
+    with storages[STORAGE_ALIAS].open(name) as arquivo:
+        return arquivo.read()
+
+
+def srcset(derivadas):
+    """{formato: 'url 320w, url 640w'} pronto para o atributo srcset de um <source>."""
+    return {
+        fmt: ', '.join(f'{url} {width}w' for width, url in sorted(
+            widths.items(), key=lambda item: int(item[0])
+        ))
+        for fmt, widths in derivadas.items()
+    }
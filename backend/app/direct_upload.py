@@ -0,0 +1,81 @@
+"""
+Upload direto do navegador para o bucket de imagens: o Django só emite a URL
+assinada e, depois do envio, confere o tamanho do objeto e cria a ProdutoImagem.
+O conteúdo só é baixado em segundo plano, pelo pipeline de imagens.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import storages
+from django.db import transaction
+
+from .derivatives import STORAGE_ALIAS
+from .image_pipeline import enqueue_derivatives
+from .models import ProdutoImagem
+
+PREFIX = 'media/produtos/diretos'
+ALLOWED_EXTENSIONS = ('jpg', 'jpeg', 'png', 'webp', 'avif')
+SALT = 'app.direct_upload'
+# Mesmo prazo da URL assinada do Supabase.
+TICKET_MAX_AGE = 2 * 60 * 60
+
+
+class DirectUploadError(Exception):
+    """Envio direto que não pode ser finalizado; a mensagem vai para o cliente."""
+
+
+def supports_direct_upload():
+    """Se o storage de imagens configurado emite URLs assinadas de upload."""
+    return hasattr(storages[STORAGE_ALIAS], 'signed_upload')
+
+
+def issue_upload(produto, extension):
+    """
+    Reserva um caminho para uma imagem do produto e retorna a URL assinada do bucket
+    e o 'ticket' (assinado pelo Django) que o cliente devolve ao finalizar.
+    """
+    name = f'{PREFIX}/{uuid.uuid4().hex}.{extension}'
+    signed = storages[STORAGE_ALIAS].signed_upload(name)
+    return {
+        'url': signed['url'],
+        'token': signed['token'],
+        'caminho': name,
+        'ticket': signing.dumps({'produto': produto.pk, 'caminho': name}, salt=SALT),
+        'expira_em': TICKET_MAX_AGE,
+    }
+
+
+def read_ticket(ticket):
+    """Conteúdo de um ticket emitido por issue_upload, ou DirectUploadError."""
+    try:
+        return signing.loads(ticket, salt=SALT, max_age=TICKET_MAX_AGE)
+    except signing.SignatureExpired as exc:
+        raise DirectUploadError("O prazo para enviar esta imagem terminou.") from exc
+    except signing.BadSignature as exc:
+        raise DirectUploadError("Ticket de upload inválido.") from exc
+
+
+def finalize_upload(produto, name):
+    """
+    Confere que o objeto foi enviado e cabe no limite de tamanho e cria a imagem do
+    produto em 'processando'. O conteúdo não passa pelo Django aqui: a verificação
+    e as versões reduzidas ficam com o pipeline (generate_derivatives). Repetir a
+    finalização retorna a mesma imagem. Retorna (imagem, criada).
+    """
+    storage = storages[STORAGE_ALIAS]
+    if not storage.exists(name):
+        raise DirectUploadError("O arquivo ainda não foi enviado ao storage.")
+    if storage.size(name) > settings.IMAGE_UPLOAD_MAX_SIZE:
+        storage.delete(name)
+        raise DirectUploadError("O arquivo passa do limite de tamanho.")
+
+    with transaction.atomic():
+        imagem, created = ProdutoImagem.objects.get_or_create( # pylint: disable=no-member
+            produto=produto, url=storage.url(name),
+            defaults={'status': ProdutoImagem.Status.PROCESSANDO},
+        )
+        if created:
+            enqueue_derivatives(imagem.pk)
+    return imagem, created
@@ -0,0 +1,93 @@
+"""Contagem de facetas do catálogo (categoria, material, cor e faixas de preço)."""
+
+import hashlib
+from urllib.parse import urlencode
+
+from django.db import connection
+
+from .catalog_cache import cache_namespace
+
+FACET_FIELDS = ['categoria', 'material', 'cor_padrao']
+
+# Limites superiores (exclusivos) das faixas de preço; a última faixa fica aberta.
+PRICE_BUCKETS = [50, 100, 200, 400]
+
+CACHE_TIMEOUT = 300
+
+
+def _bucket_sql():
+    """CASE que converte 'preco' no índice da faixa de preço."""
+    whens = ' '.join(f'WHEN preco < %s THEN {i}' for i in range(len(PRICE_BUCKETS)))
+    return f'CASE {whens} ELSE {len(PRICE_BUCKETS)} END', list(PRICE_BUCKETS)
+
+
+def _grouping_sets_sql(subquery):
+    """Uma única passada com GROUPING SETS (Postgres)."""
+    bucket, bucket_params = _bucket_sql()
+    facet_case = ' '.join(f"WHEN GROUPING({f}) = 0 THEN '{f}'" for f in FACET_FIELDS)
+    value_case = ' '.join(f'WHEN GROUPING({f}) = 0 THEN {f}' for f in FACET_FIELDS)
+    sets = ', '.join(f'({f})' for f in FACET_FIELDS + ['faixa'])
+    sql = (
+        f"SELECT CASE {facet_case} ELSE 'preco' END, "
+        f"CASE {value_case} ELSE CAST(faixa AS TEXT) END, COUNT(*) "
+        f"FROM (SELECT {', '.join(FACET_FIELDS)}, {bucket} AS faixa "
+        f"FROM ({subquery[0]}) AS filtrados) AS f "
+        f"GROUP BY GROUPING SETS ({sets})"
+    )
+    return sql, bucket_params + list(subquery[1])
+
+
+def _union_all_sql(subquery):
+    """Equivalente em UNION ALL para bancos sem GROUPING SETS (SQLite)."""
+    bucket, bucket_params = _bucket_sql()
+    parts, params = [], []
+    for field in FACET_FIELDS:
+        parts.append(f"SELECT '{field}', {field}, COUNT(*) FROM ({subquery[0]}) AS f "
+                     f"GROUP BY {field}")
+        params.extend(subquery[1])
+    parts.append(f"SELECT 'preco', CAST({bucket} AS TEXT), COUNT(*) FROM ({subquery[0]}) AS f "
+                 f"GROUP BY 2")
+    params.extend(bucket_params + list(subquery[1]))
+    return ' UNION ALL '.join(parts), params
+
+
+def compute_facets(queryset):
+    """
+    Calcula as contagens por valor de cada faceta e por faixa de preço para os
+    produtos do queryset (já filtrado) em uma única consulta.
+    """
+    subquery = queryset.order_by().values(*FACET_FIELDS, 'preco').query.sql_with_params()
+    if connection.vendor == 'postgresql':
+        sql, params = _grouping_sets_sql(subquery)
+    else:
+        sql, params = _union_all_sql(subquery)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    result = {field: [] for field in FACET_FIELDS}
+    price_counts = [0] * (len(PRICE_BUCKETS) + 1)
+    for facet, value, total in rows:
+        if facet == 'preco':
+            price_counts[int(value)] = total
+        else:
+            result[facet].append({'valor': value, 'total': total})
+
+    for field in FACET_FIELDS:
+        result[field].sort(key=lambda item: (-item['total'], item['valor'] or ''))
+
+    edges = [0] + PRICE_BUCKETS + [None]
+    result['preco'] = [
+        {'min': edges[i], 'max': edges[i + 1], 'total': total}
+        for i, total in enumerate(price_counts)
+    ]
+    result['total'] = sum(price_counts)
+    return result
+
+
+def facets_cache_key(params):
+    """Chave de cache a partir da versão do catálogo e dos parâmetros de filtro normalizados."""
+    normalized = urlencode(sorted(params))
+    digest = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+    return f'facetas:{cache_namespace()}:{digest}'
@@ -0,0 +1,108 @@
+"""
+Coleta de lixo do bucket de imagens: apaga objetos que nenhuma ProdutoImagem usa
+mais (imagens removidas, substituídas ou de criações desfeitas) e suas versões.
+"""
+
+import posixpath
+from datetime import timedelta
+
+from django.core.files.storage import storages
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .derivatives import BUCKET, STORAGE_ALIAS, object_name
+from .models import ArquivoImagem, ProdutoImagem
+
+PREFIX = 'media/produtos/'
+
+
+def referenced_objects(chunk_size=2000, images=None):
+    """
+    Objetos do bucket usados por alguma ProdutoImagem (originais e versões reduzidas),
+    ou só pelas imagens do queryset 'images'.
+    """
+    names = set()
+    if images is None:
+        images = ProdutoImagem.objects.all() # pylint: disable=no-member
+    rows = images.values_list('url', 'derivadas')
+    for url, derivadas in rows.iterator(chunk_size=chunk_size):
+        urls = [url] + [u for widths in (derivadas or {}).values() for u in widths.values()]
+        names.update(name for name in map(object_name, urls) if name)
+    return names
+
+
+def find_orphans(storage, prefix=PREFIX, min_age=timedelta(hours=24), page_size=1000):
+    """
+    Lista o bucket em páginas e retorna os objetos sem referência. Objetos mais novos
+    que 'min_age' ficam de fora: podem ser de um upload cuja imagem ainda não foi
+    gravada no banco.
+    """
+    referenced = referenced_objects()
+    cutoff = timezone.now() - min_age
+    return [
+        name for name, modified in storage.iter_files(prefix, page_size)
+        if name not in referenced and modified is not None and modified < cutoff
+    ]
+
+
+def _referenced_in_batch(storage, batch):
+    """
+    Nomes do lote que passaram a ser usados depois da listagem. Só as imagens que
+    podem apontar para eles são lidas: os originais pela URL e as versões reduzidas
+    pelo caminho do original, que é a pasta delas com a extensão.
+    """
+    query = Q(url__in=[storage.url(name) for name in batch])
+    for base in {posixpath.dirname(name) for name in batch}:
+        query |= Q(url__contains=f'/{BUCKET}/{base}.')
+    images = ProdutoImagem.objects.filter(query) # pylint: disable=no-member
+    return referenced_objects(images=images) & set(batch)
+
+
+def _delete_batch(storage, batch, cutoff):
+    """
+    Apaga um lote de órfãos com as linhas de ArquivoImagem do lote travadas, como na
+    busca de deduplicação (app/utils/supabase_utils.py). Antes de apagar, o lote é
+    conferido de novo: objetos que passaram a ser usados depois da listagem ou cujo
+    original foi reaproveitado há menos de 'min_age' ficam. Retorna os nomes apagados.
+    """
+    with transaction.atomic():
+        list(ArquivoImagem.objects.select_for_update().filter( # pylint: disable=no-member
+            caminho__in=batch
+        ).values_list('pk', flat=True))
+        reused = {
+            posixpath.splitext(caminho)[0]
+            for caminho in ArquivoImagem.objects.filter( # pylint: disable=no-member
+                usado_em__gte=cutoff
+            ).values_list('caminho', flat=True)
+        }
+        referenced = _referenced_in_batch(storage, batch)
+        batch = [
+            name for name in batch
+            if name not in referenced
+            # O original reaproveitado e as suas versões reduzidas.
+            and posixpath.splitext(name)[0] not in reused
+            and posixpath.dirname(name) not in reused
+        ]
+        ArquivoImagem.objects.filter(caminho__in=batch).delete() # pylint: disable=no-member
+        storage.delete_many(batch)
+    return batch
+
+
+def collect_orphans(dry_run=False, prefix=PREFIX, min_age=timedelta(hours=24), batch_size=1000):
+    """
+    Apaga do bucket, em lotes de 'batch_size', os objetos sem referência e tira os
+    originais do índice de deduplicação (ArquivoImagem), para um reenvio do mesmo
+    arquivo voltar a ser gravado. As referências de todo o bucket são lidas uma vez,
+    na listagem; cada lote só confere de novo as imagens que apontam para ele. Com 'dry_run' só retorna o que seria apagado; senão, o que foi apagado.
+    """
+    storage = storages[STORAGE_ALIAS]
+    cutoff = timezone.now() - min_age
+    orphans = find_orphans(storage, prefix, min_age, batch_size)
+    if dry_run:
+        return orphans
+    # A listagem termina antes das remoções, para não deslocar a paginação.
+    deleted = []
+    for start in range(0, len(orphans), batch_size):
+        deleted.extend(_delete_batch(storage, orphans[start:start + batch_size], cutoff))
+    return deleted
@@ -0,0 +1,290 @@
+"""
+Pipeline assíncrono de imagens de produtos: a requisição grava o arquivo recebido
+num spool local e cria a ProdutoImagem como 'processando'; um pool de workers envia
+o arquivo ao Supabase e finaliza a URL depois do commit.
+"""
+
+import io
+import logging
+import mimetypes
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import storages
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image
+
+from .derivatives import STORAGE_ALIAS, load_original, object_name, store_derivatives
+from .models import Produto, ProdutoImagem
+from .storage import UploadTooLarge
+from .utils.supabase_utils import upload_file_object_to_supabase
+
+logger = logging.getLogger(__name__)
+
+_executor_lock = threading.Lock()
+_executor = None
+
+
+def pipeline_settings():
+    """Configuração IMAGE_PIPELINE com os valores padrão."""
+    return {
+        'WORKERS': 4,
+        'SPOOL_DIR': Path(settings.BASE_DIR) / 'spool' / 'imagens',
+        'EAGER': False,
+        **getattr(settings, 'IMAGE_PIPELINE', {}),
+    }
+
+
+def spool_path(imagem_id, extension):
+    """Caminho do arquivo de spool da imagem."""
+    return Path(pipeline_settings()['SPOOL_DIR']) / f'{imagem_id}.{extension}'
+
+
+def find_spooled(imagem_id):
+    """Arquivo de spool ainda pendente da imagem, ou None."""
+    return next(Path(pipeline_settings()['SPOOL_DIR']).glob(f'{imagem_id}.*'), None)
+
+
+def _write_spool(imagem_id, file_obj):
+    """
+    Grava o arquivo no spool em blocos, com o mesmo limite de tamanho do storage de
+    imagens (IMAGE_UPLOAD_MAX_SIZE); acima dele apaga o que foi gravado e levanta
+    UploadTooLarge.
+    """
+    extension = (file_obj.name.rsplit('.', 1)[-1] if '.' in file_obj.name else 'bin').lower()
+    path = spool_path(imagem_id, extension)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    max_size = getattr(settings, 'IMAGE_UPLOAD_MAX_SIZE', None)
+    written = 0
+    with open(path, 'wb') as destino:
+        for chunk in file_obj.chunks():
+            written += len(chunk)
+            if max_size is not None and written > max_size:
+                break
+            destino.write(chunk)
+    if max_size is not None and written > max_size:
+        path.unlink(missing_ok=True)
+        raise UploadTooLarge(max_size)
+    # Se a transação for desfeita a imagem não existe mais; o worker só descarta o arquivo.
+    enqueue(imagem_id, getattr(file_obj, 'content_type', None))
+
+
+def spool_image(produto, file_obj, replace=False):
+    """
+    Grava o arquivo enviado no spool em blocos e cria a ProdutoImagem em
+    'processando'. O envio ao storage é agendado para depois do commit. Com
+    'replace' as imagens anteriores do produto só são removidas quando a nova
+    ficar pronta; se o envio falhar, elas continuam no catálogo. Um arquivo acima
+    do limite levanta UploadTooLarge sem deixar a imagem criada.
+    """
+    with transaction.atomic():
+        imagem = ProdutoImagem.objects.create( # pylint: disable=no-member
+            produto=produto, status=ProdutoImagem.Status.PROCESSANDO,
+            substitui_anteriores=replace,
+        )
+        _write_spool(imagem.pk, file_obj)
+    return imagem
+
+
+def spool_images(produto, files):
+    """
+    Versão em lote de spool_image: cria as imagens com um único bulk_create. Depois
+    do commit os arquivos são enviados em paralelo pelos workers do pipeline.
+    """
+    imagens = ProdutoImagem.objects.bulk_create([ # pylint: disable=no-member
+        ProdutoImagem(produto=produto, status=ProdutoImagem.Status.PROCESSANDO)
+        for _ in files
+    ])
+    for imagem, file_obj in zip(imagens, files):
+        _write_spool(imagem.pk, file_obj)
+    return imagens
+
+
+def _executor_instance():
+    global _executor # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=pipeline_settings()['WORKERS'], thread_name_prefix='imagens'
+            )
+        return _executor
+
+
+def _run_in_worker(func, imagem_id, *args):
+    try:
+        func(imagem_id, *args)
+    except Exception: # pylint: disable=broad-exception-caught
+        logger.exception("Erro ao processar a imagem %s.", imagem_id)
+    finally:
+        close_old_connections()
+
+
+def _submit(func, imagem_id, *args):
+    if pipeline_settings()['EAGER']:
+        transaction.on_commit(lambda: func(imagem_id, *args))
+    else:
+        transaction.on_commit(
+            lambda: _executor_instance().submit(_run_in_worker, func, imagem_id, *args)
+        )
+
+
+def enqueue(imagem_id, content_type=None):
+    """Agenda o processamento da imagem para depois do commit da transação atual."""
+    _submit(process_image, imagem_id, content_type)
+
+
+def enqueue_derivatives(imagem_id):
+    """Agenda a verificação e as versões reduzidas de uma imagem que já está no bucket."""
+    _submit(generate_derivatives, imagem_id)
+
+
+def process_image(imagem_id, content_type=None):
+    """
+    Envia o arquivo do spool ao Supabase com as versões reduzidas (app/derivatives.py)
+    e marca a imagem como 'pronta' (ou 'erro'); uma imagem pronta que substitui as
+    anteriores remove as outras imagens mais antigas do produto.
+    Em caso de erro o arquivo fica no spool para 'processar_imagens_pendentes', a
+    não ser que passe do limite de tamanho, quando é descartado.
+    Retorna o status final, ou None se não havia nada a processar.
+    """
+    path = find_spooled(imagem_id)
+    if path is None:
+        return None
+    try:
+        imagem = ProdutoImagem.objects.get(pk=imagem_id) # pylint: disable=no-member
+    except ProdutoImagem.DoesNotExist: # pylint: disable=no-member
+        path.unlink(missing_ok=True)
+        return None
+
+    content_type = content_type or mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    erro = "Erro ao fazer upload da imagem para o Supabase."
+    try:
+        with open(path, 'rb') as arquivo:
+            url = upload_file_object_to_supabase(File(arquivo, name=path.name), content_type)
+    except UploadTooLarge as exc:
+        # Falha definitiva: reenviar o mesmo arquivo nunca vai caber no limite.
+        url, erro = None, str(exc)
+        path.unlink(missing_ok=True)
+    except Exception as exc: # pylint: disable=broad-exception-caught
+        # Já registrada no log pelo upload; o arquivo fica para 'processar_imagens_pendentes'.
+        url, erro = None, f"Erro ao fazer upload da imagem para o Supabase: {exc}"
+
+    if url:
+        imagem.url, imagem.status, imagem.erro = url, ProdutoImagem.Status.PRONTA, ''
+        # Um arquivo repetido volta com a URL de antes; as versões dele já existem.
+        existentes = ProdutoImagem.objects.filter(url=url).exclude( # pylint: disable=no-member
+            derivadas={}
+        ).values_list('derivadas', flat=True).first()
+        try:
+            imagem.derivadas = existentes or store_derivatives(url, path)
+        except Exception: # pylint: disable=broad-exception-caught
+            # A imagem fica com o original; 'gerar_derivadas' tenta de novo depois.
+            logger.exception("Erro ao gerar as versões reduzidas da imagem %s.", imagem_id)
+    else:
+        imagem.status, imagem.erro = ProdutoImagem.Status.ERRO, erro
+    try:
+        with transaction.atomic():
+            imagem.save(update_fields=['url', 'status', 'erro', 'derivadas'])
+            if url:
+                if imagem.substitui_anteriores:
+                    ProdutoImagem.objects.filter( # pylint: disable=no-member
+                        produto_id=imagem.produto_id, pk__lt=imagem.pk
+                    ).delete()
+                # A imagem passa a aparecer no catálogo: marca o produto como alterado,
+                # na mesma transação, para os validadores e o snapshot incremental.
+                Produto.objects.filter(pk=imagem.produto_id).update( # pylint: disable=no-member
+                    atualizado_em=timezone.now()
+                )
+    except DatabaseError:
+        # A imagem foi removida durante o upload.
+        path.unlink(missing_ok=True)
+        return None
+
+    if url:
+        path.unlink(missing_ok=True)
+    return imagem.status
+
+
+def _is_image(content):
+    """Se 'content' é uma imagem que o Pillow reconhece e consegue verificar."""
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            image.verify()
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        return False
+    return True
+
+
+def generate_derivatives(imagem_id):
+    """
+    Baixa o original de uma imagem enviada direto ao storage, confere que é uma
+    imagem válida e grava as versões reduzidas, marcando a imagem como 'pronta'.
+    Um arquivo que não é imagem é apagado do bucket e a imagem fica com 'erro'.
+    Retorna o status final, ou None se a imagem não existe mais.
+    """
+    imagem = ProdutoImagem.objects.filter(pk=imagem_id).first() # pylint: disable=no-member
+    if imagem is None:
+        return None
+    try:
+        original = load_original(imagem.url)
+    except Exception: # pylint: disable=broad-exception-caught
+        logger.exception("Erro ao baixar o original da imagem %s.", imagem_id)
+        original = None
+
+    if original is None:
+        imagem.status = ProdutoImagem.Status.ERRO
+        imagem.erro = "Não foi possível ler o arquivo enviado ao storage."
+    elif not _is_image(original):
+        storages[STORAGE_ALIAS].delete(object_name(imagem.url))
+        imagem.status = ProdutoImagem.Status.ERRO
+        imagem.erro = "O arquivo enviado não é uma imagem válida."
+    else:
+        imagem.status, imagem.erro = ProdutoImagem.Status.PRONTA, ''
+        try:
+            imagem.derivadas = store_derivatives(imagem.url, original)
+        except Exception: # pylint: disable=broad-exception-caught
+            # A imagem fica com o original; 'gerar_derivadas' tenta de novo depois.
+            logger.exception("Erro ao gerar as versões reduzidas da imagem %s.", imagem_id)
+    try:
+        with transaction.atomic():
+            imagem.save(update_fields=['status', 'erro', 'derivadas'])
+            if imagem.status == ProdutoImagem.Status.PRONTA:
+                Produto.objects.filter(pk=imagem.produto_id).update( # pylint: disable=no-member
+                    atualizado_em=timezone.now()
+                )
+    except DatabaseError:
+        # A imagem foi removida durante o processamento.
+        return None
+    return imagem.status
+
+
+def pending_images():
+    """IDs das imagens ainda não enviadas cujo arquivo continua no spool."""
+    spool = Path(pipeline_settings()['SPOOL_DIR'])
+    if not spool.is_dir():
+        return []
+    ids = {int(path.stem) for path in spool.iterdir() if path.stem.isdigit()}
+    return list(
+        ProdutoImagem.objects.filter(pk__in=ids).exclude( # pylint: disable=no-member
+            status=ProdutoImagem.Status.PRONTA
+        ).order_by('id').values_list('id', flat=True)
+    )
+
+
+def discard_orphan_spool():
+    """Apaga arquivos do spool cujas imagens não existem mais."""
+    spool = Path(pipeline_settings()['SPOOL_DIR'])
+    if not spool.is_dir():
+        return 0
+    files = {int(path.stem): path for path in spool.iterdir() if path.stem.isdigit()}
+    existing = set(
+        ProdutoImagem.objects.filter(pk__in=files).values_list('id', flat=True) # pylint: disable=no-member
+    )
+    for imagem_id in set(files) - existing:
+        os.remove(files[imagem_id])
+    return len(set(files) - existing)
@@ -0,0 +1,25 @@
+"""Comando para exportar o catálogo de produtos em CSV ou NDJSON."""
+
+from django.core.management.base import BaseCommand
+
+from app.bulk import FORMATS, export_products
+
+
+class Command(BaseCommand):
+    """python manage.py exportar_produtos [--formato ndjson] [--saida produtos.ndjson]"""
+
+    help = "Exporta todos os produtos em CSV ou NDJSON, lendo o banco em lotes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formato', choices=FORMATS, default='csv')
+        parser.add_argument('--saida', help="Arquivo de saída (padrão: stdout).")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        chunks = export_products(options['formato'], chunk_size=options['chunk_size'])
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8', newline='') as saida:
+                saida.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,29 @@
+"""Comando que gera ou atualiza o snapshot estático do catálogo (app/snapshots.py)."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.snapshots import generate_snapshot
+
+
+class Command(BaseCommand):
+    """python manage.py gerar_catalogo_estatico [--completo]"""
+
+    help = (
+        "Grava o catálogo em páginas JSON por categoria no storage 'catalog_snapshots', "
+        "regravando só as categorias com produtos alterados desde o último snapshot."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--completo', action='store_true',
+            help="Regera todas as categorias, ignorando o snapshot anterior.",
+        )
+
+    def handle(self, *args, **options):
+        report = generate_snapshot(full=options['completo'])
+        if report is None:
+            raise CommandError("Já existe uma geração do snapshot em andamento.")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(report['categorias'])} categorias processadas, "
+            f"{report['gravadas']} páginas gravadas, {report['removidas']} removidas."
+        ))
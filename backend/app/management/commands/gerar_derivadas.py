@@ -0,0 +1,58 @@
+"""Comando que gera as versões reduzidas das imagens de produtos já enviadas."""
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.derivatives import load_original, store_derivatives
+from app.models import Produto, ProdutoImagem
+from app.signals import catalog_changed
+
+
+class Command(BaseCommand):
+    """python manage.py gerar_derivadas [--todas] [--lote 100]"""
+
+    help = (
+        "Gera as versões WebP/AVIF/JPEG das imagens prontas que ainda não têm "
+        "(ou de todas, com --todas) e grava o mapa em ProdutoImagem.derivadas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todas', action='store_true', help="Regera também as que já têm versões.")
+        parser.add_argument('--lote', type=int, default=100)
+
+    def handle(self, *args, **options):
+        imagens = ProdutoImagem.objects.prontas().order_by('id') # pylint: disable=no-member
+        if not options['todas']:
+            imagens = imagens.filter(derivadas={})
+
+        # Várias imagens podem apontar para o mesmo original (como a URL padrão).
+        por_url, lote, geradas, erros = {}, [], 0, 0
+        for imagem in imagens.iterator(chunk_size=options['lote']):
+            if imagem.url not in por_url:
+                try:
+                    por_url[imagem.url] = store_derivatives(imagem.url, load_original(imagem.url))
+                except Exception as exc: # pylint: disable=broad-exception-caught
+                    por_url[imagem.url] = None
+                    self.stderr.write(f"Imagem {imagem.id}: {exc}")
+            if por_url[imagem.url] is None:
+                erros += 1
+                continue
+            imagem.derivadas = por_url[imagem.url]
+            lote.append(imagem)
+            if len(lote) >= options['lote']:
+                geradas += self._save(lote)
+        geradas += self._save(lote)
+
+        if geradas:
+            catalog_changed()
+        self.stdout.write(self.style.SUCCESS(f"{geradas} imagens atualizadas, {erros} com erro."))
+
+    def _save(self, lote):
+        ProdutoImagem.objects.bulk_update(lote, ['derivadas']) # pylint: disable=no-member
+        # Marca os produtos como alterados para o snapshot incremental do catálogo.
+        Produto.objects.filter( # pylint: disable=no-member
+            pk__in={imagem.produto_id for imagem in lote}
+        ).update(atualizado_em=timezone.now())
+        count = len(lote)
+        lote.clear()
+        return count
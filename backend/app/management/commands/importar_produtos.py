@@ -0,0 +1,33 @@
+"""Comando para importar produtos em lote de um arquivo CSV ou NDJSON."""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.bulk import CHUNK_SIZE, FORMATS, detect_format, import_products
+
+
+class Command(BaseCommand):
+    """python manage.py importar_produtos produtos.csv [--formato ndjson] [--chunk-size 1000]"""
+
+    help = "Importa produtos de um arquivo CSV ou NDJSON em lotes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo')
+        parser.add_argument('--formato', choices=FORMATS)
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        fmt = options['formato'] or detect_format(options['arquivo'])
+        try:
+            with open(options['arquivo'], 'rb') as arquivo:
+                report = import_products(arquivo, fmt, chunk_size=options['chunk_size'])
+        except OSError as e:
+            raise CommandError(f"Não foi possível ler o arquivo: {e}") from e
+
+        for erro in report.erros:
+            self.stderr.write(f"Linha {erro['linha']}: {json.dumps(erro['erros'], ensure_ascii=False)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.criados} criados, {report.atualizados} atualizados, "
+            f"{report.total_erros} com erro."
+        ))
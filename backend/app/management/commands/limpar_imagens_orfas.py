@@ -0,0 +1,42 @@
+"""Comando que apaga do bucket as imagens que nenhum produto usa mais."""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from app.image_gc import PREFIX, collect_orphans
+
+
+class Command(BaseCommand):
+    """python manage.py limpar_imagens_orfas [--simular] [--lote 1000] [--idade-minima 24]"""
+
+    help = (
+        "Compara a listagem do bucket de imagens com as URLs de ProdutoImagem e apaga, "
+        "em lotes, os objetos sem referência."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--simular', action='store_true',
+            help="Só lista os objetos que seriam apagados (dry-run).",
+        )
+        parser.add_argument('--lote', type=int, default=1000)
+        parser.add_argument(
+            '--idade-minima', type=float, default=24,
+            help="Horas desde a gravação antes de um objeto poder ser apagado.",
+        )
+        parser.add_argument('--prefixo', default=PREFIX)
+
+    def handle(self, *args, **options):
+        orphans = collect_orphans(
+            dry_run=options['simular'],
+            prefix=options['prefixo'],
+            min_age=timedelta(hours=options['idade_minima']),
+            batch_size=options['lote'],
+        )
+        if options['simular']:
+            for name in orphans:
+                self.stdout.write(name)
+            self.stdout.write(self.style.WARNING(f"{len(orphans)} objetos seriam apagados."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(orphans)} objetos apagados."))
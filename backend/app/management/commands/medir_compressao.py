@@ -0,0 +1,49 @@
+"""Comando que mede tamanho e CPU da compressão das respostas do catálogo."""
+
+import gzip
+import timeit
+
+import brotli
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.utils.text import compress_string
+
+from app.compression import BROTLI_QUALITY, GZIP_LEVEL
+from app.management.commands.medir_json import product_payload
+from app.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    """python manage.py medir_compressao [--produtos 10000] [--repeticoes 5]"""
+
+    help = "Compara tamanho e tempo de gzip e Brotli sobre a listagem de produtos."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--produtos', type=int, default=10000)
+        parser.add_argument('--repeticoes', type=int, default=5)
+
+    def handle(self, *args, **options):
+        body = ORJSONRenderer().render(product_payload(options['produtos']))
+        repeat = options['repeticoes']
+        self.stdout.write(f"{options['produtos']} produtos, {len(body) / 1024:.0f} KiB sem compressão")
+
+        variants = (
+            ('gzip (GZipMiddleware)', lambda: compress_string(body, max_random_bytes=100)),
+            (f'gzip nível {GZIP_LEVEL}', lambda: gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)),
+            ('brotli q4', lambda: brotli.compress(body, quality=4)),
+            (f'brotli q{BROTLI_QUALITY}', lambda: brotli.compress(body, quality=BROTLI_QUALITY)),
+        )
+        for label, func in variants:
+            size = len(func())
+            elapsed = min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+            self.stdout.write(
+                f"{label:<22} {size / 1024:8.0f} KiB ({size / len(body):6.1%})  {elapsed:8.1f} ms"
+            )
+
+        # Com o cache da CompressionMiddleware o custo acima é pago uma vez por versão
+        # do catálogo e codificação; as requisições seguintes só leem os bytes do cache.
+        cache.set('comprimido:medicao', brotli.compress(body, quality=BROTLI_QUALITY), 60)
+        elapsed = min(timeit.repeat(lambda: cache.get('comprimido:medicao'), number=1,
+                                    repeat=repeat)) * 1000
+        cache.delete('comprimido:medicao')
+        self.stdout.write(f"{'acerto no cache':<22} {'':>24}  {elapsed:8.1f} ms")
@@ -0,0 +1,70 @@
+"""Comando que compara o JSONRenderer/JSONParser do DRF com as versões em orjson."""
+
+import io
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from app.renderers import ORJSONParser, ORJSONRenderer
+
+
+def product_payload(size, seed=0):
+    """Lista no formato do ProductListSerializer com 'size' produtos sintéticos."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            'id': i,
+            'titulo': f'Bolsa térmica modelo {i}',
+            'descricao': 'Bolsa térmica com alça ajustável e bolso frontal. ' * 3,
+            'categoria': rng.choice(['infantil', 'masculino', 'feminino', 'termicas']),
+            'preco': round(rng.uniform(20, 500), 2),
+            'quantidade': rng.randint(0, 200),
+            'material': rng.choice(['Couro', 'Lona', 'Poliéster', 'Nylon']),
+            'cor_padrao': rng.choice(['Preto', 'Azul', 'Marrom', 'Verde']),
+            'altura': round(rng.uniform(10, 60), 1),
+            'comprimento': round(rng.uniform(10, 60), 1),
+            'largura': round(rng.uniform(5, 30), 1),
+            'imagens': [
+                {
+                    'id': i * 3 + n,
+                    'url': f'https://example.supabase.co/storage/v1/object/public/'
+                           f'imagens-produtos/media/produtos/{i}-{n}.jpg',
+                    'criado_em': (start + timedelta(minutes=i * 3 + n)).isoformat(),
+                }
+                for n in range(3)
+            ],
+        }
+        for i in range(size)
+    ]
+
+
+class Command(BaseCommand):
+    """python manage.py medir_json [--produtos 10000] [--repeticoes 10]"""
+
+    help = "Mede render e parse de uma lista de produtos com json e com orjson."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--produtos', type=int, default=10000)
+        parser.add_argument('--repeticoes', type=int, default=10)
+
+    def _best(self, func, repeat):
+        return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+    def handle(self, *args, **options):
+        data = product_payload(options['produtos'])
+        repeat = options['repeticoes']
+        body = JSONRenderer().render(data)
+        self.stdout.write(f"{options['produtos']} produtos, {len(body) / 1024:.0f} KiB")
+
+        for label, renderer, parser in (
+            ('json (DRF)', JSONRenderer(), JSONParser()),
+            ('orjson', ORJSONRenderer(), ORJSONParser()),
+        ):
+            render = self._best(lambda r=renderer: r.render(data), repeat)
+            parse = self._best(lambda p=parser: p.parse(io.BytesIO(body)), repeat)
+            self.stdout.write(f"{label:<12} render {render:8.2f} ms   parse {parse:8.2f} ms")
@@ -0,0 +1,65 @@
+"""Comando que mede vazão e memória dos uploads de imagens, sem acesso à rede."""
+
+import os
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+
+from app.storage import LocalStorage
+
+
+class Command(BaseCommand):
+    """python manage.py medir_upload [--arquivos 16] [--tamanho-mb 8] [--paralelo 4]"""
+
+    help = (
+        "Envia arquivos sintéticos a um LocalStorage temporário lendo o arquivo inteiro "
+        "(como o upload antigo) e em blocos, e compara vazão e pico de memória."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--arquivos', type=int, default=16)
+        parser.add_argument('--tamanho-mb', type=float, default=8)
+        parser.add_argument('--paralelo', type=int, default=4)
+
+    def handle(self, *args, **options):
+        size = int(options['tamanho_mb'] * 1024 * 1024)
+        with tempfile.TemporaryDirectory() as tmp:
+            origem = Path(tmp) / 'origem'
+            origem.mkdir()
+            paths = []
+            for n in range(options['arquivos']):
+                path = origem / f'{n}.jpg'
+                path.write_bytes(os.urandom(size))
+                paths.append(path)
+            storage = LocalStorage(location=Path(tmp) / 'bucket', max_upload_size=size)
+
+            def inteiro(path):
+                with open(path, 'rb') as arquivo:
+                    storage.save(f'inteiro/{path.name}', ContentFile(arquivo.read(), name=path.name))
+
+            def em_blocos(path):
+                with open(path, 'rb') as arquivo:
+                    storage.save(f'blocos/{path.name}', File(arquivo, name=path.name))
+
+            total_mb = size * len(paths) / (1024 * 1024)
+            self.stdout.write(
+                f"{len(paths)} arquivos de {options['tamanho_mb']:g} MiB, "
+                f"{options['paralelo']} em paralelo"
+            )
+            for label, upload in (('arquivo inteiro', inteiro), ('em blocos', em_blocos)):
+                tracemalloc.start()
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=options['paralelo']) as executor:
+                    list(executor.map(upload, paths))
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.stdout.write(
+                    f"{label:<16} {total_mb / elapsed:8.1f} MiB/s   pico {peak / (1024 * 1024):8.2f} MiB"
+                )
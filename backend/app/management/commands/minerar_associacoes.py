@@ -0,0 +1,26 @@
+"""Comando que recalcula os produtos frequentemente comprados juntos."""
+
+from django.core.management.base import BaseCommand
+
+from app.associations import CHUNK_SIZE, MIN_OCCURRENCES, TOP_K, mine_associations
+
+
+class Command(BaseCommand):
+    """python manage.py minerar_associacoes [--chunk-size 10000] [--top 10] [--min-ocorrencias 2]"""
+
+    help = "Calcula co-ocorrência e lift dos pares de produtos nos pedidos aprovados."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--top', type=int, default=TOP_K)
+        parser.add_argument('--min-ocorrencias', type=int, default=MIN_OCCURRENCES)
+
+    def handle(self, *args, **options):
+        baskets, total = mine_associations(
+            chunk_size=options['chunk_size'],
+            top_k=options['top'],
+            min_occurrences=options['min_ocorrencias'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{baskets} pedidos analisados, {total} associações gravadas."
+        ))
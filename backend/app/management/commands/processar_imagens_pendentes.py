@@ -0,0 +1,23 @@
+"""Comando que reenvia as imagens que ficaram no spool do pipeline de imagens."""
+
+from django.core.management.base import BaseCommand
+
+from app.image_pipeline import discard_orphan_spool, pending_images, process_image
+
+
+class Command(BaseCommand):
+    """python manage.py processar_imagens_pendentes"""
+
+    help = (
+        "Envia ao Supabase as imagens em 'processando' ou 'erro' que ainda têm arquivo "
+        "no spool (por exemplo, depois de uma queda do servidor) e apaga arquivos órfãos."
+    )
+
+    def handle(self, *args, **options):
+        results = [process_image(imagem_id) for imagem_id in pending_images()]
+        prontas = results.count('pronta')
+        removidos = discard_orphan_spool()
+        self.stdout.write(self.style.SUCCESS(
+            f"{prontas} imagens enviadas, {len(results) - prontas} com erro, "
+            f"{removidos} arquivos órfãos removidos."
+        ))
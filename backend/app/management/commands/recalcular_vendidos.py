@@ -0,0 +1,17 @@
+"""Comando para recalcular do zero o rollup de unidades vendidas por produto."""
+
+from django.core.management.base import BaseCommand
+
+from app.sales import rebuild_sales_rollup
+
+
+class Command(BaseCommand):
+    """python manage.py recalcular_vendidos"""
+
+    help = "Recalcula Produto.vendidos a partir dos pedidos aprovados."
+
+    def handle(self, *args, **options):
+        totals = rebuild_sales_rollup()
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(totals)} produtos com vendas, {sum(totals.values())} unidades."
+        ))
@@ -0,0 +1,58 @@
+# pylint: skip-file
+
+from django.db import migrations
+
+
+FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'portuguese_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent (COPY = portuguese);
+            ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+        END IF;
+    END
+    $$
+    """,
+    """
+    ALTER TABLE produto ADD COLUMN IF NOT EXISTS busca tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('portuguese_unaccent', coalesce(titulo, '')), 'A') ||
+        setweight(to_tsvector('portuguese_unaccent',
+            coalesce(categoria, '') || ' ' || coalesce(material, '') || ' ' ||
+            coalesce(cor_padrao, '')), 'B') ||
+        setweight(to_tsvector('portuguese_unaccent', coalesce(descricao, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS produto_busca_gin ON produto USING GIN (busca)",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS produto_busca_gin",
+    "ALTER TABLE produto DROP COLUMN IF EXISTS busca",
+    "DROP TEXT SEARCH CONFIGURATION IF EXISTS portuguese_unaccent",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        # A coluna 'busca' só existe no Postgres; nos demais bancos a busca usa
+        # o índice invertido em memória de app/search.py.
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_alter_carrinho_options_alter_cor_options_and_more'),
+        ('app', '0002_alter_pedido_options'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD_SQL), _run(REVERSE_SQL)),
+    ]
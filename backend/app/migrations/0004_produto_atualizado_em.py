@@ -0,0 +1,49 @@
+# pylint: skip-file
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def _run(statement):
+    def run(apps, schema_editor):
+        # A tabela 'produto' não é gerenciada pelo Django, então a coluna é criada à mão.
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_produto_busca'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='produto',
+                    name='atualizado_em',
+                    field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+                    preserve_default=False,
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(
+                    _run(
+                        "ALTER TABLE produto ADD COLUMN IF NOT EXISTS atualizado_em "
+                        "timestamp with time zone NOT NULL DEFAULT now()"
+                    ),
+                    _run("ALTER TABLE produto DROP COLUMN IF EXISTS atualizado_em"),
+                ),
+                migrations.RunPython(
+                    _run(
+                        "CREATE INDEX IF NOT EXISTS produto_atualizado_em_idx "
+                        "ON produto (atualizado_em)"
+                    ),
+                    _run("DROP INDEX IF EXISTS produto_atualizado_em_idx"),
+                ),
+            ],
+        ),
+    ]
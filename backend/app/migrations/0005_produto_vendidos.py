@@ -0,0 +1,70 @@
+# pylint: skip-file
+
+from django.db import migrations, models
+
+
+def _run(*statements):
+    def run(apps, schema_editor):
+        # As tabelas 'produto' e 'pedido' não são gerenciadas pelo Django, então as
+        # colunas são criadas à mão.
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+APPROVED = "('aprovado', 'approved')"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_produto_atualizado_em'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='produto',
+                    name='vendidos',
+                    field=models.BigIntegerField(db_index=True, default=0),
+                ),
+                migrations.AddField(
+                    model_name='pedido',
+                    name='vendas_contabilizadas',
+                    field=models.BooleanField(default=False),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(
+                    _run(
+                        "ALTER TABLE produto ADD COLUMN IF NOT EXISTS vendidos "
+                        "bigint NOT NULL DEFAULT 0",
+                        "ALTER TABLE pedido ADD COLUMN IF NOT EXISTS vendas_contabilizadas "
+                        "boolean NOT NULL DEFAULT false",
+                        "CREATE INDEX IF NOT EXISTS produto_vendidos_idx ON produto (vendidos)",
+                    ),
+                    _run(
+                        "DROP INDEX IF EXISTS produto_vendidos_idx",
+                        "ALTER TABLE pedido DROP COLUMN IF EXISTS vendas_contabilizadas",
+                        "ALTER TABLE produto DROP COLUMN IF EXISTS vendidos",
+                    ),
+                ),
+                # Preenche o rollup com os pedidos já aprovados.
+                migrations.RunPython(
+                    _run(
+                        "UPDATE produto SET vendidos = vendas.total FROM ("
+                        "SELECT pc.id_produto, SUM(pc.quantidade) AS total "
+                        "FROM produto_carrinho pc "
+                        "JOIN pedido pe ON pe.codigo_carrinho_id = pc.id_carrinho "
+                        f"WHERE pe.status IN {APPROVED} GROUP BY pc.id_produto"
+                        ") AS vendas WHERE produto.id = vendas.id_produto",
+                        f"UPDATE pedido SET vendas_contabilizadas = true WHERE status IN {APPROVED}",
+                    ),
+                    migrations.RunPython.noop,
+                ),
+            ],
+        ),
+    ]
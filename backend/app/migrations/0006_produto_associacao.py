@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_produto_vendidos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProdutoAssociacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ocorrencias', models.PositiveIntegerField()),
+                ('lift', models.FloatField()),
+                ('confianca', models.FloatField()),
+                ('associado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.produto')),
+                ('produto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='associacoes', to='app.produto')),
+            ],
+            options={
+                'db_table': 'produto_associacao',
+                'indexes': [models.Index(fields=['produto', '-lift'], name='produto_associacao_lift_idx')],
+                'constraints': [models.UniqueConstraint(fields=('produto', 'associado'), name='produto_associacao_unica')],
+            },
+        ),
+    ]
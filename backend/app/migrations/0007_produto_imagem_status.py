@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_produto_associacao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='produtoimagem',
+            name='erro',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='produtoimagem',
+            name='status',
+            field=models.CharField(choices=[('processando', 'Processando'), ('pronta', 'Pronta'), ('erro', 'Erro')], default='pronta', max_length=12),
+        ),
+    ]
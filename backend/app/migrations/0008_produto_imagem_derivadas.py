@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_produto_imagem_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='produtoimagem',
+            name='derivadas',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_produto_imagem_derivadas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArquivoImagem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('caminho', models.CharField(max_length=255)),
+                ('url', models.URLField(max_length=500)),
+                ('tamanho', models.BigIntegerField()),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'arquivo_imagem',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_arquivo_imagem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='produtoimagem',
+            name='substitui_anteriores',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_produto_imagem_substitui_anteriores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='arquivoimagem',
+            name='usado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:54
+
+from django.db import migrations, models
+
+
+def _create_row(apps, schema_editor): # pylint: disable=unused-argument
+    apps.get_model('app', 'VersaoCatalogo').objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_arquivo_imagem_usado_em'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersaoCatalogo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('valor', models.PositiveBigIntegerField(default=1)),
+            ],
+            options={
+                'db_table': 'versao_catalogo',
+            },
+        ),
+        migrations.RunPython(_create_row, migrations.RunPython.noop),
+    ]
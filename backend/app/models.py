@@ -2,6 +2,7 @@
 
 #from types import CellType
 from django.db import models
+from django.db.models.functions import RowNumber
 
 class Carrinho(models.Model):   # pylint: disable=too-few-public-methods
     """Representa o carrinho de compras de um usuário."""
@@ -46,7 +47,43 @@ class Personalizacao(models.Model): # pylint: disable=too-few-public-methods
         managed = False
 
 
-class Produto(models.Model):    # pylint: disable=too-few-public-methods
+class ProdutoQuerySet(models.QuerySet):
+    """QuerySet com os carregamentos usados pelas rotas de produtos."""
+
+    def with_images(self, first_only=False):
+        """
+        Pré-carrega as imagens de todos os produtos em uma única consulta, ordenadas
+        por 'criado_em'. Com 'first_only' traz só a imagem principal (a mais antiga)
+        de cada produto, filtrada por um ROW_NUMBER() particionado por produto.
+        """
+        imagens = ProdutoImagem.objects.prontas().order_by('criado_em', 'id')
+        if first_only:
+            imagens = imagens.annotate(posicao=models.Window(
+                RowNumber(),
+                partition_by=models.F('produto'),
+                order_by=[models.F('criado_em').asc(), models.F('id').asc()],
+            )).filter(posicao=1)
+        return self.prefetch_related(models.Prefetch('imagens', queryset=imagens))
+
+
+class RollupFieldsMixin:
+    """
+    Mixin para modelos com contadores mantidos só por UPDATEs atômicos (com F()).
+    Um save() comum de uma instância já existente não grava esses campos, para não
+    sobrescrever com um valor antigo um incremento feito depois do carregamento.
+    """
+    rollup_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.rollup_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class Produto(RollupFieldsMixin, models.Model):    # pylint: disable=too-few-public-methods
     """Representa um produto disponível na loja."""
 
     id = models.BigAutoField(primary_key=True)
@@ -60,6 +97,12 @@ class Produto(models.Model):    # pylint: disable=too-few-public-methods
     altura = models.FloatField(blank=True, null=True)
     comprimento = models.FloatField(blank=True, null=True)
     largura = models.FloatField(blank=True, null=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+    # Unidades vendidas em pedidos aprovados, mantido por app.sales.
+    vendidos = models.BigIntegerField(default=0, db_index=True)
+
+    objects = ProdutoQuerySet.as_manager()
+    rollup_fields = ('vendidos',)
 
     def __str__(self):
         return str(self.titulo or '')
@@ -69,9 +112,23 @@ class Produto(models.Model):    # pylint: disable=too-few-public-methods
         managed = False
 
 
+class ProdutoImagemQuerySet(models.QuerySet):
+    """QuerySet das imagens de produtos."""
+
+    def prontas(self):
+        """Só as imagens já enviadas ao storage, que podem aparecer no catálogo."""
+        return self.filter(status=ProdutoImagem.Status.PRONTA)
+
+
 class ProdutoImagem(models.Model):
     """Classe que guarda a url das imagnes dos produtos"""
 
+    class Status(models.TextChoices):
+        """Etapas do pipeline de upload (app/image_pipeline.py)."""
+        PROCESSANDO = 'processando', 'Processando'
+        PRONTA = 'pronta', 'Pronta'
+        ERRO = 'erro', 'Erro'
+
     produto = models.ForeignKey(
         Produto,
         on_delete=models.CASCADE,
@@ -83,6 +140,14 @@ class ProdutoImagem(models.Model):
                         'https://tixunpfronrbfeswufuv.supabase.co/storage/v1/object/public/'
                         'imagens-produtos/media/produtos/0a5dc12e-0203-4c98-bf56-3f0671e14902.jpg?')
     criado_em = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(max_length=12, choices=Status.choices, default=Status.PRONTA)
+    erro = models.TextField(blank=True, default='')
+    # Quando fica pronta, a imagem substitui as imagens anteriores do produto.
+    substitui_anteriores = models.BooleanField(default=False)
+    # Versões reduzidas geradas por app/derivatives.py: {formato: {largura: url}}.
+    derivadas = models.JSONField(blank=True, default=dict)
+
+    objects = ProdutoImagemQuerySet.as_manager()
 
     class Meta: # pylint: disable=too-few-public-methods
         """Define que este modelo é apenas leitura (sem migrations)"""
@@ -92,6 +157,77 @@ class ProdutoImagem(models.Model):
     def __str__(self):
         return f"Imagem do produto {self.produto.titulo}" # pylint: disable=no-member
 
+class ArquivoImagem(models.Model):
+    """
+    Índice local dos arquivos já enviados ao bucket de imagens, pelo SHA-256 do
+    conteúdo. Um reenvio do mesmo arquivo reutiliza a URL sem novo upload.
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    caminho = models.CharField(max_length=255)
+    url = models.URLField(max_length=500)
+    tamanho = models.BigIntegerField()
+    criado_em = models.DateTimeField(auto_now_add=True)
+    # Último reaproveitamento do arquivo por um envio repetido; protege o objeto da
+    # coleta de órfãos (app/image_gc.py), já que o reaproveitamento não regrava o bucket.
+    usado_em = models.DateTimeField(blank=True, null=True)
+
+    class Meta: # pylint: disable=too-few-public-methods
+        """Tabela gerenciada pelo Django."""
+        db_table = 'arquivo_imagem'
+
+    def __str__(self):
+        return str(self.caminho)
+
+class VersaoCatalogo(models.Model):
+    """
+    Versão do catálogo (app/catalog_cache.py), numa linha única para que as escritas
+    de qualquer processo (workers, comandos de gerenciamento) invalidem o cache de todos.
+    """
+
+    valor = models.PositiveBigIntegerField(default=1)
+
+    class Meta: # pylint: disable=too-few-public-methods
+        """Tabela gerenciada pelo Django, com uma única linha."""
+        db_table = 'versao_catalogo'
+
+    def __str__(self):
+        return str(self.valor)
+
+class ProdutoAssociacao(models.Model):
+    """Par de produtos frequentemente comprados juntos, calculado por app.associations."""
+
+    produto = models.ForeignKey(
+        Produto,
+        on_delete=models.CASCADE,
+        related_name='associacoes'
+    )
+    associado = models.ForeignKey(
+        Produto,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    # Pedidos aprovados que têm os dois produtos.
+    ocorrencias = models.PositiveIntegerField()
+    # P(associado | produto) / P(associado)
+    lift = models.FloatField()
+    # P(associado | produto)
+    confianca = models.FloatField()
+
+    class Meta: # pylint: disable=too-few-public-methods
+        """Tabela gerenciada pelo Django, reescrita a cada execução do job."""
+        db_table = 'produto_associacao'
+        constraints = [
+            models.UniqueConstraint(fields=['produto', 'associado'], name='produto_associacao_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['produto', '-lift'], name='produto_associacao_lift_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.produto_id} -> {self.associado_id}" # pylint: disable=no-member
+
+
 class ProdutoCarrinho(models.Model):    # pylint: disable=too-few-public-methods
     """Relaciona produtos com carrinhos de compra."""
     pk = models.CompositePrimaryKey('id_produto', 'id_carrinho')
@@ -106,7 +242,26 @@ class ProdutoCarrinho(models.Model):    # pylint: disable=too-few-public-methods
         managed = False
 
 
-class Pedido(models.Model):
+class PedidoQuerySet(models.QuerySet):
+    """QuerySet com os carregamentos usados pelas rotas de pedidos."""
+
+    def with_cart_items(self):
+        """
+        Carrega carrinho, itens, produtos e imagens de cada pedido em um número
+        fixo de consultas, independente de quantos pedidos forem retornados.
+        """
+        itens = ProdutoCarrinho.objects.select_related('id_produto').prefetch_related(
+            models.Prefetch(
+                'id_produto__imagens',
+                queryset=ProdutoImagem.objects.prontas().order_by('criado_em', 'id'),
+            )
+        )
+        return self.select_related('codigo_carrinho').prefetch_related(
+            models.Prefetch('codigo_carrinho__produtocarrinho_set', queryset=itens)
+        )
+
+
+class Pedido(RollupFieldsMixin, models.Model):
     """Representa um pedido realizado por um usuário."""
     nome_usuario = models.TextField(max_length=255, blank=True, null=True)
     email_usuario = models.TextField(max_length=255, blank=True, null=True)
@@ -149,6 +304,11 @@ class Pedido(models.Model):
         db_index=True, 
         help_text="Referência externa do pedido enviada ao Mercado Pago."
     )
+    # Se os itens deste pedido já estão somados em Produto.vendidos (ver app.sales).
+    vendas_contabilizadas = models.BooleanField(default=False)
+
+    objects = PedidoQuerySet.as_manager()
+    rollup_fields = ('vendas_contabilizadas',)
 
     def __str__(self):
         return f"Pedido {self.id} - Status: {self.status}" # pylint: disable=no-member
@@ -0,0 +1,197 @@
+"""Paginação por cursor (keyset) para as listagens da API."""
+
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Paginação por cursor opaco usando o campo de ordenação da view com 'id' como desempate.
+
+    Cada página é obtida com um 'WHERE (campo, id) > (valor, id)' em vez de 'OFFSET',
+    então o custo de uma página não cresce com a sua posição na lista e nenhuma página
+    precisa de 'COUNT(*)'. A paginação é opcional: só é aplicada quando o cliente envia
+    'page_size' ou 'cursor', mantendo a resposta em lista para os clientes atuais.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 200
+    tiebreaker = 'id'
+
+    def __init__(self):
+        self.request = None
+        self.next_cursor = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        field, descending = self.get_ordering_field(queryset, view)
+        cursor = self.decode_cursor(request)
+
+        if cursor is not None:
+            if cursor.get('f') != field or cursor.get('d') != descending:
+                raise NotFound('Cursor inválido para a ordenação informada.')
+            cursor = self.coerce_cursor(queryset, field, cursor)
+            queryset = queryset.filter(self.after_cursor(field, descending, cursor))
+
+        if descending:
+            order = [F(field).desc(nulls_last=True), F(self.tiebreaker).desc()]
+        else:
+            order = [F(field).asc(nulls_last=True), F(self.tiebreaker).asc()]
+
+        # Busca um item a mais para saber se existe próxima página sem contar a tabela.
+        rows = list(queryset.order_by(*order)[:page_size + 1])
+        page = rows[:page_size]
+
+        self.next_cursor = None
+        if len(rows) > page_size:
+            last = page[-1]
+            self.next_cursor = {
+                'f': field,
+                'd': descending,
+                'v': self.serialize_value(getattr(last, field)),
+                'id': getattr(last, self.tiebreaker),
+            }
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        """Lê o 'page_size' da query string, limitado a 'max_page_size'."""
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering_field(self, queryset, view):
+        """
+        Retorna o campo de ordenação já aplicado pelo OrderingFilter (ou o 'ordering'
+        da view) e se a ordem é decrescente. O keyset usa um único campo mais o 'id',
+        então uma ordenação por mais campos é recusada.
+        """
+        ordering = [o for o in queryset.query.order_by if isinstance(o, str)]
+        if not ordering:
+            ordering = list(getattr(view, 'ordering', None) or [])
+        if isinstance(ordering, str):
+            ordering = [ordering]
+        if not ordering:
+            return self.tiebreaker, False
+
+        field = ordering[0]
+        descending = field.startswith('-')
+        if any(o.lstrip('-') != self.tiebreaker for o in ordering[1:]):
+            raise ValidationError({
+                'ordering': 'A paginação por cursor aceita apenas um campo de ordenação.'
+            })
+        return field.lstrip('-'), descending
+
+    def coerce_cursor(self, queryset, field, cursor):
+        """
+        Converte os valores do cursor para os tipos do campo de ordenação e do 'id',
+        recusando cursores adulterados antes de chegarem ao filtro.
+        """
+        def to_python(name, value):
+            try:
+                model_field = queryset.model._meta.get_field(name) # pylint: disable=protected-access
+            except FieldDoesNotExist:
+                model_field = queryset.query.annotations[name].output_field
+            return model_field.to_python(value)
+
+        try:
+            last_id = to_python(self.tiebreaker, cursor['id'])
+            value = cursor.get('v')
+            if value is not None:
+                value = to_python(field, value)
+        except (DjangoValidationError, TypeError, ValueError, KeyError) as exc:
+            raise NotFound('Cursor inválido.') from exc
+        if last_id is None:
+            raise NotFound('Cursor inválido.')
+        return {**cursor, 'v': value, 'id': last_id}
+
+    def after_cursor(self, field, descending, cursor):
+        """Monta o filtro keyset para as linhas posteriores ao cursor."""
+        value = cursor.get('v')
+        last_id = cursor.get('id')
+        op = 'lt' if descending else 'gt'
+        tiebreak = {f'{self.tiebreaker}__{op}': last_id}
+
+        if field == self.tiebreaker:
+            return Q(**tiebreak)
+
+        if value is None:
+            # Já estamos no bloco de nulos, que sempre fica por último.
+            return Q(**{f'{field}__isnull': True}, **tiebreak)
+
+        return (
+            Q(**{f'{field}__{op}': value})
+            | Q(**{field: value}, **tiebreak)
+            | Q(**{f'{field}__isnull': True})
+        )
+
+    def decode_cursor(self, request):
+        """Decodifica o cursor opaco recebido na query string."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            cursor = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        except (binascii.Error, ValueError, UnicodeError) as exc:
+            raise NotFound('Cursor inválido.') from exc
+        if not isinstance(cursor, dict) or 'id' not in cursor:
+            raise NotFound('Cursor inválido.')
+        return cursor
+
+    def encode_cursor(self, cursor):
+        """Codifica o cursor em base64 url-safe, sem padding."""
+        raw = json.dumps(cursor, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def get_next_link(self):
+        """Retorna a URL da próxima página, preservando filtros, busca e ordenação."""
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        scheme, netloc, path, query, fragment = urlsplit(url)
+        params = parse_qs(query, keep_blank_values=True)
+        params[self.cursor_query_param] = [self.encode_cursor(self.next_cursor)]
+        return urlunsplit((scheme, netloc, path, urlencode(params, doseq=True), fragment))
+
+    @staticmethod
+    def serialize_value(value):
+        """Converte o valor do campo de ordenação para algo representável em JSON."""
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
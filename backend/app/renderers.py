@@ -0,0 +1,74 @@
+"""Renderer e parser JSON baseados em orjson, compatíveis com os do DRF."""
+
+import codecs
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+# Datetimes vão para o encoder do DRF para manter o formato das respostas
+# (milissegundos e 'Z' em UTC); o resto dos tipos nativos o orjson resolve sozinho.
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+_LINE_SEPARATOR = '\u2028'.encode()
+_PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Gera o mesmo JSON compacto do JSONRenderer usando orjson. Decimal, timedelta,
+    strings lazy, querysets e demais tipos fora do JSON passam pelo encoder do DRF.
+    Saída indentada (API navegável ou 'indent=' no Accept) continua com o json da
+    biblioteca padrão.
+    """
+
+    encoder = encoders.JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.encoder.default, option=ORJSON_OPTIONS)
+        # Assim como o JSONRenderer, escapa U+2028 e U+2029 para o JSON ser JavaScript válido.
+        if _LINE_SEPARATOR in ret or _PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(_LINE_SEPARATOR, b'\\u2028').replace(_PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """Lê o corpo JSON da requisição com orjson (que já rejeita NaN e Infinity)."""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            raw = stream.read()
+            if codecs.lookup(encoding).name != 'utf-8':
+                raw = raw.decode(encoding)
+            return orjson.loads(raw)
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}') from exc
+
+
+class NDJSONRenderer(ORJSONRenderer):
+    """
+    JSON delimitado por linhas ('application/x-ndjson'): uma lista vira um objeto por
+    linha e qualquer outro valor (como um erro) vira uma única linha.
+    """
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        render = super().render
+        if isinstance(data, list):
+            return b''.join(render(item) + b'\n' for item in data)
+        return render(data) + b'\n'
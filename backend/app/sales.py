@@ -0,0 +1,67 @@
+"""Rollup de unidades vendidas por produto, mantido a cada mudança de status de pedido."""
+
+from django.db import transaction
+from django.db.models import Case, F, Q, Sum, Value, When
+from django.utils import timezone
+
+from .catalog_cache import bump_catalog_version
+from .models import Pedido, Produto, ProdutoCarrinho
+
+# 'aprovado' vem de process_payment; 'approved' é o status do Mercado Pago gravado pelo webhook.
+APPROVED_STATUSES = ('aprovado', 'approved')
+
+
+def _add_to_rollup(totals, sign):
+    """Soma (ou subtrai) as quantidades {produto_id: unidades} com um único UPDATE."""
+    whens = [When(pk=pid, then=Value(sign * total)) for pid, total in totals.items()]
+    Produto.objects.filter(pk__in=list(totals)).update( # pylint: disable=no-member
+        vendidos=F('vendidos') + Case(*whens, default=Value(0)),
+        atualizado_em=timezone.now(),
+    )
+
+
+def sync_order_sales(pedido):
+    """
+    Deixa os itens do pedido somados em Produto.vendidos se, e só se, o pedido está
+    aprovado. A marcação 'vendas_contabilizadas' é trocada com um UPDATE condicional,
+    então notificações repetidas ou concorrentes contam o pedido uma única vez.
+    Retorna True se o rollup mudou; quem chama deve então invalidar o cache do catálogo.
+    """
+    approved = pedido.status in APPROVED_STATUSES
+    with transaction.atomic():
+        flipped = Pedido.objects.filter( # pylint: disable=no-member
+            pk=pedido.pk, vendas_contabilizadas=not approved
+        ).update(vendas_contabilizadas=approved)
+        pedido.vendas_contabilizadas = approved
+        if not flipped:
+            return False
+
+        totals = dict(
+            ProdutoCarrinho.objects.filter(id_carrinho=pedido.codigo_carrinho_id) # pylint: disable=no-member
+            .values_list('id_produto').annotate(total=Sum('quantidade')).order_by()
+        )
+        if totals:
+            _add_to_rollup(totals, 1 if approved else -1)
+    return bool(totals)
+
+
+def rebuild_sales_rollup():
+    """Recalcula Produto.vendidos do zero a partir dos pedidos aprovados."""
+    approved = Q(id_carrinho__pedido__status__in=APPROVED_STATUSES)
+    with transaction.atomic():
+        Pedido.objects.update( # pylint: disable=no-member
+            vendas_contabilizadas=Case(
+                When(status__in=APPROVED_STATUSES, then=Value(True)), default=Value(False)
+            )
+        )
+        totals = dict(
+            ProdutoCarrinho.objects.filter(approved) # pylint: disable=no-member
+            .values_list('id_produto').annotate(total=Sum('quantidade')).order_by()
+        )
+        Produto.objects.exclude(vendidos=0).update( # pylint: disable=no-member
+            vendidos=0, atualizado_em=timezone.now()
+        )
+        if totals:
+            _add_to_rollup(totals, 1)
+    bump_catalog_version()
+    return totals
@@ -0,0 +1,185 @@
+"""Busca textual de produtos: full-text no Postgres e índice invertido em memória nos demais bancos."""
+
+import math
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connection
+from django.db.models import Case, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+from .models import Produto
+
+# Configuração criada pela migração 0003: dicionário 'portuguese' precedido de 'unaccent'.
+SEARCH_CONFIG = 'portuguese_unaccent'
+
+# Nome da anotação com a relevância de cada produto na busca.
+RANK_ANNOTATION = 'relevancia'
+
+# Pesos por campo, equivalentes aos rótulos A/B/C usados na coluna 'busca'.
+FIELD_WEIGHTS = {
+    'titulo': 1.0,
+    'categoria': 0.4,
+    'material': 0.4,
+    'cor_padrao': 0.4,
+    'descricao': 0.2,
+}
+
+STOPWORDS = frozenset(
+    'a ao aos as com da das de do dos e em na nas no nos o os ou para pela pelas pelo pelos '
+    'por que se sem um uma umas uns'.split()
+)
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def fold(text):
+    """Remove acentos e converte para minúsculas ('Térmica' -> 'termica')."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def stem(word):
+    """
+    Radicalizador leve para português: remove plural e a vogal final, de modo que
+    'bolsas', 'bolsa' e 'bolso' caiam no mesmo radical. Espera a palavra já sem acentos.
+    """
+    if len(word) <= 3:
+        return word
+    for suffix, replacement in (('oes', 'ao'), ('aes', 'ao'), ('ais', 'al'), ('eis', 'el'),
+                                ('ns', 'm'), ('res', 'r'), ('zes', 'z'), ('ses', 's')):
+        if word.endswith(suffix):
+            word = word[:-len(suffix)] + replacement
+            break
+    else:
+        if word.endswith('s'):
+            word = word[:-1]
+    if len(word) >= 5 and word[-1] in 'aeo':
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Quebra o texto em radicais, ignorando acentos, caixa e stopwords."""
+    return [stem(t) for t in _TOKEN_RE.findall(fold(text)) if t not in STOPWORDS]
+
+
+class InvertedIndex:
+    """
+    Índice invertido em memória dos produtos, usado quando o banco não é Postgres
+    (por exemplo, o SQLite dos testes). O índice é montado sob demanda e descartado
+    a cada escrita em Produto (ver app/signals.py).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = None
+        self._doc_count = 0
+
+    def invalidate(self):
+        """Descarta o índice; ele será reconstruído na próxima busca."""
+        with self._lock:
+            self._postings = None
+
+    def _build(self):
+        postings = defaultdict(dict)
+        doc_count = 0
+        rows = Produto.objects.values_list('id', *FIELD_WEIGHTS) # pylint: disable=no-member
+        for row in rows.iterator(chunk_size=2000):
+            doc_count += 1
+            product_id = row[0]
+            for field, text in zip(FIELD_WEIGHTS, row[1:]):
+                weight = FIELD_WEIGHTS[field]
+                for token in tokenize(text):
+                    scores = postings[token]
+                    scores[product_id] = scores.get(product_id, 0.0) + weight
+        return dict(postings), doc_count
+
+    def _get_postings(self):
+        with self._lock:
+            if self._postings is None:
+                self._postings, self._doc_count = self._build()
+            return self._postings, self._doc_count
+
+    def search(self, text):
+        """
+        Retorna {id: relevância} dos produtos que contêm todos os termos buscados,
+        pontuados por peso do campo e IDF de cada termo.
+        """
+        terms = set(tokenize(text))
+        if not terms:
+            return {}
+        postings, doc_count = self._get_postings()
+
+        scores = None
+        for term in terms:
+            docs = postings.get(term)
+            if not docs:
+                return {}
+            idf = math.log(1 + doc_count / len(docs))
+            if scores is None:
+                scores = {pid: w * idf for pid, w in docs.items()}
+            else:
+                scores = {pid: s + docs[pid] * idf for pid, s in scores.items() if pid in docs}
+            if not scores:
+                return {}
+        return scores
+
+
+product_index = InvertedIndex()
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """
+    Substitui o 'icontains' do SearchFilter por uma busca indexada e ranqueada.
+
+    No Postgres usa a coluna 'busca' (tsvector com índice GIN) e 'ts_rank'; nos outros
+    bancos usa o índice invertido em memória. Em ambos os casos anota a relevância em
+    'relevancia', usada como ordenação padrão pelo ProductOrderingFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').replace('\x00', '').strip()
+        if not text:
+            return queryset
+
+        if connection.vendor == 'postgresql':
+            return self.postgres_search(queryset, text)
+        return self.index_search(queryset, text)
+
+    @staticmethod
+    def postgres_search(queryset, text):
+        """Filtra com '@@' sobre a coluna indexada e anota o 'ts_rank'."""
+        table = queryset.model._meta.db_table # pylint: disable=protected-access
+        vector = RawSQL(f'"{table}"."busca"', [], output_field=SearchVectorField())
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        return queryset.alias(busca=vector).filter(busca=query).annotate(
+            **{RANK_ANNOTATION: SearchRank(vector, query)}
+        )
+
+    @staticmethod
+    def index_search(queryset, text):
+        """Filtra pelos ids encontrados no índice invertido e anota a relevância."""
+        scores = product_index.search(text)
+        if not scores:
+            return queryset.none()
+        relevance = Case(
+            *[When(pk=pid, then=Value(score)) for pid, score in scores.items()],
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=list(scores)).annotate(**{RANK_ANNOTATION: relevance})
+
+
+class ProductOrderingFilter(filters.OrderingFilter):
+    """OrderingFilter que, numa busca sem '?ordering=', ordena pela relevância."""
+
+    def get_ordering(self, request, queryset, view):
+        if (not request.query_params.get(self.ordering_param)
+                and RANK_ANNOTATION in queryset.query.annotations):
+            return [f'-{RANK_ANNOTATION}', '-id']
+        return super().get_ordering(request, queryset, view)
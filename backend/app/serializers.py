@@ -1,10 +1,17 @@
 """Serializers para o app"""
 
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
+from rest_framework.fields import get_error_detail
 from . import models
 from app.models import ProdutoImagem, Pedido
 from .models import Carrinho, Cor, Personalizacao, Produto, ProdutoCarrinho, Pedido
-from .utils.supabase_utils import upload_file_object_to_supabase
+from .derivatives import srcset
+from .direct_upload import ALLOWED_EXTENSIONS, DirectUploadError, read_ticket
+from .image_pipeline import spool_image, spool_images
+from .storage import UploadTooLarge
+from django.conf import settings
+from django.db import transaction
 import re
 
 class ProdutoImagemSerializer(serializers.ModelSerializer):
@@ -117,6 +124,7 @@ class OrderSerializer(serializers.ModelSerializer):
             # 2. Pega todos os itens (ProdutoCarrinho) que pertencem a esse carrinho.
             # A forma padrão de fazer isso é usando 'produtocarrinho_set.all()'.
             # Se isto não funcionar, o problema está no 'related_name' do seu modelo.
+            # Com Pedido.objects.with_cart_items() os itens já vêm do cache de prefetch.
             itens_do_carrinho = carrinho.produtocarrinho_set.all()
 
             # 3. Usa o ItensDoPedidoSerializer que já criamos para formatar os dados
@@ -222,30 +230,171 @@ class OrderSerializer(serializers.ModelSerializer):
 
 """Serializers para o app de produtos."""
 
+def validate_upload_size(arquivo):
+    """Recusa, antes de gravar no spool, arquivos acima de IMAGE_UPLOAD_MAX_SIZE."""
+    max_size = settings.IMAGE_UPLOAD_MAX_SIZE
+    if arquivo.size is not None and arquivo.size > max_size:
+        raise serializers.ValidationError(str(UploadTooLarge(max_size)))
+
+def upload_too_large(field, exc):
+    """Erro 400 do campo 'field' para um arquivo que passou do limite no spool."""
+    return serializers.ValidationError({field: [str(exc)]})
+
 class ProdutoImagemSerializer(serializers.ModelSerializer):
     """Serializer para imagem"""
-    imagem = serializers.ImageField(write_only=True)
+    imagem = serializers.ImageField(write_only=True, validators=[validate_upload_size])
     url = serializers.URLField(read_only=True)
+    srcset = serializers.SerializerMethodField()
 
     class Meta: # pylint: disable=too-few-public-methods
         """Metainformações do ProdutoImagemSerializer."""
         model = models.ProdutoImagem
-        fields = ['id', 'produto', 'imagem', 'url', 'criado_em']
+        fields = ['id', 'produto', 'imagem', 'url', 'srcset', 'criado_em']
         read_only_fields = ['id', 'url', 'criado_em']
 
+    def get_srcset(self, obj):
+        """Versões reduzidas por formato ('avif', 'webp', 'jpeg'), no formato do srcset."""
+        return srcset(obj.derivadas)
+
     def create(self, validated_data):
-        imagem_file = validated_data.pop("imagem")
-        url = upload_file_object_to_supabase(imagem_file, imagem_file.content_type)
-        if not url:
-            raise serializers.ValidationError("Erro ao fazer upload da imagem para o Supabase.")
-        return models.ProdutoImagem.objects.create(url=url, **validated_data)
+        """
+        Grava o arquivo no spool e cria a imagem em 'processando'; o upload para o
+        Supabase acontece depois, no pipeline de imagens.
+        """
+        try:
+            return spool_image(validated_data['produto'], validated_data['imagem'])
+        except UploadTooLarge as exc:
+            raise upload_too_large('imagem', exc) from exc
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ImagensProntasSerializer(serializers.ListSerializer): # pylint: disable=abstract-method
+    """
+    Imagens de um produto sem as que ainda estão no pipeline, também nas respostas
+    de criação e atualização. Filtra em Python para aproveitar o prefetch das rotas
+    de leitura, que já traz só as prontas.
+    """
+
+    def to_representation(self, data):
+        imagens = data.all() if hasattr(data, 'all') else data
+        return super().to_representation(
+            [imagem for imagem in imagens if imagem.status == ProdutoImagem.Status.PRONTA]
+        )
+
+class ProdutoImagemStatusSerializer(ProdutoImagemSerializer):
+    """Imagem com a etapa do pipeline, para acompanhar um upload em andamento."""
+
+    class Meta(ProdutoImagemSerializer.Meta): # pylint: disable=too-few-public-methods
+        """Metainformações do ProdutoImagemStatusSerializer."""
+        fields = ProdutoImagemSerializer.Meta.fields + ['status', 'erro']
+        read_only_fields = ProdutoImagemSerializer.Meta.read_only_fields + ['status', 'erro']
+
+class ProdutoImagemLoteSerializer(serializers.Serializer): # pylint: disable=abstract-method
+    """
+    Várias imagens para um mesmo produto. Cada arquivo é validado separadamente:
+    os inválidos vão para 'erros' sem impedir o envio dos demais.
+    """
+    max_arquivos = 20
+
+    produto = serializers.PrimaryKeyRelatedField(queryset=models.Produto.objects.all())
+    imagens = serializers.ListField(
+        child=serializers.FileField(), allow_empty=False, max_length=max_arquivos
+    )
+
+    def validate(self, attrs):
+        validas, erros = [], []
+        for arquivo in attrs['imagens']:
+            try:
+                validas.append(
+                    serializers.ImageField(validators=[validate_upload_size]).run_validation(arquivo)
+                )
+            except serializers.ValidationError as exc:
+                erros.append({'arquivo': arquivo.name, 'erros': exc.detail})
+            except DjangoValidationError as exc:
+                # O ImageField do DRF repassa o erro do ImageField do Django.
+                erros.append({'arquivo': arquivo.name, 'erros': get_error_detail(exc)})
+        if not validas:
+            raise serializers.ValidationError({'imagens': erros})
+        attrs['imagens'], attrs['erros'] = validas, erros
+        return attrs
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return spool_images(validated_data['produto'], validated_data['imagens'])
+        except UploadTooLarge as exc:
+            raise upload_too_large('imagens', exc) from exc
+
+class UploadDiretoSerializer(serializers.Serializer): # pylint: disable=abstract-method
+    """Pedido de URL assinada para enviar uma imagem direto ao bucket."""
+    produto = serializers.PrimaryKeyRelatedField(queryset=models.Produto.objects.all())
+    nome = serializers.CharField(max_length=255)
+
+    def validate_nome(self, value):
+        """Aceita só extensões de imagem; retorna a extensão em minúsculas."""
+        extensao = value.rsplit('.', 1)[-1].lower() if '.' in value else ''
+        if extensao not in ALLOWED_EXTENSIONS:
+            raise serializers.ValidationError(
+                f"Extensão não permitida. Use: {', '.join(ALLOWED_EXTENSIONS)}.")
+        return extensao
+
+class FinalizarUploadSerializer(serializers.Serializer): # pylint: disable=abstract-method
+    """Ticket devolvido pelo cliente depois de enviar o arquivo ao bucket."""
+    ticket = serializers.CharField()
+
+    def validate_ticket(self, value):
+        """Confere a assinatura e o prazo do ticket e retorna o produto e o caminho."""
+        try:
+            dados = read_ticket(value)
+        except DirectUploadError as exc:
+            raise serializers.ValidationError(str(exc)) from exc
+        produto = models.Produto.objects.filter(pk=dados['produto']).first()
+        if produto is None:
+            raise serializers.ValidationError("Produto não encontrado.")
+        return {'produto': produto, 'caminho': dados['caminho']}
+
+class SparseFieldsMixin:
+    """
+    Permite que o cliente escolha os campos da resposta com '?fields=a,b' ou com
+    uma projeção pronta em '?view=<nome>' (definidas em 'field_views').
+    """
+    field_views = {}
+
+    @classmethod
+    def requested_fields(cls, request):
+        """Retorna os campos pedidos na requisição GET ou None para todos."""
+        if request is None or request.method != 'GET':
+            return None
+
+        view = request.query_params.get('view')
+        if view in cls.field_views:
+            names = set(cls.field_views[view])
+        else:
+            raw = request.query_params.get('fields', '')
+            names = {name.strip() for name in raw.split(',') if name.strip()}
+
+        selected = [name for name in cls.Meta.fields if name in names]
+        return selected or None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.requested_fields(self.context.get('request'))
+        if selected is not None:
+            for name in set(self.fields) - set(selected):
+                self.fields.pop(name)
+
+
+class ProductListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para listar e CRIAR produtos.
     """
-    imagens = ProdutoImagemSerializer(many=True, read_only=True)
-    imagem = serializers.ImageField(write_only=True, required=True)
+    imagens = ImagensProntasSerializer(child=ProdutoImagemSerializer(), read_only=True)
+    imagem = serializers.ImageField(
+        write_only=True, required=True, validators=[validate_upload_size]
+    )
+
+    field_views = {
+        'card': ['id', 'titulo', 'categoria', 'preco', 'quantidade', 'material',
+                 'cor_padrao', 'imagens'],
+    }
 
     class Meta:
         model = models.Produto
@@ -258,17 +407,17 @@ class ProductListSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         """
-        3. MUDANÇA: Este método customizado contém a nova lógica de criação.
+        Cria o produto e deixa a imagem no pipeline de imagens; ela aparece no
+        catálogo quando o upload terminar.
         """
 
         imagem_data = validated_data.pop('imagem')
-        produto = models.Produto.objects.create(**validated_data)
-        imagem_url = upload_file_object_to_supabase(imagem_data, imagem_data.content_type)
-
-        if not imagem_url:
-            produto.delete()
-            raise serializers.ValidationError("Falha no upload da imagem.")
-        models.ProdutoImagem.objects.create(produto=produto, url=imagem_url)
+        try:
+            with transaction.atomic():
+                produto = models.Produto.objects.create(**validated_data)
+                spool_image(produto, imagem_data)
+        except UploadTooLarge as exc:
+            raise upload_too_large('imagem', exc) from exc
 
         return produto
 
@@ -367,14 +516,54 @@ class ProductListSerializer(serializers.ModelSerializer):
         return value
 
 
+class ProductPriceStockSerializer(serializers.Serializer): # pylint: disable=abstract-method
+    """
+    Serializer para um item da atualização em lote de preço/estoque.
+    Usa as mesmas validações de preço e quantidade do cadastro de produtos.
+    """
+    id = serializers.IntegerField()
+    preco = serializers.FloatField(required=False)
+    quantidade = serializers.IntegerField(required=False)
+
+    validate_preco = ProductListSerializer.validate_preco
+    validate_quantidade = ProductListSerializer.validate_quantidade
+
+    def validate(self, attrs):
+        """Exige ao menos um dos campos a atualizar."""
+        if 'preco' not in attrs and 'quantidade' not in attrs:
+            raise serializers.ValidationError("Informe 'preco' e/ou 'quantidade'.")
+        return attrs
+
+
+class ProductPriceStockListSerializer(serializers.ListSerializer): # pylint: disable=abstract-method
+    """Lista de itens da atualização em lote, sem ids repetidos."""
+
+    child = ProductPriceStockSerializer()
+
+    def __init__(self, *args, **kwargs):
+        # O ListSerializer lê estes limites só dos kwargs, não de atributos da classe.
+        kwargs.setdefault('allow_empty', False)
+        kwargs.setdefault('max_length', 1000)
+        super().__init__(*args, **kwargs)
+
+    def validate(self, attrs):
+        """Não permite o mesmo produto duas vezes no lote."""
+        ids = [item['id'] for item in attrs]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Há produtos repetidos no lote.")
+        return attrs
+
+
 class ProductDetailSerializer(serializers.ModelSerializer):
     """
     Serializer para detalhes e ATUALIZAÇÃO de um produto.
 
     """
 
-    imagens = ProdutoImagemSerializer(many=True, read_only=True)
-    imagem = serializers.ImageField(write_only=True, required=False)
+    imagens = ImagensProntasSerializer(child=ProdutoImagemSerializer(), read_only=True)
+    imagem = serializers.ImageField(
+        write_only=True, required=False, validators=[validate_upload_size]
+    )
 
     class Meta:
         model = models.Produto
@@ -390,17 +579,15 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         """
 
         imagem_data = validated_data.pop('imagem', None)
-        instance = super().update(instance, validated_data)
-
-        if imagem_data:
-            instance.imagens.all().delete()
-
-            imagem_url = upload_file_object_to_supabase(imagem_data, imagem_data.content_type)
-
-            if imagem_url:
-                models.ProdutoImagem.objects.create(produto=instance, url=imagem_url)
-            else:
-                raise serializers.ValidationError("Falha no upload da nova imagem.")
+        try:
+            with transaction.atomic():
+                instance = super().update(instance, validated_data)
+
+                if imagem_data:
+                    # A nova imagem segue pelo pipeline e substitui as atuais quando ficar pronta.
+                    spool_image(instance, imagem_data, replace=True)
+        except UploadTooLarge as exc:
+            raise upload_too_large('imagem', exc) from exc
 
         return instance
 
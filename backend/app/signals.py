@@ -0,0 +1,79 @@
+"""Receivers de sinais dos modelos do app."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .catalog_cache import bump_catalog_version
+from .models import Pedido, Produto, ProdutoImagem
+from .sales import APPROVED_STATUSES, sync_order_sales
+from .search import product_index
+from .similar import similar_index
+from .snapshots import schedule_snapshot
+from .suggest import suggest_index
+
+
+def catalog_changed():
+    """
+    Descarta os índices em memória e invalida o cache do catálogo.
+
+    Chamada explicitamente por escritas em lote (bulk_create/bulk_update/update),
+    que não disparam sinais.
+    """
+    product_index.invalidate()
+    suggest_index.invalidate()
+    similar_index.invalidate()
+    bump_catalog_version()
+    schedule_snapshot()
+
+
+def _bump_keeping_indexes():
+    """Invalida o cache do catálogo por uma mudança que não afeta os índices em memória."""
+    bump_catalog_version([(suggest_index, None), (similar_index, None)])
+
+
+@receiver(post_save, sender=Produto)
+def produto_saved(sender, instance, **kwargs): # pylint: disable=unused-argument
+    """Um produto foi criado ou alterado; os índices incrementais são atualizados só para ele."""
+    product_index.invalidate()
+    bump_catalog_version([
+        (suggest_index, lambda: suggest_index.update_product(instance)),
+        (similar_index, lambda: similar_index.update_product(instance)),
+    ])
+    schedule_snapshot()
+
+
+@receiver(post_delete, sender=Produto)
+def produto_deleted(sender, instance, **kwargs): # pylint: disable=unused-argument
+    """Um produto foi removido."""
+    product_index.invalidate()
+    pid = instance.pk
+    bump_catalog_version([
+        (suggest_index, lambda: suggest_index.remove_product(pid)),
+        (similar_index, lambda: similar_index.remove_product(pid)),
+    ])
+    schedule_snapshot()
+
+
+@receiver(post_save, sender=ProdutoImagem)
+@receiver(post_delete, sender=ProdutoImagem)
+def produto_imagem_changed(sender, instance, signal, **kwargs): # pylint: disable=unused-argument
+    """As imagens fazem parte das respostas do catálogo, então também o invalidam."""
+    if signal is post_delete:
+        # Imagens novas são achadas pelo 'criado_em'; a remoção marca o produto como
+        # alterado para o snapshot incremental regravar a página dele.
+        Produto.objects.filter(pk=instance.produto_id).update(atualizado_em=timezone.now()) # pylint: disable=no-member
+    _bump_keeping_indexes()
+    schedule_snapshot()
+
+
+@receiver(post_save, sender=Pedido)
+def pedido_saved(sender, instance, created, **kwargs): # pylint: disable=unused-argument
+    """
+    Mantém o rollup de vendas quando o pedido entra ou sai de um status aprovado,
+    seja por process_payment, pelo webhook do Mercado Pago ou pela API de pedidos.
+    """
+    if created and instance.status not in APPROVED_STATUSES:
+        return
+    if sync_order_sales(instance):
+        _bump_keeping_indexes()
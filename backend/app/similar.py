@@ -0,0 +1,201 @@
+"""Produtos semelhantes por vizinhos mais próximos sobre os atributos do produto."""
+
+import numpy as np
+
+from .catalog_cache import VersionedIndex
+from .models import Produto
+from .search import fold
+
+NUMERIC_FIELDS = ('preco', 'altura', 'comprimento', 'largura')
+CATEGORICAL_FIELDS = ('categoria', 'material', 'cor_padrao')
+TOP_K = 12
+# Linhas por bloco no produto de matrizes, limitando a memória a BLOCK_SIZE x n.
+BLOCK_SIZE = 512
+# Acima disso, uma atualização incremental custaria mais que remontar tudo.
+MAX_AFFECTED = 256
+
+
+def _category(value):
+    return fold(value).strip() if value else None
+
+
+class SimilarIndex(VersionedIndex):
+    """
+    Matriz de atributos com uma linha por produto (dimensões e preço normalizados
+    entre 0 e 1 e one-hot de categoria, material e cor), com as linhas normalizadas
+    para que o produto escalar seja a similaridade do cosseno. Guarda os 'k' vizinhos
+    mais próximos de cada produto, calculados em blocos na montagem.
+
+    Quando um produto muda, só a linha dele e as linhas que o tinham (ou passam a
+    tê-lo) entre os vizinhos são recalculadas. Se o produto sai das faixas de
+    normalização ou traz um valor categórico novo, o índice é remontado.
+    """
+
+    def __init__(self, k=TOP_K):
+        super().__init__()
+        self.k = k
+        self._ids = np.empty(0, dtype=np.int64)
+        self._pos = {}
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._alive = np.empty(0, dtype=bool)
+        self._neighbours = np.empty((0, k), dtype=np.int64)
+        self._low = self._span = self._fill = None
+        self._columns = {}
+
+    def _vector(self, numeric, categorical):
+        """Linha da matriz para um produto, ou None se ela exigir nova normalização."""
+        vector = np.zeros(self._matrix.shape[1], dtype=np.float32)
+        values = np.array([np.nan if v is None else float(v) for v in numeric])
+        values = np.where(np.isnan(values), self._fill, values)
+        scaled = (values - self._low) / self._span
+        if np.any(scaled < 0) or np.any(scaled > 1):
+            return None
+        vector[:len(NUMERIC_FIELDS)] = scaled
+        for field, value in zip(CATEGORICAL_FIELDS, categorical):
+            value = _category(value)
+            if value is None:
+                continue
+            column = self._columns[field].get(value)
+            if column is None:
+                return None
+            vector[column] = 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _build(self):
+        fields = ('id',) + NUMERIC_FIELDS + CATEGORICAL_FIELDS
+        rows = list(
+            Produto.objects.values_list(*fields).iterator(chunk_size=2000) # pylint: disable=no-member
+        )
+        size = len(rows)
+        self._ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self._pos = {pid: i for i, pid in enumerate(self._ids.tolist())}
+        self._alive = np.ones(size, dtype=bool)
+
+        numeric = np.array(
+            [[np.nan if v is None else float(v) for v in row[1:1 + len(NUMERIC_FIELDS)]]
+             for row in rows], dtype=np.float64,
+        ).reshape(size, len(NUMERIC_FIELDS))
+        present = ~np.isnan(numeric)
+        counts = present.sum(axis=0)
+        low = np.where(present, numeric, np.inf).min(axis=0, initial=np.inf)
+        high = np.where(present, numeric, -np.inf).max(axis=0, initial=-np.inf)
+        self._low = np.where(counts, low, 0.0)
+        high = np.where(counts, high, 0.0)
+        self._span = np.where(high > self._low, high - self._low, 1.0)
+        self._fill = np.where(
+            counts, np.where(present, numeric, 0.0).sum(axis=0) / np.maximum(counts, 1), 0.0
+        )
+
+        width = len(NUMERIC_FIELDS)
+        self._columns = {}
+        column = width
+        for offset, field in enumerate(CATEGORICAL_FIELDS):
+            values = sorted({_category(row[1 + width + offset]) for row in rows} - {None})
+            self._columns[field] = {value: column + i for i, value in enumerate(values)}
+            column += len(values)
+
+        self._matrix = np.zeros((size, column), dtype=np.float32)
+        for i, row in enumerate(rows):
+            self._matrix[i] = self._vector(row[1:1 + width], row[1 + width:])
+
+        self._neighbours = np.full((size, self.k), -1, dtype=np.int64)
+        for start in range(0, size, BLOCK_SIZE):
+            self._compute_rows(np.arange(start, min(start + BLOCK_SIZE, size)))
+
+    def _compute_rows(self, rows):
+        """Recalcula os vizinhos das linhas informadas com um produto de matrizes."""
+        if not len(rows):
+            return
+        scores = self._matrix[rows] @ self._matrix.T
+        scores[:, ~self._alive] = -np.inf
+        scores[np.arange(len(rows)), rows] = -np.inf
+
+        k = min(self.k, scores.shape[1])
+        if k < scores.shape[1]:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.tile(np.arange(scores.shape[1]), (len(rows), 1))
+
+        self._neighbours[rows] = -1
+        for i, row in enumerate(rows):
+            best = candidates[i]
+            best_scores = scores[i, best]
+            # Maior similaridade primeiro; empates pelo menor id.
+            order = np.lexsort((self._ids[best], -best_scores))
+            best = best[order][np.isfinite(best_scores[order])]
+            self._neighbours[row, :len(best)] = best
+
+    def _threshold(self, rows):
+        """Similaridade do k-ésimo vizinho de cada linha (-inf se a lista não está cheia)."""
+        last = self._neighbours[rows, -1]
+        scores = np.full(len(rows), -np.inf, dtype=np.float32)
+        full = last >= 0
+        scores[full] = np.einsum(
+            'ij,ij->i', self._matrix[rows[full]], self._matrix[last[full]]
+        )
+        return scores
+
+    def _refresh_around(self, row):
+        """Recalcula a linha alterada e as que a tinham ou passam a tê-la como vizinha."""
+        alive = np.flatnonzero(self._alive)
+        affected = np.any(self._neighbours[alive] == row, axis=1)
+        if self._alive[row]:
+            scores = self._matrix[alive] @ self._matrix[row]
+            affected |= scores > self._threshold(alive)
+        affected = alive[affected & (alive != row)]
+        if len(affected) > MAX_AFFECTED:
+            self.invalidate()
+            return
+        self._compute_rows(np.append(affected, row) if self._alive[row] else affected)
+
+    def _update(self, produto):
+        numeric = [getattr(produto, f) for f in NUMERIC_FIELDS]
+        categorical = [getattr(produto, f) for f in CATEGORICAL_FIELDS]
+        vector = self._vector(numeric, categorical)
+        if vector is None:
+            self.invalidate()
+            return
+
+        row = self._pos.get(produto.pk)
+        if row is None:
+            row = len(self._ids)
+            self._pos[produto.pk] = row
+            self._ids = np.append(self._ids, produto.pk)
+            self._alive = np.append(self._alive, True)
+            self._matrix = np.vstack([self._matrix, vector])
+            self._neighbours = np.vstack(
+                [self._neighbours, np.full((1, self.k), -1, dtype=np.int64)]
+            )
+        else:
+            self._matrix[row] = vector
+        self._refresh_around(row)
+
+    def _remove(self, pid):
+        row = self._pos.pop(pid, None)
+        if row is None:
+            return
+        self._alive[row] = False
+        self._refresh_around(row)
+
+    def update_product(self, produto):
+        """Atualiza a linha de um produto criado ou alterado."""
+        self._update(produto)
+
+    def remove_product(self, pid):
+        """Tira um produto das listas de vizinhos."""
+        self._remove(pid)
+
+    def similar(self, pid, limit=None):
+        """Ids dos produtos mais semelhantes a 'pid' (do mais ao menos), ou None se não existe."""
+        with self._lock:
+            self.ensure_current()
+            row = self._pos.get(pid)
+            if row is None:
+                return None
+            neighbours = self._neighbours[row]
+            ids = self._ids[neighbours[neighbours >= 0]].tolist()
+            return ids[:limit] if limit else ids
+
+
+similar_index = SimilarIndex()
@@ -0,0 +1,195 @@
+"""
+Snapshot estático do catálogo para servir por CDN: um manifesto e páginas JSON por
+categoria, com o hash do conteúdo no nome para poderem ficar em cache para sempre.
+"""
+
+import hashlib
+import logging
+import threading
+from itertools import islice
+
+import orjson
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+
+from .models import Produto, ProdutoImagem
+from .renderers import ORJSONRenderer
+from .serializers import ProductListSerializer
+
+logger = logging.getLogger(__name__)
+
+STORAGE_ALIAS = 'catalog_snapshots'
+PREFIX = 'catalogo'
+MANIFEST_NAME = f'{PREFIX}/manifest.json'
+# Produto -> categoria do último snapshot, para saber de onde um produto saiu.
+INDEX_NAME = f'{PREFIX}/indice.json'
+LOCK_KEY = 'snapshots:lock'
+LOCK_TIMEOUT = 15 * 60
+
+
+def snapshot_settings():
+    """Configuração CATALOG_SNAPSHOTS com os valores padrão."""
+    return {'PAGE_SIZE': 100, 'AUTO': False, 'DELAY': 10, **getattr(settings, 'CATALOG_SNAPSHOTS', {})}
+
+
+def _read_json(storage, name):
+    if not storage.exists(name):
+        return None
+    with storage.open(name) as arquivo:
+        return orjson.loads(arquivo.read())
+
+
+def _write(storage, name, body):
+    # Os dois backends configurados sobrescrevem no lugar (upsert no Supabase,
+    # 'allow_overwrite' na pasta local): o manifesto nunca fica ausente para quem lê.
+    storage.save(name, ContentFile(body))
+
+
+def _changed_categories(previous, index):
+    """
+    Categorias cujas páginas podem ter mudado desde o snapshot anterior: as dos
+    produtos alterados (antes e depois da mudança), dos produtos com imagens novas
+    e dos produtos removidos.
+    """
+    since = parse_datetime(previous['gerado_em'])
+    changed = set(
+        Produto.objects.filter(atualizado_em__gte=since).values_list('id', flat=True) # pylint: disable=no-member
+    ) | set(
+        ProdutoImagem.objects.filter(criado_em__gte=since).values_list('produto_id', flat=True) # pylint: disable=no-member
+    )
+    current = dict(Produto.objects.values_list('id', 'categoria')) # pylint: disable=no-member
+    removed = {int(pid) for pid in index} - set(current)
+
+    categories = {index.get(str(pid)) for pid in changed | removed}
+    categories |= {current[pid] for pid in changed if pid in current}
+    categories.discard(None)
+    return categories
+
+
+def _render_category(storage, categoria, page_size, report):
+    """Grava as páginas de uma categoria e retorna (entrada do manifesto, ids)."""
+    renderer = ORJSONRenderer()
+    produtos = (
+        Produto.objects.filter(categoria=categoria).order_by('id') # pylint: disable=no-member
+        .with_images().iterator(chunk_size=page_size)
+    )
+    pages, ids = [], []
+    while True:
+        page = list(islice(produtos, page_size))
+        if not page:
+            break
+        body = renderer.render({
+            'categoria': categoria,
+            'pagina': len(pages) + 1,
+            'produtos': ProductListSerializer(page, many=True).data,
+        })
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        name = f'{PREFIX}/{slugify(categoria) or "sem-categoria"}/{len(pages) + 1}.{digest}.json'
+        # O nome muda com o conteúdo; se já existe, a página não mudou.
+        if not storage.exists(name):
+            storage.save(name, ContentFile(body))
+            report['gravadas'] += 1
+        pages.append(name)
+        ids.extend(p.id for p in page)
+    return {'total': len(ids), 'paginas': pages}, ids
+
+
+def generate_snapshot(full=False):
+    """
+    Gera ou atualiza o snapshot. Sem 'full', só as categorias com produtos alterados
+    desde o snapshot anterior são lidas e só as páginas com conteúdo novo são
+    gravadas. Retorna um relatório, ou None se outra geração já está em andamento.
+    """
+    if not cache.add(LOCK_KEY, 1, LOCK_TIMEOUT):
+        return None
+    try:
+        storage = storages[STORAGE_ALIAS]
+        page_size = snapshot_settings()['PAGE_SIZE']
+        started = timezone.now()
+        previous = _read_json(storage, MANIFEST_NAME)
+        index = _read_json(storage, INDEX_NAME) or {}
+
+        if full or previous is None or previous.get('tamanho_pagina') != page_size:
+            categories = set(
+                Produto.objects.values_list('categoria', flat=True).distinct() # pylint: disable=no-member
+            ) | set(index.values())
+            entries, index = {}, {}
+        else:
+            categories = _changed_categories(previous, index)
+            entries = dict(previous['categorias'])
+
+        report = {'categorias': sorted(categories), 'gravadas': 0, 'removidas': 0}
+        for categoria in categories:
+            entry, ids = _render_category(storage, categoria, page_size, report)
+            index = {pid: cat for pid, cat in index.items() if cat != categoria}
+            index.update({str(pid): categoria for pid in ids})
+            if ids:
+                entries[categoria] = entry
+            else:
+                entries.pop(categoria, None)
+
+        manifest = {
+            'gerado_em': started.isoformat(),
+            'tamanho_pagina': page_size,
+            'categorias': dict(sorted(entries.items())),
+        }
+        _write(storage, INDEX_NAME, orjson.dumps(index))
+        _write(storage, MANIFEST_NAME, orjson.dumps(manifest))
+
+        # Páginas que saíram do manifesto só são apagadas depois que o novo foi publicado.
+        if previous is not None:
+            current = {name for entry in entries.values() for name in entry['paginas']}
+            for entry in previous['categorias'].values():
+                for name in set(entry['paginas']) - current:
+                    storage.delete(name)
+                    report['removidas'] += 1
+        return report
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+_timer_lock = threading.Lock()
+_timer = None
+
+
+def _arm(delay):
+    """Agenda uma geração para daqui a 'delay' segundos, se ainda não há uma agendada."""
+    global _timer # pylint: disable=global-statement
+    with _timer_lock:
+        if _timer is None:
+            _timer = threading.Timer(delay, _run_scheduled)
+            _timer.daemon = True
+            _timer.start()
+
+
+def _run_scheduled():
+    global _timer # pylint: disable=global-statement
+    with _timer_lock:
+        _timer = None
+    try:
+        if generate_snapshot() is None:
+            # Outra geração está em andamento e pode ter lido o catálogo antes desta
+            # escrita; tenta de novo em vez de esperar a próxima escrita.
+            _arm(snapshot_settings()['DELAY'])
+    except Exception: # pylint: disable=broad-exception-caught
+        logger.exception("Erro ao atualizar o snapshot do catálogo.")
+    finally:
+        close_old_connections()
+
+
+def schedule_snapshot():
+    """
+    Hook pós-escrita: com CATALOG_SNAPSHOTS['AUTO'] ligado, agenda uma atualização
+    incremental alguns segundos após o commit. Escritas em sequência são agrupadas
+    numa única geração.
+    """
+    config = snapshot_settings()
+    if not config['AUTO']:
+        return
+    transaction.on_commit(lambda: _arm(config['DELAY']))
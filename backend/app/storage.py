@@ -0,0 +1,198 @@
+"""Backends de armazenamento de arquivos (API de Storage do Django)."""
+
+import io
+import mimetypes
+import os
+import posixpath
+from datetime import datetime, timezone
+
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import FileSystemStorage, Storage
+from django.utils.dateparse import parse_datetime
+from django.utils.deconstruct import deconstructible
+
+# Tamanho dos blocos lidos do arquivo durante o envio.
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """O arquivo passou do limite de tamanho do storage durante a leitura."""
+
+    def __init__(self, max_size):
+        super().__init__(f"O arquivo passa do limite de {max_size} bytes.")
+        self.max_size = max_size
+
+
+class LimitedReader(io.RawIOBase):
+    """
+    Leitura em blocos de outro arquivo que falha assim que passa de 'max_size' bytes,
+    sem precisar saber o tamanho antes nem carregar o arquivo inteiro na memória.
+    """
+
+    def __init__(self, source, max_size=None):
+        super().__init__()
+        self.source = source
+        self.max_size = max_size
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self.source.read(len(buffer))
+        if not chunk:
+            return 0
+        self.bytes_read += len(chunk)
+        if self.max_size is not None and self.bytes_read > self.max_size:
+            raise UploadTooLarge(self.max_size)
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+class BoundedUploadMixin:
+    """Storage cujos envios são lidos em blocos e limitados a 'max_upload_size' bytes."""
+
+    max_upload_size = None
+
+    def stream(self, content):
+        """Leitor em blocos do conteúdo, a partir do início, com o limite de tamanho."""
+        content.seek(0)
+        return io.BufferedReader(LimitedReader(content, self.max_upload_size), CHUNK_SIZE)
+
+
+@deconstructible
+class SupabaseStorage(BoundedUploadMixin, Storage):
+    """
+    Storage do Django sobre um bucket público do Supabase Storage. Gravar num nome
+    que já existe sobrescreve o objeto (upsert), como o FileSystemStorage com
+    'allow_overwrite'. O corpo do upload é enviado em blocos pelo cliente HTTP.
+    """
+
+    def __init__(self, bucket='imagens-produtos', cache_control='3600', max_upload_size=None):
+        self.bucket = bucket
+        self.cache_control = cache_control
+        self.max_upload_size = max_upload_size
+
+    def _bucket(self):
+        # Import tardio: o módulo cria o cliente e exige as variáveis do Supabase.
+        from .utils.supabase_utils import supabase # pylint: disable=import-outside-toplevel
+        return supabase.storage.from_(self.bucket)
+
+    def _open(self, name, mode='rb'):
+        return ContentFile(self._bucket().download(name), name=name)
+
+    def _save(self, name, content):
+        content_type = (
+            getattr(content, 'content_type', None)
+            or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        )
+        self._bucket().upload(
+            path=name,
+            file=self.stream(content),
+            file_options={
+                'content-type': content_type,
+                'cache-control': self.cache_control,
+                'upsert': 'true',
+            },
+        )
+        return name
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def signed_upload(self, name):
+        """
+        URL assinada para o navegador enviar o arquivo direto ao bucket (PUT com o
+        token), sem passar pelo Django. O Supabase aceita o envio por 2 horas.
+        """
+        signed = self._bucket().create_signed_upload_url(name)
+        return {'url': signed['signed_url'], 'token': signed['token']}
+
+    def exists(self, name):
+        return self._bucket().exists(name)
+
+    def delete(self, name):
+        self._bucket().remove([name])
+
+    def url(self, name):
+        return self._bucket().get_public_url(name)
+
+    def listdir(self, path):
+        directories, files = [], []
+        for entry in self._bucket().list(path.rstrip('/') or None):
+            # Pastas vêm sem id na listagem do Supabase.
+            (files if entry.get('id') else directories).append(entry['name'])
+        return directories, files
+
+    def delete_many(self, names):
+        """Remove vários objetos numa única chamada."""
+        if names:
+            self._bucket().remove(list(names))
+
+    def iter_files(self, prefix='', page_size=1000):
+        """
+        Percorre os objetos abaixo de 'prefix' (incluindo subpastas), listando o
+        bucket em páginas de 'page_size'. Gera pares (nome, data de modificação).
+        """
+        pending = [prefix.strip('/')]
+        while pending:
+            folder = pending.pop()
+            offset = 0
+            while True:
+                entries = self._bucket().list(folder or None, {
+                    'limit': page_size, 'offset': offset,
+                    'sortBy': {'column': 'name', 'order': 'asc'},
+                })
+                for entry in entries:
+                    name = posixpath.join(folder, entry['name'])
+                    if entry.get('id'):
+                        yield name, parse_datetime(entry.get('updated_at') or entry['created_at'])
+                    else:
+                        pending.append(name)
+                if len(entries) < page_size:
+                    break
+                offset += page_size
+
+    def size(self, name):
+        directory, filename = posixpath.split(name)
+        for entry in self._bucket().list(directory or None, {'search': filename}):
+            if entry['name'] == filename:
+                return int((entry.get('metadata') or {}).get('size', 0))
+        raise FileNotFoundError(name)
+
+
+@deconstructible
+class LocalStorage(BoundedUploadMixin, FileSystemStorage):
+    """
+    Equivalente local do SupabaseStorage para desenvolvimento, testes e benchmarks:
+    sobrescreve nomes existentes e aplica o mesmo limite de tamanho, sem rede.
+    """
+
+    def __init__(self, max_upload_size=None, **kwargs):
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+        self.max_upload_size = max_upload_size
+
+    def delete_many(self, names):
+        """Remove vários arquivos."""
+        for name in names:
+            self.delete(name)
+
+    def iter_files(self, prefix='', page_size=1000): # pylint: disable=unused-argument
+        """Mesmo contrato do SupabaseStorage.iter_files, percorrendo a pasta local."""
+        root = self.path(prefix.strip('/') or '.')
+        for directory, _, files in os.walk(root):
+            for filename in sorted(files):
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.location).replace(os.sep, '/')
+                yield name, datetime.fromtimestamp(os.path.getmtime(path), tz=timezone.utc)
+
+    def _save(self, name, content):
+        try:
+            return super()._save(name, File(self.stream(content), name=name))
+        except UploadTooLarge:
+            # Não deixa um arquivo pela metade no lugar do nome pedido.
+            path = self.path(name)
+            if os.path.exists(path):
+                os.remove(path)
+            raise
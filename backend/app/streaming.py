@@ -0,0 +1,67 @@
+"""Listagens em streaming (array JSON ou NDJSON) com memória limitada a um lote."""
+
+from django.http import StreamingHttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.settings import api_settings
+
+from .renderers import NDJSONRenderer, ORJSONRenderer
+
+# Tamanho mínimo dos pedaços enviados ao servidor WSGI/ASGI.
+BUFFER_SIZE = 64 * 1024
+
+
+def iter_rendered(rows, ndjson):
+    """Codifica as linhas uma a uma como array JSON ou NDJSON, agrupando em blocos."""
+    renderer = ORJSONRenderer()
+    parts, size = [] if ndjson else [b'['], 0
+    for i, row in enumerate(rows):
+        body = renderer.render(row)
+        if ndjson:
+            body += b'\n'
+        elif i:
+            body = b',' + body
+        parts.append(body)
+        size += len(body)
+        if size >= BUFFER_SIZE:
+            yield b''.join(parts)
+            parts, size = [], 0
+    if not ndjson:
+        parts.append(b']')
+    if parts:
+        yield b''.join(parts)
+
+
+class StreamingListMixin:
+    """
+    Mixin para ListAPIViews que, com '?stream=1' ou 'Accept: application/x-ndjson'
+    (ou '?format=ndjson'), percorre o queryset filtrado com um cursor em lotes e envia
+    cada objeto serializado assim que fica pronto, sem paginação nem cache. O pico
+    de memória fica em um lote de 'stream_chunk_size' objetos, com seus prefetches.
+    """
+
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+    stream_param = 'stream'
+    stream_chunk_size = 500
+    # Uma listagem completa é cara, então fica restrita a clientes de admin/exportação.
+    stream_permission_classes = [IsAdminUser]
+
+    def wants_stream(self, request):
+        """True se a requisição pediu a listagem em streaming."""
+        return (request.accepted_renderer.format == NDJSONRenderer.format
+                or request.query_params.get(self.stream_param) in ('1', 'true'))
+
+    def streaming_list(self, request):
+        """Responde a listagem inteira em streaming."""
+        for permission in (p() for p in self.stream_permission_classes):
+            if not permission.has_permission(request, self):
+                self.permission_denied(request, message=getattr(permission, 'message', None))
+
+        ndjson = request.accepted_renderer.format == NDJSONRenderer.format
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        rows = (
+            serializer.to_representation(obj)
+            for obj in queryset.iterator(chunk_size=self.stream_chunk_size)
+        )
+        media_type = NDJSONRenderer.media_type if ndjson else ORJSONRenderer.media_type
+        return StreamingHttpResponse(iter_rendered(rows, ndjson), content_type=media_type)
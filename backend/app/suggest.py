@@ -0,0 +1,147 @@
+"""Índice de prefixos em memória para o autocompletar da busca de produtos."""
+
+import bisect
+import re
+
+from .catalog_cache import VersionedIndex
+from .models import Produto
+from .search import fold
+
+SUGGEST_FIELDS = ('titulo', 'categoria', 'material')
+MAX_CANDIDATES = 5000
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def terms_for(*texts):
+    """Palavras sem acento e em minúsculas dos textos informados."""
+    return {t for text in texts for t in _TOKEN_RE.findall(fold(text))}
+
+
+def within_one_edit(a, b):
+    """True se 'a' e 'b' diferem por no máximo uma inserção, remoção, troca ou transposição."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diff = [i for i, (x, y) in enumerate(zip(a, b)) if x != y]
+        if len(diff) == 1:
+            return True
+        return (len(diff) == 2 and diff[1] == diff[0] + 1
+                and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+    if len(a) > len(b):
+        a, b = b, a
+    for i, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+            return a[i:] == b[i + 1:]
+    return True
+
+
+class SuggestIndex(VersionedIndex):
+    """
+    Lista ordenada de pares (palavra, id do produto) consultada por busca binária,
+    mantida incrementalmente pelos sinais de Produto.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._entries = []
+        self._terms = {}
+        self._title_terms = {}
+        self._titles = {}
+
+    def _add(self, pid, titulo, categoria, material):
+        terms = terms_for(titulo, categoria, material)
+        self._terms[pid] = terms
+        self._title_terms[pid] = terms_for(titulo)
+        self._titles[pid] = titulo or ''
+        for term in terms:
+            bisect.insort(self._entries, (term, pid))
+
+    def _remove(self, pid):
+        for term in self._terms.pop(pid, ()):
+            i = bisect.bisect_left(self._entries, (term, pid))
+            if i < len(self._entries) and self._entries[i] == (term, pid):
+                del self._entries[i]
+        self._title_terms.pop(pid, None)
+        self._titles.pop(pid, None)
+
+    def _build(self):
+        self._terms, self._title_terms, self._titles = {}, {}, {}
+        entries = []
+        rows = Produto.objects.values_list('id', *SUGGEST_FIELDS) # pylint: disable=no-member
+        for pid, titulo, categoria, material in rows.iterator(chunk_size=2000):
+            terms = terms_for(titulo, categoria, material)
+            self._terms[pid] = terms
+            self._title_terms[pid] = terms_for(titulo)
+            self._titles[pid] = titulo or ''
+            entries.extend((term, pid) for term in terms)
+        entries.sort()
+        self._entries = entries
+
+    def update_product(self, produto):
+        """Substitui as palavras de um produto criado ou alterado."""
+        self._remove(produto.pk)
+        self._add(produto.pk, produto.titulo, produto.categoria, produto.material)
+
+    def remove_product(self, pid):
+        """Remove um produto do índice."""
+        self._remove(pid)
+
+    def _prefix_ids(self, prefix):
+        ids = set()
+        i = bisect.bisect_left(self._entries, (prefix,))
+        end = min(len(self._entries), i + MAX_CANDIDATES)
+        while i < end and self._entries[i][0].startswith(prefix):
+            ids.add(self._entries[i][1])
+            i += 1
+        return ids
+
+    def _fuzzy_ids(self, token):
+        """Palavras cujo início está a uma edição de 'token' (mesma primeira letra)."""
+        ids = set()
+        i = bisect.bisect_left(self._entries, (token[0],))
+        end = min(len(self._entries), i + MAX_CANDIDATES)
+        size = len(token)
+        while i < end and self._entries[i][0].startswith(token[0]):
+            term, pid = self._entries[i]
+            if any(within_one_edit(token, term[:n]) for n in (size - 1, size, size + 1)):
+                ids.add(pid)
+            i += 1
+        return ids
+
+    def _token_ids(self, token):
+        ids = self._prefix_ids(token)
+        if not ids and len(token) >= 3:
+            ids = self._fuzzy_ids(token)
+        return ids
+
+    def suggest(self, text, limit=8):
+        """
+        Retorna até 'limit' produtos cujas palavras começam com cada termo digitado,
+        tolerando um erro de digitação por termo. Produtos com todos os termos no
+        título vêm primeiro, depois os de título mais curto.
+        """
+        tokens = list(dict.fromkeys(_TOKEN_RE.findall(fold(text))))
+        if not tokens:
+            return []
+
+        with self._lock:
+            self.ensure_current()
+            ids = None
+            for token in tokens:
+                found = self._token_ids(token)
+                ids = found if ids is None else ids & found
+                if not ids:
+                    return []
+
+            def in_title(pid):
+                title_terms = self._title_terms[pid]
+                return all(any(t.startswith(token) for t in title_terms) for token in tokens)
+
+            ranked = sorted(ids, key=lambda pid: (not in_title(pid), len(self._titles[pid]), pid))
+            return [{'id': pid, 'titulo': self._titles[pid]} for pid in ranked[:limit]]
+
+
+suggest_index = SuggestIndex()
@@ -4,10 +4,13 @@ import io
 import pytest
 from django.apps import apps
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from rest_framework.test import APIClient
 from faker import Faker
 from PIL import Image
 from app.models import Carrinho, Cor, Pedido, Produto
+from app.similar import similar_index
+from app.suggest import suggest_index
 
 @pytest.fixture(autouse=True, scope="session")
 def django_test_environment(django_test_environment): # pylint: disable=unused-argument, redefined-outer-name
@@ -17,6 +20,47 @@ def django_test_environment(django_test_environment): # pylint: disable=unused-a
         m._meta.managed = True # pylint: disable=protected-access
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Fixture que limpa o cache e os índices em memória antes e depois de cada teste."""
+
+    cache.clear()
+    suggest_index.invalidate()
+    similar_index.invalidate()
+    yield
+    cache.clear()
+    suggest_index.invalidate()
+    similar_index.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def image_spool(settings, tmp_path):
+    """Fixture que isola o spool do pipeline de imagens numa pasta temporária."""
+
+    spool = tmp_path / "spool"
+    settings.IMAGE_PIPELINE = {**settings.IMAGE_PIPELINE, 'SPOOL_DIR': spool}
+    yield spool
+
+
+@pytest.fixture(autouse=True)
+def image_storage(settings, tmp_path):
+    """Fixture que troca o bucket de imagens por uma pasta temporária."""
+
+    location = tmp_path / "bucket"
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'product_images': {
+            'BACKEND': 'app.storage.LocalStorage',
+            'OPTIONS': {
+                'location': location,
+                'base_url': 'https://example.supabase.co/storage/v1/object/public/imagens-produtos/',
+                'max_upload_size': 1024 * 1024,
+            },
+        },
+    }
+    yield location
+
+
 @pytest.fixture(autouse=True, scope="session")
 def faker():
     """Fixture que fornece uma instância do Faker para geração de dados falsos."""
@@ -0,0 +1,36 @@
+"""Testes para os comandos de benchmark de JSON, compressão e upload."""
+
+import io
+from django.core.management import call_command
+
+
+def test_medir_json_reports_both_renderers():
+    """O comando mede json e orjson sobre o mesmo payload."""
+
+    out = io.StringIO()
+    call_command("medir_json", "--produtos", "20", "--repeticoes", "1", stdout=out)
+
+    assert "20 produtos" in out.getvalue()
+    assert "json (DRF)" in out.getvalue()
+    assert "orjson" in out.getvalue()
+
+
+def test_medir_compressao_reports_each_encoding():
+    """O comando mede gzip, Brotli e o acerto no cache."""
+
+    out = io.StringIO()
+    call_command("medir_compressao", "--produtos", "20", "--repeticoes", "1", stdout=out)
+
+    assert "brotli q9" in out.getvalue()
+    assert "acerto no cache" in out.getvalue()
+
+
+def test_medir_upload_compares_whole_and_chunked():
+    """O comando envia os arquivos lidos inteiros e em blocos."""
+
+    out = io.StringIO()
+    call_command("medir_upload", "--arquivos", "2", "--tamanho-mb", "0.1", stdout=out)
+
+    assert "2 arquivos de 0.1 MiB" in out.getvalue()
+    assert "arquivo inteiro" in out.getvalue()
+    assert "em blocos" in out.getvalue()
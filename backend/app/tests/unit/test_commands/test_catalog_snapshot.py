@@ -0,0 +1,135 @@
+"""Testes para o snapshot estático do catálogo (gerar_catalogo_estatico)."""
+
+import io
+import json
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from app import snapshots
+from app.models import Produto
+from app.snapshots import INDEX_NAME, LOCK_KEY, MANIFEST_NAME
+
+
+@pytest.fixture
+def snapshot_dir(settings, tmp_path):
+    """Aponta o storage 'catalog_snapshots' para uma pasta temporária."""
+
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'catalog_snapshots': {
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
+            'OPTIONS': {'location': tmp_path, 'allow_overwrite': True},
+        },
+    }
+    settings.CATALOG_SNAPSHOTS = {'PAGE_SIZE': 2}
+    yield tmp_path
+
+
+def _read(directory, name):
+    return json.loads((directory / name).read_text(encoding='utf-8'))
+
+
+def _pages(directory):
+    return sorted(str(p.relative_to(directory)) for p in directory.glob('catalogo/*/*.json'))
+
+
+@pytest.mark.django_db
+def test_full_snapshot_writes_manifest_and_pages(snapshot_dir, products):
+    """Gera uma página por categoria e um manifesto que aponta para elas."""
+
+    Produto.objects.create( # pylint: disable=no-member
+        preco=89.90, quantidade=3, categoria="Camisetas", material="Algodão",
+        cor_padrao="Branco", titulo="Camiseta Branca", descricao="Básica.",
+        altura=2.0, comprimento=70.0, largura=50.0,
+    )
+    out = io.StringIO()
+    call_command("gerar_catalogo_estatico", stdout=out)
+
+    assert "3 categorias processadas, 3 páginas gravadas, 0 removidas." in out.getvalue()
+    manifest = _read(snapshot_dir, MANIFEST_NAME)
+    assert manifest['categorias']['Camisetas']['total'] == 2
+    assert len(manifest['categorias']['Calçados']['paginas']) == 1
+
+    pagina = _read(snapshot_dir, manifest['categorias']['Camisetas']['paginas'][0])
+    assert pagina['pagina'] == 1
+    assert [p['titulo'] for p in pagina['produtos']] == [products[0].titulo, "Camiseta Branca"]
+    assert _read(snapshot_dir, INDEX_NAME)[str(products[1].id)] == "Calçados"
+
+
+@pytest.mark.django_db
+def test_incremental_snapshot_rewrites_only_changed_categories(snapshot_dir, products):
+    """Só a categoria do produto alterado é regravada; a página antiga é removida."""
+
+    call_command("gerar_catalogo_estatico", stdout=io.StringIO())
+    before = _pages(snapshot_dir)
+
+    products[1].preco = 299.90
+    products[1].save()
+    out = io.StringIO()
+    call_command("gerar_catalogo_estatico", stdout=out)
+
+    assert "1 categorias processadas, 1 páginas gravadas, 1 removidas." in out.getvalue()
+    after = _pages(snapshot_dir)
+    assert len(after) == len(before)
+    [novo] = set(after) - set(before)
+    assert novo.startswith('catalogo/calcados/1.')
+
+
+@pytest.mark.django_db
+def test_incremental_snapshot_follows_moved_and_deleted_products(snapshot_dir, products):
+    """Produtos que mudam de categoria ou são removidos somem das páginas antigas."""
+
+    call_command("gerar_catalogo_estatico", stdout=io.StringIO())
+
+    products[0].categoria = "Calçados"
+    products[0].save()
+    products[2].delete()
+    call_command("gerar_catalogo_estatico", stdout=io.StringIO())
+
+    manifest = _read(snapshot_dir, MANIFEST_NAME)
+    assert set(manifest['categorias']) == {"Calçados"}
+    assert manifest['categorias']['Calçados']['total'] == 2
+    assert _pages(snapshot_dir) == sorted(manifest['categorias']['Calçados']['paginas'])
+    assert set(_read(snapshot_dir, INDEX_NAME)) == {str(products[0].id), str(products[1].id)}
+
+
+@pytest.mark.django_db
+def test_unchanged_catalog_writes_nothing(snapshot_dir, products): # pylint: disable=unused-argument
+    """Sem mudanças, a geração incremental não lê nem grava páginas."""
+
+    call_command("gerar_catalogo_estatico", stdout=io.StringIO())
+    out = io.StringIO()
+    call_command("gerar_catalogo_estatico", stdout=out)
+
+    assert "0 categorias processadas, 0 páginas gravadas, 0 removidas." in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_manifest_is_overwritten_in_place(snapshot_dir, products, mocker): # pylint: disable=unused-argument
+    """O manifesto é regravado sem ser apagado antes, para não sumir para os leitores."""
+
+    call_command("gerar_catalogo_estatico", stdout=io.StringIO())
+    products[1].preco = 299.90
+    products[1].save()
+    delete = mocker.spy(snapshots.storages[snapshots.STORAGE_ALIAS].__class__, 'delete')
+
+    call_command("gerar_catalogo_estatico", stdout=io.StringIO())
+
+    assert MANIFEST_NAME not in [call.args[1] for call in delete.call_args_list]
+    assert _read(snapshot_dir, MANIFEST_NAME)['categorias']['Calçados']['total'] == 1
+
+
+def test_scheduled_run_rearms_when_another_generation_holds_the_lock(mocker):
+    """Se outra geração está em andamento, a escrita agendada não se perde: o timer volta."""
+
+    arm = mocker.patch.object(snapshots, '_arm')
+    mocker.patch.object(snapshots, 'close_old_connections')
+    cache.add(LOCK_KEY, 1)
+    try:
+        snapshots._run_scheduled() # pylint: disable=protected-access
+    finally:
+        cache.delete(LOCK_KEY)
+
+    arm.assert_called_once_with(snapshots.snapshot_settings()['DELAY'])
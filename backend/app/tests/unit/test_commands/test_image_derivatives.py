@@ -0,0 +1,85 @@
+"""Testes para as versões reduzidas das imagens e o comando gerar_derivadas."""
+
+import io
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from PIL import Image
+
+from app.derivatives import available_formats, render_derivatives
+from app.models import ProdutoImagem
+
+BUCKET_URL = "https://example.supabase.co/storage/v1/object/public/imagens-produtos/"
+
+
+def _jpeg(width, height, exif=None):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, "JPEG", exif=exif or Image.Exif())
+    return buffer.getvalue()
+
+
+def test_render_derivatives_never_upscales():
+    """Gera todas as larguras menores que o original e o original no lugar das maiores."""
+
+    results = render_derivatives(_jpeg(800, 400))
+
+    assert {width for _, width in results} == {320, 640, 800}
+    assert {fmt for fmt, _ in results} == set(available_formats())
+    with Image.open(io.BytesIO(results['webp', 320])) as thumb:
+        assert thumb.size == (320, 160)
+
+
+def test_render_derivatives_applies_orientation_and_strips_exif():
+    """A rotação do EXIF vai para os pixels e nenhum metadado é copiado."""
+
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientação: girar 90°.
+    exif[0x010F] = "Camera"
+    results = render_derivatives(_jpeg(400, 200, exif))
+
+    with Image.open(io.BytesIO(results['jpeg', 200])) as thumb:
+        assert thumb.size == (200, 400)
+        assert not thumb.getexif()
+
+
+@pytest.mark.django_db
+def test_backfill_generates_srcset(client, products, image_storage):
+    """O comando gera as versões das imagens antigas e elas aparecem no srcset."""
+
+    original = image_storage / "media" / "produtos" / "antiga.jpg"
+    original.parent.mkdir(parents=True)
+    original.write_bytes(_jpeg(1200, 600))
+    ProdutoImagem.objects.create( # pylint: disable=no-member
+        produto=products[0], url=f"{BUCKET_URL}media/produtos/antiga.jpg"
+    )
+    ProdutoImagem.objects.create( # pylint: disable=no-member
+        produto=products[1], url=f"{BUCKET_URL}media/produtos/antiga.jpg"
+    )
+
+    out = io.StringIO()
+    call_command("gerar_derivadas", stdout=out)
+
+    assert "2 imagens atualizadas, 0 com erro." in out.getvalue()
+    assert (image_storage / "media" / "produtos" / "antiga" / "320.webp").exists()
+    [imagem] = client.get(reverse('detalhes_produto', args=[products[0].id])).json()['imagens']
+    assert imagem['srcset']['webp'] == ", ".join(
+        f"{BUCKET_URL}media/produtos/antiga/{width}.webp {width}w" for width in (320, 640, 1024)
+    )
+    assert set(imagem['srcset']) == set(available_formats())
+
+
+@pytest.mark.django_db
+def test_backfill_reports_missing_originals(products):
+    """Imagens sem original no bucket são contadas como erro e ficam sem versões."""
+
+    imagem = ProdutoImagem.objects.create( # pylint: disable=no-member
+        produto=products[0], url=f"{BUCKET_URL}media/produtos/sumiu.jpg"
+    )
+
+    out = io.StringIO()
+    call_command("gerar_derivadas", stdout=out, stderr=io.StringIO())
+
+    assert "0 imagens atualizadas, 1 com erro." in out.getvalue()
+    imagem.refresh_from_db()
+    assert imagem.derivadas == {}
@@ -0,0 +1,134 @@
+"""Testes para a coleta de imagens órfãs do bucket (limpar_imagens_orfas)."""
+
+import io
+import os
+import time
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from app import image_gc
+from app.models import ArquivoImagem, ProdutoImagem
+
+BUCKET_URL = "https://example.supabase.co/storage/v1/object/public/imagens-produtos/"
+
+
+@pytest.fixture
+def bucket(image_storage, products):
+    """Bucket com uma imagem em uso (e suas versões), uma órfã antiga e uma órfã recente."""
+
+    files = {
+        "media/produtos/usada.jpg": True,
+        "media/produtos/usada/320.webp": True,
+        "media/produtos/removida.jpg": True,
+        "media/produtos/removida/320.webp": True,
+        "media/produtos/enviando.jpg": False,
+    }
+    ontem = time.time() - 48 * 3600
+    for name, antigo in files.items():
+        path = image_storage / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"img")
+        if antigo:
+            os.utime(path, (ontem, ontem))
+
+    ProdutoImagem.objects.create( # pylint: disable=no-member
+        produto=products[0], url=f"{BUCKET_URL}media/produtos/usada.jpg",
+        derivadas={"webp": {"320": f"{BUCKET_URL}media/produtos/usada/320.webp"}},
+    )
+    ArquivoImagem.objects.create( # pylint: disable=no-member
+        sha256="0" * 64, caminho="media/produtos/removida.jpg",
+        url=f"{BUCKET_URL}media/produtos/removida.jpg", tamanho=3,
+    )
+    yield image_storage
+
+
+def _remaining(bucket):
+    return sorted(
+        str(path.relative_to(bucket)) for path in bucket.rglob("*") if path.is_file()
+    )
+
+
+@pytest.mark.django_db
+def test_dry_run_only_lists_orphans(bucket):
+    """Com --simular nada é apagado."""
+
+    out = io.StringIO()
+    call_command("limpar_imagens_orfas", "--simular", stdout=out)
+
+    assert "media/produtos/removida.jpg" in out.getvalue()
+    assert "2 objetos seriam apagados." in out.getvalue()
+    assert len(_remaining(bucket)) == 5
+
+
+@pytest.mark.django_db
+def test_gc_deletes_old_orphans_in_batches(bucket):
+    """Apaga os órfãos antigos e suas versões; o que está em uso ou é recente fica."""
+
+    out = io.StringIO()
+    call_command("limpar_imagens_orfas", "--lote", "1", stdout=out)
+
+    assert "2 objetos apagados." in out.getvalue()
+    assert _remaining(bucket) == [
+        "media/produtos/enviando.jpg",
+        "media/produtos/usada.jpg",
+        "media/produtos/usada/320.webp",
+    ]
+    assert not ArquivoImagem.objects.exists() # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_gc_keeps_objects_referenced_after_listing(bucket, mocker, products):
+    """Uma referência criada entre a listagem e a remoção do lote protege o objeto."""
+
+    find_orphans = image_gc.find_orphans
+
+    def listing_then_reference(*args):
+        orphans = find_orphans(*args)
+        ProdutoImagem.objects.create( # pylint: disable=no-member
+            produto=products[1], url=f"{BUCKET_URL}media/produtos/removida.jpg",
+        )
+        return orphans
+
+    mocker.patch.object(image_gc, "find_orphans", side_effect=listing_then_reference)
+
+    assert image_gc.collect_orphans(batch_size=1) == ["media/produtos/removida/320.webp"]
+    assert "media/produtos/removida.jpg" in _remaining(bucket)
+    assert ArquivoImagem.objects.exists() # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_gc_scans_references_once_and_rechecks_batches_by_name(bucket, mocker, products):
+    """
+    A tabela inteira de imagens é lida uma vez por execução; cada lote só relê as
+    imagens que apontam para ele, inclusive pelas versões reduzidas.
+    """
+
+    find_orphans = image_gc.find_orphans
+
+    def listing_then_reference(*args):
+        orphans = find_orphans(*args)
+        ProdutoImagem.objects.create( # pylint: disable=no-member
+            produto=products[1], url=f"{BUCKET_URL}media/produtos/removida.jpg",
+            derivadas={"webp": {"320": f"{BUCKET_URL}media/produtos/removida/320.webp"}},
+        )
+        return orphans
+
+    mocker.patch.object(image_gc, "find_orphans", side_effect=listing_then_reference)
+    scan = mocker.spy(image_gc, "referenced_objects")
+
+    assert not image_gc.collect_orphans(batch_size=1)
+    assert len(_remaining(bucket)) == 5
+    assert [call.kwargs.get("images") for call in scan.call_args_list].count(None) == 1
+
+
+@pytest.mark.django_db
+def test_gc_keeps_recently_reused_objects(bucket):
+    """Um original reaproveitado pela deduplicação há pouco fica, com suas versões."""
+
+    ArquivoImagem.objects.update(usado_em=timezone.now()) # pylint: disable=no-member
+
+    assert not image_gc.collect_orphans()
+    assert len(_remaining(bucket)) == 5
+    assert ArquivoImagem.objects.exists() # pylint: disable=no-member
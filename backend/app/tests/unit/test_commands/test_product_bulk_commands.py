@@ -0,0 +1,21 @@
+"""Testes para os comandos de importação e exportação de produtos."""
+
+import io
+import pytest
+from django.core.management import call_command
+from app.models import Produto
+
+
+@pytest.mark.django_db
+def test_export_then_import_round_trip(tmp_path, products):
+    """Exportar e reimportar o catálogo atualiza os mesmos produtos."""
+
+    Produto.objects.update(categoria="feminino") # pylint: disable=no-member
+    saida = tmp_path / "produtos.csv"
+    call_command("exportar_produtos", "--saida", str(saida))
+
+    out = io.StringIO()
+    call_command("importar_produtos", str(saida), stdout=out)
+
+    assert "0 criados, 3 atualizados, 0 com erro." in out.getvalue()
+    assert Produto.objects.count() == len(products) # pylint: disable=no-member
@@ -0,0 +1,109 @@
+import gzip
+import json
+import brotli
+import pytest
+from django.http import HttpResponse
+from django.urls import reverse
+from app.compression import CompressionMiddleware, accepted_encodings
+from app.models import Produto
+
+
+@pytest.fixture
+def catalog(db):
+    """Catálogo grande o bastante para valer a compressão."""
+
+    return Produto.objects.bulk_create([ # pylint: disable=no-member
+        Produto(preco=10.0 + i, quantidade=i, categoria="feminino", material="Couro",
+                cor_padrao="Preto", titulo=f"Bolsa {i}", descricao="Bolsa de couro legítimo. " * 4)
+        for i in range(20)
+    ])
+
+
+def test_accepted_encodings_respects_quality():
+    """q=0 exclui a codificação; espaços e maiúsculas são ignorados."""
+
+    assert accepted_encodings("gzip, deflate, BR;q=0.5") == {'gzip', 'deflate', 'br'}
+    assert accepted_encodings("br;q=0, gzip;q=1.0") == {'gzip'}
+    assert accepted_encodings("") == set()
+
+
+@pytest.mark.django_db
+def test_brotli_is_compressed_once_per_version(client, catalog): # pylint: disable=unused-argument
+    """A segunda requisição reaproveita os bytes comprimidos da primeira."""
+
+    plain = client.get(reverse("lista_produtos"))
+    first = client.get(reverse("lista_produtos"), HTTP_ACCEPT_ENCODING="gzip, br")
+    second = client.get(reverse("lista_produtos"), HTTP_ACCEPT_ENCODING="gzip, br")
+
+    assert 'Content-Encoding' not in plain
+    assert first['Content-Encoding'] == 'br'
+    assert 'Accept-Encoding' in first['Vary']
+    assert first['ETag'].startswith('W/"')
+    assert json.loads(brotli.decompress(first.content)) == plain.json()
+    assert (first['X-Compression-Cache'], second['X-Compression-Cache']) == ('MISS', 'HIT')
+    assert second.content == first.content
+
+
+@pytest.mark.django_db
+def test_catalog_change_compresses_again(client, catalog):
+    """Uma escrita no catálogo muda o ETag e a nova versão é comprimida de novo."""
+
+    client.get(reverse("lista_produtos"), HTTP_ACCEPT_ENCODING="gzip")
+    catalog[0].titulo = "Bolsa renomeada"
+    catalog[0].save()
+
+    response = client.get(reverse("lista_produtos"), HTTP_ACCEPT_ENCODING="gzip")
+
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['X-Compression-Cache'] == 'MISS'
+    assert "Bolsa renomeada" in gzip.decompress(response.content).decode()
+
+
+@pytest.mark.django_db
+def test_weak_etag_still_gives_not_modified(client, catalog): # pylint: disable=unused-argument
+    """O ETag fraco devolvido com a resposta comprimida continua valendo no If-None-Match."""
+
+    first = client.get(reverse("lista_produtos"), HTTP_ACCEPT_ENCODING="br")
+    response = client.get(
+        reverse("lista_produtos"), HTTP_ACCEPT_ENCODING="br", HTTP_IF_NONE_MATCH=first['ETag']
+    )
+
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_small_responses_are_not_compressed(client, products):
+    """Respostas pequenas saem sem compressão."""
+
+    response = client.get(
+        reverse("detalhes_produto", kwargs={'pk': products[0].id}), HTTP_ACCEPT_ENCODING="br"
+    )
+
+    assert 'Content-Encoding' not in response
+
+
+@pytest.mark.django_db
+def test_streaming_responses_are_gzipped(staff_client, catalog): # pylint: disable=unused-argument
+    """O modo streaming é comprimido em gzip bloco a bloco."""
+
+    response = staff_client.get(
+        reverse("lista_produtos"), {'stream': '1'}, HTTP_ACCEPT_ENCODING="gzip, br"
+    )
+
+    assert response['Content-Encoding'] == 'gzip'
+    assert len(json.loads(gzip.decompress(b''.join(response.streaming_content)))) == 20
+
+
+def test_cache_is_keyed_on_the_body(rf, settings):
+    """Duas respostas com o mesmo ETag e tamanho, mas corpos diferentes, não se misturam."""
+
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    middleware = CompressionMiddleware(lambda request: None)
+    bodies = []
+    for letter in "ab":
+        response = HttpResponse(letter * 2048, content_type='application/json')
+        response['ETag'] = '"mesmo"'
+        request = rf.get('/api/pedidos/', HTTP_ACCEPT_ENCODING='gzip')
+        bodies.append(gzip.decompress(middleware.process_response(request, response).content))
+
+    assert bodies == [b"a" * 2048, b"b" * 2048]
@@ -0,0 +1,68 @@
+import io
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from app.renderers import ORJSONParser, ORJSONRenderer
+
+
+PAYLOAD = {
+    'preco': Decimal('199.90'),
+    'criado_em': datetime(2025, 7, 14, 20, 37, 5, 123456, tzinfo=timezone.utc),
+    'sem_fuso': datetime(2025, 7, 14, 20, 37),
+    'data': date(2025, 7, 14),
+    'prazo': timedelta(days=2),
+    'codigo': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'rotulo': gettext_lazy('Bolsa'),
+    'texto': 'Bolsa\u2028térmica\u2029nova',
+    'itens': [1, 2.5, None, True, {'a': 'b'}],
+    1: 'chave inteira',
+}
+
+
+def test_renderer_matches_drf_output():
+    """Mesmos bytes do JSONRenderer para Decimal, datetime, UUID e afins."""
+
+    assert ORJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+
+def test_renderer_indents_with_stdlib():
+    """Com 'indent' no Accept a saída indentada é a do JSONRenderer."""
+
+    media_type = 'application/json; indent=4'
+
+    assert (ORJSONRenderer().render({'a': [1]}, media_type)
+            == JSONRenderer().render({'a': [1]}, media_type))
+
+
+def test_renderer_none_is_empty():
+    """None vira corpo vazio, como no DRF."""
+
+    assert ORJSONRenderer().render(None) == b''
+
+
+def test_parser_reads_json_and_rejects_invalid():
+    """JSON válido é lido; inválido e NaN geram ParseError."""
+
+    parser = ORJSONParser()
+
+    assert parser.parse(io.BytesIO('{"titulo": "Boné", "n": [1]}'.encode())) == {
+        'titulo': 'Boné', 'n': [1]
+    }
+    with pytest.raises(ParseError):
+        parser.parse(io.BytesIO(b'{"a": }'))
+    with pytest.raises(ParseError):
+        parser.parse(io.BytesIO(b'{"a": NaN}'))
+
+
+def test_parser_honours_request_encoding():
+    """Corpos em outra codificação são decodificados antes da leitura."""
+
+    body = '{"titulo": "Boné"}'.encode('latin-1')
+
+    assert ORJSONParser().parse(io.BytesIO(body), parser_context={'encoding': 'latin-1'}) == {
+        'titulo': 'Boné'
+    }
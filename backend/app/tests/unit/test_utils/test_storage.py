@@ -0,0 +1,78 @@
+"""Testes para os backends de storage do app"""
+import io
+
+import pytest
+from django.core.files.base import ContentFile
+
+from app.storage import LimitedReader, LocalStorage, SupabaseStorage, UploadTooLarge
+
+
+class CountingFile(io.BytesIO):
+    """Arquivo em memória que guarda o maior bloco pedido numa leitura."""
+
+    largest_read = 0
+
+    def read(self, size=-1):
+        self.largest_read = max(self.largest_read, size)
+        return super().read(size)
+
+
+def test_limited_reader_stops_at_limit():
+    """Testa que o leitor falha assim que passa do limite, sem ler o resto."""
+
+    source = io.BytesIO(b"x" * 1_000_000)
+    reader = io.BufferedReader(LimitedReader(source, max_size=100), 64)
+
+    with pytest.raises(UploadTooLarge):
+        reader.read()
+    assert source.tell() < 1_000_000
+
+
+def test_local_storage_streams_in_chunks(tmp_path):
+    """Testa que o LocalStorage grava o arquivo em blocos e sobrescreve o nome."""
+
+    storage = LocalStorage(location=tmp_path, max_upload_size=1024 * 1024)
+    source = CountingFile(b"a" * 300_000)
+    source.name = "foto.jpg"
+
+    assert storage.save("media/foto.jpg", source) == "media/foto.jpg"
+    assert storage.save("media/foto.jpg", ContentFile(b"b", name="foto.jpg")) == "media/foto.jpg"
+    assert 0 < source.largest_read <= 64 * 1024
+    assert (tmp_path / "media" / "foto.jpg").read_bytes() == b"b"
+
+
+def test_supabase_storage_uploads_a_stream(mocker):
+    """Testa que o SupabaseStorage entrega ao cliente um leitor, não os bytes."""
+
+    bucket = mocker.Mock()
+    mocker.patch.object(SupabaseStorage, '_bucket', return_value=bucket)
+    storage = SupabaseStorage(max_upload_size=10)
+
+    storage.save("a.webp", ContentFile(b"12345", name="a.webp"))
+    enviado = bucket.upload.call_args.kwargs
+    assert isinstance(enviado['file'], io.BufferedReader)
+    assert enviado['file'].read() == b"12345"
+    assert enviado['file_options']['content-type'] == 'image/webp'
+
+    storage.save("b.webp", ContentFile(b"x" * 11, name="b.webp"))
+    with pytest.raises(UploadTooLarge):
+        bucket.upload.call_args.kwargs['file'].read()
+
+
+def test_supabase_storage_iter_files_pages_and_recurses(mocker):
+    """Testa que a listagem do bucket é paginada e entra nas subpastas."""
+
+    data = "2025-01-01T00:00:00Z"
+    pages = {
+        ('media', 0): [{'name': 'a.jpg', 'id': 1, 'updated_at': data},
+                       {'name': 'a', 'id': None}],
+        ('media', 2): [{'name': 'b.jpg', 'id': 2, 'updated_at': data}],
+        ('media/a', 0): [{'name': '320.webp', 'id': 3, 'updated_at': data}],
+    }
+    bucket = mocker.Mock()
+    bucket.list.side_effect = lambda path, options: pages.get((path, options['offset']), [])
+    mocker.patch.object(SupabaseStorage, '_bucket', return_value=bucket)
+
+    names = [name for name, _ in SupabaseStorage().iter_files('media/', page_size=2)]
+
+    assert sorted(names) == ['media/a.jpg', 'media/a/320.webp', 'media/b.jpg']
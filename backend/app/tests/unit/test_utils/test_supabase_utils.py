@@ -1,6 +1,14 @@
 """Testes para as funções utilitárias do supabase"""
+import hashlib
 from unittest import mock
-from app.utils.supabase_utils import fetch_from_supabase, insert_to_supabase
+import pytest
+from django.core.files.base import ContentFile
+from django.db import connection
+from app.models import ArquivoImagem
+from app.storage import LocalStorage, UploadTooLarge
+from app.utils.supabase_utils import (
+    fetch_from_supabase, insert_to_supabase, upload_file_object_to_supabase,
+)
 
 
 def test_fetch_from_supabase(mocker):
@@ -56,4 +64,100 @@ def test_insert_to_supabase(mocker):
     result = insert_to_supabase("test_table", {"id": 1, "name": "Test"})
 
     assert isinstance(result, list)
-    assert result == mock_response.data
\ No newline at end of file
+    assert result == mock_response.data
+
+@pytest.mark.django_db
+def test_upload_reuses_known_content(mocker, image_storage):
+    """
+    Testa a deduplicação da 'upload_file_object_to_supabase': o objeto é nomeado
+    pelo SHA-256 e um segundo envio do mesmo conteúdo não chega ao storage.
+    """
+
+    save = mocker.spy(LocalStorage, '_save')
+    conteudo = b"mesma foto"
+    sha256 = hashlib.sha256(conteudo).hexdigest()
+    primeira = upload_file_object_to_supabase(ContentFile(conteudo, name="a.JPG"), "image/jpeg")
+    segunda = upload_file_object_to_supabase(ContentFile(conteudo, name="b.jpg"), "image/jpeg")
+
+    assert primeira == segunda
+    assert primeira.endswith(f"/imagens-produtos/media/produtos/{sha256}.jpg")
+    assert save.call_count == 1
+    assert (image_storage / "media" / "produtos" / f"{sha256}.jpg").read_bytes() == conteudo
+    arquivo = ArquivoImagem.objects.get(sha256=sha256) # pylint: disable=no-member
+    assert arquivo.tamanho == len(conteudo)
+    # O reaproveitamento fica registrado para a coleta de órfãos não apagar o objeto.
+    assert arquivo.usado_em is not None
+
+
+@pytest.mark.django_db
+def test_upload_reuploads_when_known_object_is_gone(image_storage):
+    """
+    Testa que um registro de ArquivoImagem cujo objeto sumiu do bucket não é
+    reutilizado: o arquivo é enviado de novo e o registro volta a valer.
+    """
+
+    conteudo = b"foto apagada do bucket"
+    sha256 = hashlib.sha256(conteudo).hexdigest()
+    url = upload_file_object_to_supabase(ContentFile(conteudo, name="a.jpg"), "image/jpeg")
+    objeto = image_storage / "media" / "produtos" / f"{sha256}.jpg"
+    objeto.unlink()
+
+    assert upload_file_object_to_supabase(ContentFile(conteudo, name="a.jpg"), "image/jpeg") == url
+    assert objeto.read_bytes() == conteudo
+    assert ArquivoImagem.objects.filter(sha256=sha256).count() == 1 # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_upload_over_size_limit_is_rejected(image_storage):
+    """
+    Testa que um arquivo acima do limite do storage é recusado durante a leitura,
+    sem deixar arquivo pela metade nem entrar no índice de arquivos. O erro chega ao
+    chamador, que registra a falha definitiva.
+    """
+
+    grande = ContentFile(b"x" * (1024 * 1024 + 1), name="grande.jpg")
+
+    with pytest.raises(UploadTooLarge):
+        upload_file_object_to_supabase(grande, "image/jpeg")
+    assert not list((image_storage / "media" / "produtos").iterdir())
+    assert not ArquivoImagem.objects.exists() # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_upload_errors_are_logged_and_raised(mocker, caplog, image_storage): # pylint: disable=unused-argument
+    """
+    Testa que uma falha do storage é registrada no log e repassada ao chamador, em
+    vez de virar um retorno None sem detalhes.
+    """
+
+    mocker.patch.object(LocalStorage, '_save', side_effect=RuntimeError("bucket fora do ar"))
+
+    with pytest.raises(RuntimeError):
+        upload_file_object_to_supabase(ContentFile(b"foto", name="a.jpg"), "image/jpeg")
+    assert "Erro ao fazer upload do arquivo a.jpg" in caplog.text
+    assert not ArquivoImagem.objects.exists() # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_upload_checks_the_bucket_outside_transactions(mocker, image_storage): # pylint: disable=unused-argument
+    """
+    Testa que a consulta ao bucket de um arquivo já conhecido acontece fora dos
+    blocos atômicos do upload, sem travar a linha de ArquivoImagem durante a
+    chamada de rede.
+    """
+
+    conteudo = b"foto repetida"
+    url = upload_file_object_to_supabase(ContentFile(conteudo, name="a.jpg"), "image/jpeg")
+    # O teste já roda dentro de uma transação; conta só os blocos abertos pelo upload.
+    base = len(connection.atomic_blocks)
+    blocks = []
+    exists = LocalStorage.exists
+
+    def spy_exists(storage, name):
+        blocks.append(len(connection.atomic_blocks))
+        return exists(storage, name)
+
+    mocker.patch.object(LocalStorage, 'exists', spy_exists)
+
+    assert upload_file_object_to_supabase(ContentFile(conteudo, name="b.jpg"), "image/jpeg") == url
+    assert blocks == [base]
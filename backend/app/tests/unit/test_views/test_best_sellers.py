@@ -0,0 +1,112 @@
+import json
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from app.models import Pedido, Produto, ProdutoCarrinho
+
+
+@pytest.fixture
+def sold(products, carts):
+    """Itens nos carrinhos: o 1º tem 3 tênis e 1 camiseta, o 2º tem 2 bonés."""
+
+    ProdutoCarrinho.objects.create(id_carrinho=carts[0], id_produto=products[1], quantidade=3) # pylint: disable=no-member
+    ProdutoCarrinho.objects.create(id_carrinho=carts[0], id_produto=products[0], quantidade=1) # pylint: disable=no-member
+    ProdutoCarrinho.objects.create(id_carrinho=carts[1], id_produto=products[2], quantidade=2) # pylint: disable=no-member
+    return products
+
+
+def vendidos(products):
+    """Valor atual do rollup de cada produto."""
+
+    return [Produto.objects.get(pk=p.pk).vendidos for p in products] # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_rollup_counts_each_approved_order_once(sold, carts):
+    """Aprovar soma os itens; salvar de novo não soma outra vez; estornar subtrai."""
+
+    pedido = Pedido.objects.create(codigo_carrinho=carts[0], status='pendente') # pylint: disable=no-member
+    assert vendidos(sold) == [0, 0, 0]
+
+    pedido.status = 'aprovado'
+    pedido.save()
+    Pedido.objects.get(pk=pedido.pk).save() # pylint: disable=no-member
+    assert vendidos(sold) == [1, 3, 0]
+
+    pedido.status = 'refunded'
+    pedido.save()
+    assert vendidos(sold) == [0, 0, 0]
+
+
+@pytest.mark.django_db
+def test_product_save_does_not_overwrite_rollup(sold, carts):
+    """Um produto carregado antes de uma venda não apaga o incremento ao ser salvo."""
+
+    stale = Produto.objects.get(pk=sold[1].pk) # pylint: disable=no-member
+    Pedido.objects.create(codigo_carrinho=carts[0], status='approved') # pylint: disable=no-member
+
+    stale.preco = 50.0
+    stale.save()
+
+    assert vendidos([sold[1]]) == [3]
+
+
+@pytest.mark.django_db
+def test_webhook_approval_updates_rollup(client, sold, carts, mocker):
+    """O webhook do Mercado Pago que aprova o pedido atualiza o rollup."""
+
+    pedido = Pedido.objects.create(codigo_carrinho=carts[1], status='pendente_mp') # pylint: disable=no-member
+    sdk = mocker.patch('app.views.mercadopago.SDK').return_value
+    sdk.payment.return_value.get.return_value = {
+        'status': 200,
+        'response': {'external_reference': str(pedido.pk), 'status': 'approved', 'id': 'mp-9'},
+    }
+
+    for _ in range(2):
+        response = client.post(
+            reverse("mercadopago_webhook"),
+            data=json.dumps({'topic': 'payment', 'id': 'mp-9'}),
+            content_type='application/json',
+        )
+        assert response.status_code == 200
+
+    assert vendidos(sold) == [0, 0, 2]
+
+
+@pytest.mark.django_db
+def test_product_list_ordering_by_vendidos(client, sold, carts):
+    """'?ordering=-vendidos' lista do mais para o menos vendido."""
+
+    Pedido.objects.create(codigo_carrinho=carts[0], status='approved') # pylint: disable=no-member
+    Pedido.objects.create(codigo_carrinho=carts[1], status='approved') # pylint: disable=no-member
+
+    response = client.get(reverse("lista_produtos"), {'ordering': '-vendidos'})
+
+    assert [p['id'] for p in response.json()] == [sold[1].id, sold[2].id, sold[0].id]
+
+
+@pytest.mark.django_db
+def test_best_sellers_endpoint(client, sold, carts):
+    """Só produtos vendidos, em ordem de vendas, com limite; a lista acompanha novas vendas."""
+
+    Pedido.objects.create(codigo_carrinho=carts[0], status='approved') # pylint: disable=no-member
+    url = reverse("mais_vendidos")
+
+    assert [p['id'] for p in client.get(url).json()] == [sold[1].id, sold[0].id]
+    assert [p['id'] for p in client.get(url, {'limit': 1}).json()] == [sold[1].id]
+
+    Pedido.objects.create(codigo_carrinho=carts[1], status='approved') # pylint: disable=no-member
+
+    assert [p['id'] for p in client.get(url).json()] == [sold[1].id, sold[2].id, sold[0].id]
+
+
+@pytest.mark.django_db
+def test_recalcular_vendidos_command(sold, carts):
+    """O comando reconstrói o rollup a partir dos pedidos aprovados."""
+
+    Pedido.objects.create(codigo_carrinho=carts[0], status='approved') # pylint: disable=no-member
+    Produto.objects.update(vendidos=42) # pylint: disable=no-member
+
+    call_command('recalcular_vendidos')
+
+    assert vendidos(sold) == [1, 3, 0]
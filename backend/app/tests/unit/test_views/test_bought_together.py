@@ -0,0 +1,85 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from app.associations import mine_associations
+from app.models import Carrinho, Pedido, ProdutoAssociacao, ProdutoCarrinho
+
+
+@pytest.fixture
+def history(products):
+    """Seis pedidos aprovados (A+B três vezes, A+C duas, só A uma) e um pendente com B+C."""
+
+    a, b, c = products
+    baskets = [[a, b], [a, b], [a, b], [a, c], [a, c], [a]]
+    for status, basket in [('approved', items) for items in baskets] + [('pendente', [b, c])]:
+        carrinho = Carrinho.objects.create(subtotal=0) # pylint: disable=no-member
+        for produto in basket:
+            ProdutoCarrinho.objects.create( # pylint: disable=no-member
+                id_carrinho=carrinho, id_produto=produto, quantidade=1
+            )
+        Pedido.objects.create(codigo_carrinho=carrinho, status=status) # pylint: disable=no-member
+    return products
+
+
+def associations():
+    """Associações gravadas como tuplas comparáveis."""
+
+    return sorted(
+        (a.produto_id, a.associado_id, a.ocorrencias, round(a.lift, 4), round(a.confianca, 4))
+        for a in ProdutoAssociacao.objects.all() # pylint: disable=no-member
+    )
+
+
+@pytest.mark.django_db
+def test_mine_associations_lift_and_confidence(history):
+    """Só pedidos aprovados entram; lift = confiança / suporte relativo do associado."""
+
+    a, b, c = history
+
+    baskets, total = mine_associations(min_occurrences=2)
+
+    assert (baskets, total) == (6, 4)
+    assert associations() == sorted([
+        (a.id, b.id, 3, 1.0, 0.5),
+        (a.id, c.id, 2, 1.0, 0.3333),
+        (b.id, a.id, 3, 1.0, 1.0),
+        (c.id, a.id, 2, 1.0, 1.0),
+    ])
+
+
+@pytest.mark.django_db
+def test_mine_associations_is_independent_of_chunk_size(history): # pylint: disable=unused-argument
+    """Processar os carrinhos em blocos pequenos dá o mesmo resultado."""
+
+    mine_associations(chunk_size=10000)
+    expected = associations()
+
+    mine_associations(chunk_size=2)
+
+    assert associations() == expected
+
+
+@pytest.mark.django_db
+def test_bought_together_endpoint(client, history):
+    """O endpoint devolve os associados por lift e, no empate, por ocorrências."""
+
+    a, b, c = history
+    call_command('minerar_associacoes', '--min-ocorrencias', '1')
+    url = reverse("comprados_juntos", kwargs={'pk': a.id})
+
+    response = client.get(url)
+    limited = client.get(url, {'limit': 1, 'view': 'card'})
+
+    assert response.status_code == 200
+    assert [p['id'] for p in response.json()] == [b.id, c.id]
+    assert [p['id'] for p in limited.json()] == [b.id]
+
+
+@pytest.mark.django_db
+def test_bought_together_without_history(client, products):
+    """Produto sem associações responde uma lista vazia."""
+
+    response = client.get(reverse("comprados_juntos", kwargs={'pk': products[0].id}))
+
+    assert response.status_code == 200
+    assert response.json() == []
@@ -0,0 +1,120 @@
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.urls import reverse
+from app import catalog_cache
+from app.models import Produto, ProdutoImagem
+
+
+@pytest.mark.django_db
+def test_products_list_is_served_from_cache(client, products, django_assert_num_queries):
+    """A segunda listagem igual vem do cache; o banco só é consultado pela versão."""
+
+    url = reverse("lista_produtos")
+    first = client.get(url, {'ordering': '-preco'})
+
+    with django_assert_num_queries(1):  # Só a leitura da versão do catálogo.
+        second = client.get(url, {'ordering': '-preco'})
+
+    assert first['X-Cache'] == 'MISS'
+    assert second['X-Cache'] == 'HIT'
+    assert second.json() == first.json()
+
+
+@pytest.mark.django_db
+def test_catalog_cache_invalidated_by_another_process(client, products, mocker,
+                                                     django_capture_on_commit_callbacks):
+    """
+    Uma escrita feita em outro processo, com o seu próprio cache local (um comando
+    de gerenciamento, outro worker), invalida o cache deste processo.
+    """
+
+    url = reverse("lista_produtos")
+    client.get(url)
+    assert client.get(url)['X-Cache'] == 'HIT'
+
+    Produto.objects.filter(pk=products[0].pk).update(titulo="Outro título") # pylint: disable=no-member
+    other = mocker.patch.object(catalog_cache, "cache", LocMemCache("outro-processo", {}))
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog_cache.bump_catalog_version()
+    mocker.stop(other)
+    response = client.get(url)
+
+    assert response['X-Cache'] == 'MISS'
+    assert "Outro título" in [p['titulo'] for p in response.json()]
+
+
+@pytest.mark.django_db
+def test_index_rebuilt_after_bump_in_another_process(client, products,
+                                                    django_capture_on_commit_callbacks):
+    """Os índices em memória também são remontados quando outro processo troca a versão."""
+
+    url = reverse("sugestoes_produtos")
+    client.get(url, {'q': 'x'})
+
+    Produto.objects.filter(pk=products[0].pk).update(titulo="Regata Lisa") # pylint: disable=no-member
+    # Sem os índices deste processo: a escrita aconteceu em outro lugar.
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog_cache.bump_catalog_version()
+
+    renamed = client.get(url, {'q': 'regata'}).json()
+
+    assert [s['titulo'] for s in renamed['sugestoes']] == ["Regata Lisa"]
+
+
+@pytest.mark.django_db
+def test_catalog_cache_key_normalizes_query_string(client, products):
+    """A ordem dos parâmetros da query string não gera entradas diferentes."""
+
+    url = reverse("lista_produtos")
+    client.get(f"{url}?categoria=Camisetas&ordering=preco")
+    response = client.get(f"{url}?ordering=preco&categoria=Camisetas")
+
+    assert response['X-Cache'] == 'HIT'
+
+
+@pytest.mark.django_db
+def test_product_detail_cache_invalidated_on_image_delete(client, staff_client, products):
+    """Remover uma imagem pela API invalida o detalhe do produto em cache."""
+
+    product = products[0]
+    imagem = ProdutoImagem.objects.create(produto=product) # pylint: disable=no-member
+    url = reverse("detalhes_produto", args=[product.id])
+
+    assert len(client.get(url).json()['imagens']) == 1
+    assert client.get(url)['X-Cache'] == 'HIT'
+
+    staff_client.delete(reverse("product-image-delete", args=[imagem.id]))
+    response = client.get(url)
+
+    assert response['X-Cache'] == 'MISS'
+    assert response.json()['imagens'] == []
+
+
+@pytest.mark.django_db
+def test_product_detail_cache_invalidated_on_update(client, staff_client, products):
+    """Atualizar um produto pela API invalida o cache."""
+
+    product = products[0]
+    url = reverse("detalhes_produto", args=[product.id])
+    client.get(url)
+
+    staff_client.patch(url, data={"titulo": "Outro título"}, format='json')
+
+    assert client.get(url).json()['titulo'] == "Outro título"
+
+
+@pytest.mark.django_db
+def test_catalog_cache_stats(client, common_client, staff_client, products):
+    """As estatísticas do cache são expostas apenas para administradores."""
+
+    url = reverse("lista_produtos")
+    client.get(url)
+    client.get(url)
+
+    assert common_client.get(reverse("estatisticas_cache")).status_code == 403
+
+    stats = staff_client.get(reverse("estatisticas_cache")).json()
+
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['hit_ratio'] == 0.5
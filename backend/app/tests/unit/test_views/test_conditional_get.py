@@ -0,0 +1,128 @@
+import pytest
+from django.urls import reverse
+from app.models import Produto, ProdutoCarrinho, ProdutoImagem
+
+
+@pytest.mark.django_db
+def test_products_list_returns_validators(client, products):
+    """A listagem de produtos traz ETag e Last-Modified."""
+
+    response = client.get(reverse("lista_produtos"))
+
+    assert response.status_code == 200
+    assert response['ETag'].startswith('"')
+    assert 'Last-Modified' in response
+
+
+@pytest.mark.django_db
+def test_products_list_if_none_match(client, products):
+    """Com o ETag atual a rota responde 304 sem corpo."""
+
+    url = reverse("lista_produtos")
+    etag = client.get(url)['ETag']
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+    assert not response.content
+
+
+@pytest.mark.django_db
+def test_products_list_etag_changes_on_write(client, products):
+    """Alterar um produto ou remover uma imagem gera um novo ETag."""
+
+    url = reverse("lista_produtos")
+    imagem = ProdutoImagem.objects.create(produto=products[0]) # pylint: disable=no-member
+    etag = client.get(url)['ETag']
+
+    imagem.delete()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_products_list_etag_depends_on_query(client, products):
+    """Filtros diferentes produzem ETags diferentes."""
+
+    url = reverse("lista_produtos")
+
+    assert client.get(url)['ETag'] != client.get(url, {'categoria': 'Camisetas'})['ETag']
+
+
+@pytest.mark.django_db
+def test_product_detail_if_modified_since(client, products):
+    """O detalhe responde 304 a um If-Modified-Since igual ao Last-Modified."""
+
+    url = reverse("detalhes_produto", args=[products[0].id])
+    last_modified = client.get(url)['Last-Modified']
+
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_order_list_if_none_match(common_client, orders, django_assert_num_queries):
+    """Um 304 da listagem de pedidos custa só a agregação e a leitura das quantidades."""
+
+    url = reverse("lista_pedidos")
+    etag = common_client.get(url)['ETag']
+
+    with django_assert_num_queries(2):
+        response = common_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_order_detail_etag_changes_on_update(staff_client, orders):
+    """Atualizar um pedido muda o ETag do detalhe."""
+
+    url = reverse("detalhes_pedido", args=[orders[0].id])
+    etag = staff_client.get(url)['ETag']
+
+    staff_client.patch(url, data={"bairro": "Centro"}, format='json')
+    response = staff_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_order_routes_send_only_etag(common_client, orders):
+    """As rotas de pedidos não enviam Last-Modified, que não acompanha remoções."""
+
+    response = common_client.get(reverse("lista_pedidos"))
+
+    assert 'ETag' in response
+    assert 'Last-Modified' not in response
+
+
+@pytest.mark.django_db
+def test_order_detail_etag_follows_cart_items(common_client, orders, products):
+    """Mudar a quantidade de um item, o produto ou suas imagens muda o ETag do pedido."""
+
+    url = reverse("detalhes_pedido", args=[orders[0].id])
+    ProdutoCarrinho.objects.create( # pylint: disable=no-member
+        id_carrinho=orders[0].codigo_carrinho, id_produto=products[0], quantidade=1
+    )
+    etags = [common_client.get(url)['ETag']]
+
+    ProdutoCarrinho.objects.filter( # pylint: disable=no-member
+        id_carrinho=orders[0].codigo_carrinho, id_produto=products[0]
+    ).update(quantidade=2)
+    etags.append(common_client.get(url)['ETag'])
+
+    products[0].preco = 1
+    products[0].save()
+    etags.append(common_client.get(url)['ETag'])
+
+    ProdutoImagem.objects.create(produto=products[0]) # pylint: disable=no-member
+    etags.append(common_client.get(url)['ETag'])
+
+    assert len(set(etags)) == len(etags)
+    response = common_client.get(url, HTTP_IF_NONE_MATCH=etags[0])
+    assert response.status_code == 200
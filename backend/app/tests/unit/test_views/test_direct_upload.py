@@ -0,0 +1,222 @@
+"""Testes para o upload direto de imagens ao bucket com URL assinada."""
+
+import io
+import posixpath
+
+import pytest
+from django.core import signing
+from django.urls import reverse
+from PIL import Image
+
+from app.models import ProdutoImagem
+from app.storage import SupabaseStorage
+
+BUCKET_URL = "https://example.supabase.co/storage/v1/object/public/imagens-produtos/"
+
+
+class FakeBucket:
+    """Bucket do Supabase em memória, com os métodos usados pelo SupabaseStorage."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def create_signed_upload_url(self, path):
+        return {'signed_url': f"https://example.supabase.co/upload/sign/{path}?token=t", 'token': 't'}
+
+    def exists(self, path):
+        return path in self.objects
+
+    def list(self, path=None, options=None):
+        return [
+            {'name': posixpath.basename(name), 'id': 1, 'metadata': {'size': len(body)}}
+            for name, body in self.objects.items()
+            if posixpath.dirname(name) == (path or '')
+            and posixpath.basename(name) == (options or {}).get('search')
+        ]
+
+    def download(self, path):
+        return self.objects[path]
+
+    def get_public_url(self, path):
+        return f"{BUCKET_URL}{path}"
+
+    def upload(self, path, file, file_options): # pylint: disable=unused-argument
+        self.objects[path] = file.read()
+
+    def remove(self, paths):
+        for path in paths:
+            self.objects.pop(path, None)
+
+
+@pytest.fixture
+def bucket(settings, mocker):
+    """Usa o SupabaseStorage sobre um bucket em memória para as imagens."""
+
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'product_images': {'BACKEND': 'app.storage.SupabaseStorage'},
+    }
+    settings.IMAGE_PIPELINE = {**settings.IMAGE_PIPELINE, 'EAGER': True}
+    fake = FakeBucket()
+    mocker.patch.object(SupabaseStorage, '_bucket', return_value=fake)
+    yield fake
+
+
+def _jpeg():
+    buffer = io.BytesIO()
+    Image.new("RGB", (400, 300), "green").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+def test_direct_upload_flow(staff_client, products, bucket, django_capture_on_commit_callbacks):
+    """URL assinada, envio direto ao bucket e finalização criam a imagem pronta."""
+
+    response = staff_client.post(
+        reverse('upload_direto'), {"produto": products[0].id, "nome": "Foto.JPG"}, format='json'
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body['caminho'].startswith("media/produtos/diretos/")
+    assert body['caminho'].endswith(".jpg")
+    assert body['token'] == 't'
+
+    # O navegador envia o arquivo direto ao Supabase.
+    bucket.objects[body['caminho']] = _jpeg()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        final = staff_client.post(
+            reverse('finalizar_upload_direto'), {"ticket": body['ticket']}, format='json'
+        )
+    assert final.status_code == 201
+    imagem = ProdutoImagem.objects.get(pk=final.json()['id']) # pylint: disable=no-member
+    assert imagem.status == ProdutoImagem.Status.PRONTA
+    assert imagem.url == f"{BUCKET_URL}{body['caminho']}"
+    assert set(imagem.derivadas['webp']) == {'320', '400'}
+
+    again = staff_client.post(
+        reverse('finalizar_upload_direto'), {"ticket": body['ticket']}, format='json'
+    )
+    assert again.status_code == 200
+    assert again.json()['id'] == imagem.id
+
+
+@pytest.mark.django_db
+def test_finalize_requires_uploaded_object(staff_client, products, bucket): # pylint: disable=unused-argument
+    """Sem o arquivo no bucket a imagem não é criada."""
+
+    body = staff_client.post(
+        reverse('upload_direto'), {"produto": products[0].id, "nome": "foto.png"}, format='json'
+    ).json()
+    response = staff_client.post(
+        reverse('finalizar_upload_direto'), {"ticket": body['ticket']}, format='json'
+    )
+
+    assert response.status_code == 400
+    assert not ProdutoImagem.objects.exists() # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_finalize_rejects_oversized_object(staff_client, products, bucket, settings):
+    """Um arquivo acima do limite é apagado do bucket e recusado."""
+
+    settings.IMAGE_UPLOAD_MAX_SIZE = 10
+    body = staff_client.post(
+        reverse('upload_direto'), {"produto": products[0].id, "nome": "foto.jpg"}, format='json'
+    ).json()
+    bucket.objects[body['caminho']] = _jpeg()
+
+    response = staff_client.post(
+        reverse('finalizar_upload_direto'), {"ticket": body['ticket']}, format='json'
+    )
+
+    assert response.status_code == 400
+    assert body['caminho'] not in bucket.objects
+
+
+@pytest.mark.django_db
+def test_finalize_does_not_download_the_object(staff_client, products, bucket, mocker):
+    """A finalização não baixa o arquivo: a imagem fica em 'processando' até o pipeline."""
+
+    body = staff_client.post(
+        reverse('upload_direto'), {"produto": products[0].id, "nome": "foto.jpg"}, format='json'
+    ).json()
+    bucket.objects[body['caminho']] = _jpeg()
+    download = mocker.spy(bucket, 'download')
+
+    response = staff_client.post(
+        reverse('finalizar_upload_direto'), {"ticket": body['ticket']}, format='json'
+    )
+
+    assert response.status_code == 201
+    assert response.json()['status'] == ProdutoImagem.Status.PROCESSANDO
+    assert download.call_count == 0
+
+
+@pytest.mark.django_db
+def test_object_that_is_not_an_image_is_rejected_in_background(
+        staff_client, products, bucket, django_capture_on_commit_callbacks):
+    """Um arquivo que o Pillow não abre é apagado do bucket e a imagem fica com 'erro'."""
+
+    body = staff_client.post(
+        reverse('upload_direto'), {"produto": products[0].id, "nome": "foto.jpg"}, format='json'
+    ).json()
+    bucket.objects[body['caminho']] = b"<html>nao sou uma imagem</html>"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = staff_client.post(
+            reverse('finalizar_upload_direto'), {"ticket": body['ticket']}, format='json'
+        )
+
+    assert response.status_code == 201
+    imagem = ProdutoImagem.objects.get(pk=response.json()['id']) # pylint: disable=no-member
+    assert imagem.status == ProdutoImagem.Status.ERRO
+    assert imagem.erro == "O arquivo enviado não é uma imagem válida."
+    assert body['caminho'] not in bucket.objects
+    assert not ProdutoImagem.objects.prontas().exists() # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_direct_upload_requires_staff(common_client, staff_client, products, bucket):
+    """Clientes comuns não recebem URLs assinadas nem finalizam uploads."""
+
+    response = common_client.post(
+        reverse('upload_direto'), {"produto": products[0].id, "nome": "foto.jpg"}, format='json'
+    )
+    assert response.status_code == 403
+
+    body = staff_client.post(
+        reverse('upload_direto'), {"produto": products[0].id, "nome": "foto.jpg"}, format='json'
+    ).json()
+    bucket.objects[body['caminho']] = _jpeg()
+    response = common_client.post(
+        reverse('finalizar_upload_direto'), {"ticket": body['ticket']}, format='json'
+    )
+    assert response.status_code == 403
+    assert not ProdutoImagem.objects.exists() # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_tampered_ticket_and_bad_extension_are_rejected(staff_client, products, bucket): # pylint: disable=unused-argument
+    """Tickets não emitidos pelo Django e extensões que não são de imagem são recusados."""
+
+    forjado = signing.dumps({'produto': products[0].id, 'caminho': "media/outro.jpg"}, salt="outro")
+    response = staff_client.post(reverse('finalizar_upload_direto'), {"ticket": forjado}, format='json')
+    assert response.status_code == 400
+
+    response = staff_client.post(
+        reverse('upload_direto'), {"produto": products[0].id, "nome": "script.exe"}, format='json'
+    )
+    assert response.status_code == 400
+    assert 'nome' in response.json()
+
+
+@pytest.mark.django_db
+def test_local_storage_has_no_direct_upload(staff_client, products):
+    """O storage local não emite URLs assinadas."""
+
+    response = staff_client.post(
+        reverse('upload_direto'), {"produto": products[0].id, "nome": "a.jpg"}, format='json'
+    )
+
+    assert response.status_code == 501
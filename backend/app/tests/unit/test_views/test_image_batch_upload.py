@@ -0,0 +1,127 @@
+"""Testes para o upload de várias imagens de um produto numa requisição."""
+
+import io
+import threading
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image
+
+from app.image_pipeline import enqueue
+from app.models import ProdutoImagem
+
+URL_FINAL = "https://example.supabase.co/storage/v1/object/public/imagens-produtos/media/produtos/x.jpg"
+
+
+def _foto(name, size=50):
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), "blue").save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+@pytest.mark.django_db
+def test_batch_upload_reports_errors_per_file(
+        staff_client, products, image_spool, django_assert_max_num_queries):
+    """Arquivos válidos são aceitos de uma vez; os inválidos aparecem em 'erros'."""
+
+    data = {
+        "produto": products[0].id,
+        "imagens": [
+            _foto("frente.jpg"), _foto("costas.jpg"),
+            SimpleUploadedFile("notas.txt", b"texto", content_type="text/plain"),
+        ],
+    }
+    with django_assert_max_num_queries(4):
+        response = staff_client.post(reverse('upload_imagens_lote'), data, format='multipart')
+
+    assert response.status_code == 202
+    body = response.json()
+    assert [img['status'] for img in body['imagens']] == ['processando', 'processando']
+    assert [erro['arquivo'] for erro in body['erros']] == ["notas.txt"]
+    assert ProdutoImagem.objects.filter(produto=products[0]).count() == 2 # pylint: disable=no-member
+    assert sorted(p.name for p in image_spool.iterdir()) == sorted(
+        f"{img['id']}.jpg" for img in body['imagens']
+    )
+
+
+@pytest.mark.django_db
+def test_batch_upload_rejects_oversized_files_per_file(staff_client, products, image_spool, settings):
+    """Um arquivo acima do limite vai para 'erros' sem impedir o envio dos demais."""
+
+    settings.IMAGE_UPLOAD_MAX_SIZE = _foto("a.jpg").size
+    data = {"produto": products[0].id, "imagens": [_foto("frente.jpg"), _foto("grande.jpg", 1000)]}
+    response = staff_client.post(reverse('upload_imagens_lote'), data, format='multipart')
+
+    assert response.status_code == 202
+    body = response.json()
+    assert len(body['imagens']) == 1
+    assert body['erros'] == [{
+        'arquivo': "grande.jpg",
+        'erros': [f"O arquivo passa do limite de {settings.IMAGE_UPLOAD_MAX_SIZE} bytes."],
+    }]
+    assert len(list(image_spool.iterdir())) == 1
+
+
+@pytest.mark.django_db
+def test_batch_upload_requires_staff(common_client, products):
+    """Clientes comuns não podem enviar imagens de produtos."""
+
+    data = {"produto": products[0].id, "imagens": [_foto("frente.jpg")]}
+    response = common_client.post(reverse('upload_imagens_lote'), data, format='multipart')
+
+    assert response.status_code == 403
+    assert not ProdutoImagem.objects.exists() # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_batch_upload_without_valid_files_is_rejected(staff_client, products):
+    """Sem nenhum arquivo válido nada é criado."""
+
+    data = {
+        "produto": products[0].id,
+        "imagens": [SimpleUploadedFile("notas.txt", b"texto", content_type="text/plain")],
+    }
+    response = staff_client.post(reverse('upload_imagens_lote'), data, format='multipart')
+
+    assert response.status_code == 400
+    assert response.json()['imagens'][0]['arquivo'] == "notas.txt"
+    assert not ProdutoImagem.objects.exists() # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_batch_upload_finalizes_every_image(
+        staff_client, products, settings, mocker, django_capture_on_commit_callbacks):
+    """Depois do commit todas as imagens do lote ficam prontas."""
+
+    settings.IMAGE_PIPELINE = {**settings.IMAGE_PIPELINE, 'EAGER': True}
+    mocker.patch('app.image_pipeline.upload_file_object_to_supabase', return_value=URL_FINAL)
+    data = {"produto": products[0].id, "imagens": [_foto(f"{n}.jpg") for n in range(3)]}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        staff_client.post(reverse('upload_imagens_lote'), data, format='multipart')
+
+    assert set(ProdutoImagem.objects.values_list('status', flat=True)) == {'pronta'} # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_workers_upload_files_concurrently(settings, mocker, django_capture_on_commit_callbacks):
+    """Os envios do lote rodam ao mesmo tempo, até o limite de WORKERS."""
+
+    settings.IMAGE_PIPELINE = {**settings.IMAGE_PIPELINE, 'WORKERS': 4}
+    mocker.patch('app.image_pipeline._executor', None)
+    barrier = threading.Barrier(4, timeout=5)
+    done = [threading.Event() for _ in range(4)]
+
+    def fake_process(imagem_id, content_type=None): # pylint: disable=unused-argument
+        # Só passa da barreira se os quatro envios estiverem em andamento juntos.
+        barrier.wait()
+        done[imagem_id].set()
+
+    mocker.patch('app.image_pipeline.process_image', side_effect=fake_process)
+    mocker.patch('app.image_pipeline.close_old_connections')
+    with django_capture_on_commit_callbacks(execute=True):
+        for imagem_id in range(4):
+            enqueue(imagem_id)
+
+    assert all(event.wait(5) for event in done)
@@ -0,0 +1,230 @@
+"""Testes para o pipeline assíncrono de upload de imagens."""
+
+import io
+
+import pytest
+from django.core.files import File
+from django.core.management import call_command
+from django.urls import reverse
+
+from app.image_pipeline import spool_image
+from app.models import Produto, ProdutoImagem
+from app.storage import UploadTooLarge
+
+URL_FINAL = "https://example.supabase.co/storage/v1/object/public/imagens-produtos/media/produtos/x.jpg"
+
+
+@pytest.fixture
+def eager(settings):
+    """Roda o envio logo após o commit, na própria thread do teste."""
+
+    settings.IMAGE_PIPELINE = {**settings.IMAGE_PIPELINE, 'EAGER': True}
+
+
+@pytest.fixture
+def upload(mocker):
+    """Substitui o upload para o Supabase."""
+
+    return mocker.patch('app.image_pipeline.upload_file_object_to_supabase', return_value=URL_FINAL)
+
+
+@pytest.mark.django_db
+def test_upload_returns_202_and_spools_file(staff_client, products, img, upload, image_spool):
+    """A requisição só grava o arquivo no spool; o upload fica para depois do commit."""
+
+    response = staff_client.post(
+        reverse('upload_image'), {"produto": products[0].id, "imagem": img}, format='multipart'
+    )
+
+    assert response.status_code == 202
+    body = response.json()
+    assert body['status'] == 'processando'
+    assert response['Location'].endswith(reverse('status_imagem', args=[body['id']]))
+    assert (image_spool / f"{body['id']}.jpg").exists()
+    upload.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_processing_image_is_hidden_until_ready(
+        staff_client, client, products, img, upload, eager, image_spool,
+        django_capture_on_commit_callbacks): # pylint: disable=unused-argument
+    """A imagem só aparece no catálogo e no status como pronta depois do upload."""
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = staff_client.post(
+            reverse('upload_image'), {"produto": products[0].id, "imagem": img}, format='multipart'
+        )
+    imagem_id = response.json()['id']
+    detalhe = reverse('detalhes_produto', args=[products[0].id])
+    status_url = reverse('status_imagem', args=[imagem_id])
+
+    assert client.get(detalhe).json()['imagens'] == []
+    pending = staff_client.get(status_url)
+    assert pending.json()['status'] == 'processando'
+    assert pending['Retry-After'] == '2'
+
+    for callback in callbacks:
+        callback()
+
+    ready = staff_client.get(status_url)
+    assert ready.json()['status'] == 'pronta'
+    assert ready.json()['url'] == URL_FINAL
+    assert ready.json()['srcset']['webp'].endswith("media/produtos/x/100.webp 100w")
+    assert not ready.has_header('Retry-After')
+    assert [i['url'] for i in client.get(detalhe).json()['imagens']] == [URL_FINAL]
+    assert not list(image_spool.iterdir())
+
+
+@pytest.mark.django_db
+def test_failed_upload_keeps_file_for_retry(
+        products, img, upload, eager, image_spool, django_capture_on_commit_callbacks):
+    """Uma falha marca a imagem como 'erro' e o comando de pendentes a reenvia."""
+
+    upload.return_value = None
+    with django_capture_on_commit_callbacks(execute=True):
+        imagem = spool_image(products[0], File(img, name=img.name))
+
+    imagem.refresh_from_db()
+    assert imagem.status == ProdutoImagem.Status.ERRO
+    assert imagem.erro
+    assert (image_spool / f"{imagem.id}.jpg").exists()
+
+    upload.return_value = URL_FINAL
+    out = io.StringIO()
+    call_command("processar_imagens_pendentes", stdout=out)
+
+    assert "1 imagens enviadas, 0 com erro, 0 arquivos órfãos removidos." in out.getvalue()
+    imagem.refresh_from_db()
+    assert imagem.status == ProdutoImagem.Status.PRONTA
+    assert imagem.url == URL_FINAL
+
+
+@pytest.mark.django_db
+def test_upload_error_is_recorded_on_the_image(
+        products, img, upload, eager, image_spool, django_capture_on_commit_callbacks):
+    """A falha do storage fica no 'erro' da imagem e o arquivo continua no spool."""
+
+    upload.side_effect = RuntimeError("bucket fora do ar")
+    with django_capture_on_commit_callbacks(execute=True):
+        imagem = spool_image(products[0], File(img, name=img.name))
+
+    imagem.refresh_from_db()
+    assert imagem.status == ProdutoImagem.Status.ERRO
+    assert imagem.erro == "Erro ao fazer upload da imagem para o Supabase: bucket fora do ar"
+    assert (image_spool / f"{imagem.id}.jpg").exists()
+
+
+@pytest.mark.django_db
+def test_oversized_upload_is_rejected_before_spooling(
+        staff_client, products, img, upload, image_spool, settings):
+    """Um arquivo acima de IMAGE_UPLOAD_MAX_SIZE recebe 400 e não chega ao spool."""
+
+    settings.IMAGE_UPLOAD_MAX_SIZE = 10
+    response = staff_client.post(
+        reverse('upload_image'), {"produto": products[0].id, "imagem": img}, format='multipart'
+    )
+
+    assert response.status_code == 400
+    assert response.json()['imagem'] == ["O arquivo passa do limite de 10 bytes."]
+    assert not ProdutoImagem.objects.exists() # pylint: disable=no-member
+    assert not image_spool.exists() or not list(image_spool.iterdir())
+    upload.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_spool_enforces_size_limit_while_writing(products, img, image_spool, settings):
+    """O limite também vale durante a gravação em blocos, sem deixar imagem nem arquivo."""
+
+    settings.IMAGE_UPLOAD_MAX_SIZE = 10
+    with pytest.raises(UploadTooLarge):
+        spool_image(products[0], File(img, name=img.name))
+
+    assert not ProdutoImagem.objects.exists() # pylint: disable=no-member
+    assert not list(image_spool.iterdir())
+
+
+@pytest.mark.django_db
+def test_upload_too_large_is_a_permanent_failure(
+        products, img, upload, eager, image_spool, django_capture_on_commit_callbacks):
+    """Um arquivo recusado pelo storage fica com um erro específico e sai do spool."""
+
+    upload.side_effect = UploadTooLarge(10)
+    with django_capture_on_commit_callbacks(execute=True):
+        imagem = spool_image(products[0], File(img, name=img.name))
+
+    imagem.refresh_from_db()
+    assert imagem.status == ProdutoImagem.Status.ERRO
+    assert imagem.erro == "O arquivo passa do limite de 10 bytes."
+    assert not list(image_spool.iterdir())
+
+    out = io.StringIO()
+    call_command("processar_imagens_pendentes", stdout=out)
+    assert "0 imagens enviadas" in out.getvalue()
+    assert upload.call_count == 1
+
+
+@pytest.mark.django_db
+def test_product_create_defers_image_upload(
+        staff_client, img, upload, eager, django_capture_on_commit_callbacks):
+    """Criar um produto não espera o upload da imagem."""
+
+    payload = {
+        "titulo": "Bolsa Térmica", "descricao": "Bolsa.", "categoria": "termicas",
+        "preco": 99.9, "quantidade": 3, "material": "Lona", "cor_padrao": "Azul",
+        "altura": 20, "comprimento": 30, "largura": 10, "imagem": img,
+    }
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = staff_client.post(reverse('lista_produtos'), payload, format='multipart')
+
+    assert response.status_code == 201
+    # A imagem ainda em processamento não aparece na resposta, como nas rotas de leitura.
+    assert response.json()['imagens'] == []
+    upload.assert_not_called()
+    produto = Produto.objects.get(pk=response.json()['id']) # pylint: disable=no-member
+    assert produto.imagens.get().status == ProdutoImagem.Status.PROCESSANDO
+
+    for callback in callbacks:
+        callback()
+
+    assert produto.imagens.get().url == URL_FINAL
+
+
+@pytest.mark.django_db
+def test_product_update_replaces_image_through_pipeline(
+        staff_client, products, img, upload, eager, image_spool,
+        django_capture_on_commit_callbacks): # pylint: disable=unused-argument
+    """Trocar a imagem no detalhe do produto passa pelo spool; a antiga sai quando a nova fica pronta."""
+
+    antiga = ProdutoImagem.objects.create(produto=products[0], url="https://example.com/antiga.jpg") # pylint: disable=no-member
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = staff_client.patch(
+            reverse('detalhes_produto', args=[products[0].id]), {"imagem": img}, format='multipart'
+        )
+
+    assert response.status_code == 200
+    assert [i['url'] for i in response.json()['imagens']] == [antiga.url]
+    upload.assert_not_called()
+    assert sorted(products[0].imagens.values_list('status', flat=True)) == ['processando', 'pronta']
+
+    for callback in callbacks:
+        callback()
+
+    assert list(products[0].imagens.values_list('url', flat=True)) == [URL_FINAL]
+    assert not ProdutoImagem.objects.filter(pk=antiga.pk).exists() # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_failed_replacement_keeps_current_image(
+        staff_client, products, img, upload, eager, image_spool,
+        django_capture_on_commit_callbacks): # pylint: disable=unused-argument
+    """Se o envio da nova imagem falha, o produto continua com a imagem atual."""
+
+    upload.return_value = None
+    antiga = ProdutoImagem.objects.create(produto=products[0], url="https://example.com/antiga.jpg") # pylint: disable=no-member
+    with django_capture_on_commit_callbacks(execute=True):
+        staff_client.patch(
+            reverse('detalhes_produto', args=[products[0].id]), {"imagem": img}, format='multipart'
+        )
+
+    assert list(products[0].imagens.prontas().values_list('pk', flat=True)) == [antiga.pk]
+    assert products[0].imagens.filter(status='erro').exists()
@@ -79,7 +79,7 @@ def test_valid_image_upload_with_staff_client(staff_client, products, img):
     url = reverse('upload_image')
     response = staff_client.post(url, data, format='multipart')
 
-    assert response.status_code == 201
+    assert response.status_code == 202
 
 
 @pytest.mark.django_db
@@ -1,7 +1,7 @@
 import pytest
 from django.urls import reverse
 from app.serializers import OrderSerializer
-from app.models import Pedido
+from app.models import Carrinho, Pedido, ProdutoCarrinho, ProdutoImagem
 
 @pytest.mark.django_db
 def test_order_list_get_with_non_authenticated_client(client, orders):
@@ -175,4 +175,61 @@ def test_order_detail_delete_with_staff_client(staff_client, orders):
     assert response.status_code == 204
 
     with pytest.raises(Pedido.DoesNotExist):
-        Pedido.objects.get(id=order.id)
\ No newline at end of file
+        Pedido.objects.get(id=order.id)
+
+def _add_items(orders, products, with_images=True):
+    """Liga todos os produtos, opcionalmente com uma imagem, aos carrinhos dos pedidos."""
+
+    if with_images:
+        for product in products:
+            ProdutoImagem.objects.create(produto=product) # pylint: disable=no-member
+    for order in orders:
+        for product in products:
+            ProdutoCarrinho.objects.create( # pylint: disable=no-member
+                id_produto=product, id_carrinho=order.codigo_carrinho, quantidade=1
+            )
+
+
+@pytest.mark.django_db
+def test_order_list_query_count_is_constant(common_client, orders, products,
+                                            django_assert_num_queries):
+    """
+    A listagem de pedidos usa sempre 5 consultas (validadores do ETag e quantidades
+    dos itens, pedidos + carrinhos, itens + produtos e imagens), não importa quantos
+    pedidos existam.
+    """
+
+    _add_items(orders, products)
+    url = reverse("lista_pedidos")
+
+    with django_assert_num_queries(5):
+        response = common_client.get(url)
+
+    assert response.status_code == 200
+    assert all(len(o['produtos_do_carrinho']) == len(products) for o in response.json())
+
+    for _ in range(5):
+        carrinho = Carrinho.objects.create(subtotal=10.0) # pylint: disable=no-member
+        orders.append(Pedido.objects.create( # pylint: disable=no-member
+            codigo_carrinho=carrinho, valor_total=10.0
+        ))
+    _add_items(orders[-5:], products, with_images=False)
+
+    with django_assert_num_queries(5):
+        response = common_client.get(url)
+
+    assert len(response.json()) == len(orders)
+
+
+@pytest.mark.django_db
+def test_order_detail_query_count(staff_client, orders, products, django_assert_num_queries):
+    """O detalhe de um pedido também carrega os itens em 5 consultas."""
+
+    _add_items(orders, products)
+    url = reverse("detalhes_pedido", args=[orders[0].id])
+
+    with django_assert_num_queries(5):
+        response = staff_client.get(url)
+
+    assert response.status_code == 200
+    assert len(response.json()['produtos_do_carrinho']) == len(products)
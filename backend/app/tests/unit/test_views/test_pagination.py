@@ -0,0 +1,131 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from app.models import Produto
+from app.pagination import KeysetCursorPagination
+
+
+def _walk(client, url, params):
+    """Percorre todas as páginas seguindo o link 'next' e retorna os ids na ordem."""
+
+    ids = []
+    response = client.get(url, params)
+    while True:
+        assert response.status_code == 200
+        body = response.json()
+        ids.extend(item['id'] for item in body['results'])
+        if not body['next']:
+            return ids
+        response = client.get(body['next'])
+
+
+@pytest.mark.django_db
+def test_products_list_without_page_size_returns_plain_list(client, products):
+    """Sem 'page_size' ou 'cursor' a rota continua devolvendo a lista completa."""
+
+    response = client.get(reverse("lista_produtos"))
+
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+    assert len(response.json()) == len(products)
+
+
+@pytest.mark.django_db
+def test_products_list_keyset_pages_follow_ordering(client, products):
+    """As páginas seguem a ordenação por preço, sem repetir nem pular produtos."""
+
+    for product in products:
+        Produto.objects.create( # pylint: disable=no-member
+            preco=product.preco, quantidade=1, categoria=product.categoria,
+            material=product.material, cor_padrao=product.cor_padrao,
+            titulo=f"{product.titulo} (cópia)"
+        )
+
+    ids = _walk(client, reverse("lista_produtos"), {'page_size': 2})
+    expected = list(
+        Produto.objects.order_by('preco', 'id').values_list('id', flat=True) # pylint: disable=no-member
+    )
+
+    assert ids == expected
+
+
+@pytest.mark.django_db
+def test_products_list_keyset_descending_with_filter(client, products):
+    """O cursor respeita a ordenação decrescente e os filtros da query string."""
+
+    ids = _walk(client, reverse("lista_produtos"), {
+        'page_size': 1, 'ordering': '-preco', 'search': 'ideal',
+    })
+    expected = [p.id for p in sorted(products[:2], key=lambda p: p.preco, reverse=True)]
+
+    assert ids == expected
+
+
+@pytest.mark.django_db
+def test_products_list_first_page_does_not_count(client, products):
+    """A primeira página não executa 'COUNT(*)'."""
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse("lista_produtos"), {'page_size': 2})
+
+    assert response.status_code == 200
+    assert not any('COUNT(*)' in q['sql'].upper() for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_products_list_invalid_cursor(client, products):
+    """Um cursor malformado retorna 404."""
+
+    response = client.get(reverse("lista_produtos"), {'cursor': '!!!'})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_orders_list_keyset_by_created_at(common_client, orders):
+    """A listagem de pedidos pagina pela data de criação."""
+
+    ids = _walk(common_client, reverse("lista_pedidos"), {
+        'page_size': 2, 'ordering': '-created_at',
+    })
+    expected = [o.id for o in sorted(orders, key=lambda o: (o.created_at, o.id), reverse=True)]
+
+    assert ids == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('value', ['barato', [1], {'a': 1}])
+def test_products_list_cursor_with_wrong_value_type(client, products, value):
+    """Um cursor com valor de tipo errado para o campo de ordenação retorna 404."""
+
+    pagination = KeysetCursorPagination()
+    cursor = pagination.encode_cursor({'f': 'preco', 'd': False, 'v': value, 'id': 1})
+
+    response = client.get(reverse("lista_produtos"), {'cursor': cursor})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_products_list_cursor_with_wrong_id_type(client, products):
+    """Um cursor com 'id' inválido retorna 404."""
+
+    pagination = KeysetCursorPagination()
+    cursor = pagination.encode_cursor({'f': 'preco', 'd': False, 'v': 10, 'id': 'x'})
+
+    response = client.get(reverse("lista_produtos"), {'cursor': cursor})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_products_list_keyset_rejects_multiple_ordering_fields(client, products):
+    """A paginação por cursor recusa uma ordenação com mais de um campo."""
+
+    response = client.get(reverse("lista_produtos"), {
+        'page_size': 2, 'ordering': 'preco,quantidade',
+    })
+
+    assert response.status_code == 400
+    assert 'ordering' in response.json()
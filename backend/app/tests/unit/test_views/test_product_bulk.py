@@ -0,0 +1,139 @@
+import json
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from app.models import Produto
+
+
+CSV_HEADER = "id,titulo,descricao,categoria,preco,quantidade,material,cor_padrao,altura,comprimento,largura\n"
+
+
+def _upload(client, name, content):
+    """Envia um arquivo para a rota de importação."""
+
+    arquivo = SimpleUploadedFile(name, content.encode('utf-8'))
+    return client.post(reverse("importar_produtos"), {'arquivo': arquivo}, format='multipart')
+
+
+@pytest.mark.django_db
+def test_import_requires_staff(common_client):
+    """Apenas administradores podem importar produtos."""
+
+    response = _upload(common_client, "produtos.csv", CSV_HEADER)
+
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_import_csv_creates_updates_and_reports_errors(staff_client, products):
+    """O CSV cria produtos novos, atualiza os existentes e relata as linhas inválidas."""
+
+    content = CSV_HEADER + (
+        ",Mochila Nova,,feminino,120.5,3,Lona,Verde,,,\n"
+        f"{products[0].id},,,,99.9,7,,,,,\n"
+        ",Sem preço,,feminino,,3,Lona,Verde,,,\n"
+        ",Categoria errada,,bolsas,10,1,Lona,Verde,,,\n"
+    )
+
+    response = _upload(staff_client, "produtos.csv", content)
+    data = response.json()
+    products[0].refresh_from_db()
+
+    assert response.status_code == 200
+    assert data['criados'] == 1
+    assert data['atualizados'] == 1
+    assert data['total_erros'] == 2
+    assert [e['linha'] for e in data['erros']] == [4, 5]
+    assert 'preco' in data['erros'][0]['erros']
+    assert products[0].preco == 99.9
+    assert products[0].titulo == "Camiseta Básica Preta"
+    assert Produto.objects.filter(titulo="Mochila Nova").exists() # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_import_ndjson(staff_client, db):
+    """O NDJSON é lido linha a linha, com erro para JSON inválido."""
+
+    content = "\n".join([
+        json.dumps({"titulo": "Bolsa", "categoria": "feminino", "preco": 80, "quantidade": 2,
+                    "material": "Couro", "cor_padrao": "Preto"}),
+        "{inválido",
+        "",
+    ])
+
+    data = _upload(staff_client, "produtos.ndjson", content).json()
+
+    assert data['criados'] == 1
+    assert data['erros'] == [{'linha': 2, 'erros': {'linha': ['JSON inválido.']}}]
+
+
+@pytest.mark.django_db
+def test_import_non_utf8_file_is_reported(staff_client, db):
+    """Um arquivo que não é UTF-8 vira um erro de arquivo no relatório, não um 500."""
+
+    content = (CSV_HEADER + ",Mochila Ação,,feminino,120.5,3,Lona,Verde,,,\n").encode('latin-1')
+    arquivo = SimpleUploadedFile("produtos.csv", content)
+
+    response = staff_client.post(reverse("importar_produtos"), {'arquivo': arquivo},
+                                 format='multipart')
+
+    assert response.status_code == 200
+    assert response.json()['criados'] == 0
+    assert list(response.json()['erros'][0]['erros']) == ['arquivo']
+
+
+@pytest.mark.django_db
+def test_import_malformed_csv_keeps_previous_rows(staff_client, db):
+    """Um CSV malformado encerra a leitura com erro de arquivo; as linhas lidas antes ficam."""
+
+    content = CSV_HEADER + (
+        ",Mochila Nova,,feminino,120.5,3,Lona,Verde,,,\n"
+        f',"{"x" * 200000}",,feminino,10,1,Lona,Verde,,,\n'
+    )
+
+    data = _upload(staff_client, "produtos.csv", content).json()
+
+    assert data['criados'] == 1
+    assert data['total_erros'] == 1
+    assert 'arquivo' in data['erros'][0]['erros']
+
+
+@pytest.mark.django_db
+def test_import_invalidates_catalog_cache(client, staff_client, products):
+    """A importação invalida o cache da listagem, mesmo sem sinais do bulk_create."""
+
+    url = reverse("lista_produtos")
+    client.get(url)
+
+    _upload(staff_client, "produtos.csv",
+            CSV_HEADER + ",Mochila Nova,,feminino,120.5,3,Lona,Verde,,,\n")
+
+    response = client.get(url)
+
+    assert response['X-Cache'] == 'MISS'
+    assert len(response.json()) == len(products) + 1
+
+
+@pytest.mark.django_db
+def test_export_csv_streams_catalog(staff_client, products):
+    """A exportação em CSV é enviada em streaming e pode ser reimportada."""
+
+    response = staff_client.get(reverse("exportar_produtos"))
+    body = b"".join(response.streaming_content).decode('utf-8')
+    lines = body.strip().splitlines()
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert lines[0] == CSV_HEADER.strip()
+    assert len(lines) == len(products) + 1
+
+
+@pytest.mark.django_db
+def test_export_ndjson(staff_client, products):
+    """A exportação em NDJSON traz um objeto JSON por linha."""
+
+    response = staff_client.get(reverse("exportar_produtos"), {'formato': 'ndjson'})
+    rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+    assert response['Content-Type'].startswith('application/x-ndjson')
+    assert [r['id'] for r in rows] == sorted(p.id for p in products)
@@ -0,0 +1,111 @@
+from unittest.mock import patch
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from app.models import Produto
+
+
+@pytest.mark.django_db
+def test_bulk_update_requires_staff(common_client, products):
+    """Apenas administradores podem atualizar em lote."""
+
+    response = common_client.patch(
+        reverse("atualizar_produtos_lote"), [{"id": products[0].id, "preco": 1}], format='json'
+    )
+
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_bulk_update_single_statement(staff_client, products):
+    """Preço e estoque de vários produtos são gravados em um único UPDATE."""
+
+    payload = [
+        {"id": products[0].id, "preco": 10.5},
+        {"id": products[1].id, "quantidade": 0},
+        {"id": products[2].id, "preco": 20, "quantidade": 4},
+    ]
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = staff_client.patch(reverse("atualizar_produtos_lote"), payload, format='json')
+
+    updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+    for product in products:
+        product.refresh_from_db()
+
+    assert response.status_code == 200
+    assert response.json() == {'atualizados': 3}
+    assert len(updates) == 1
+    assert (products[0].preco, products[0].quantidade) == (10.5, 10)
+    assert (products[1].preco, products[1].quantidade) == (349.90, 0)
+    assert (products[2].preco, products[2].quantidade) == (20, 4)
+
+
+@pytest.mark.django_db
+def test_bulk_update_uses_product_validations(staff_client, products):
+    """As regras de preço e quantidade do cadastro continuam valendo."""
+
+    payload = [
+        {"id": products[0].id, "preco": 0},
+        {"id": products[1].id, "quantidade": -1},
+        {"id": products[2].id},
+    ]
+
+    response = staff_client.patch(reverse("atualizar_produtos_lote"), payload, format='json')
+
+    assert response.status_code == 400
+    assert 'preco' in response.json()[0]
+    assert 'quantidade' in response.json()[1]
+    assert 'non_field_errors' in response.json()[2]
+
+
+@pytest.mark.django_db
+def test_bulk_update_is_atomic(staff_client, products):
+    """Se algum id não existe nada é gravado."""
+
+    payload = [{"id": products[0].id, "preco": 5}, {"id": 999999, "preco": 5}]
+
+    response = staff_client.patch(reverse("atualizar_produtos_lote"), payload, format='json')
+    products[0].refresh_from_db()
+
+    assert response.status_code == 400
+    assert response.json()['ids'] == [999999]
+    assert products[0].preco == 149.90
+
+
+@pytest.mark.django_db
+def test_bulk_update_invalidates_catalog_cache(client, staff_client, products):
+    """A atualização em lote invalida o cache do detalhe do produto."""
+
+    url = reverse("detalhes_produto", args=[products[0].id])
+    client.get(url)
+
+    staff_client.patch(
+        reverse("atualizar_produtos_lote"), [{"id": products[0].id, "preco": 1.99}], format='json'
+    )
+
+    assert client.get(url).json()['preco'] == 1.99
+    assert Produto.objects.get(pk=products[0].id).preco == 1.99 # pylint: disable=no-member
+
+
+@pytest.mark.django_db
+def test_bulk_update_rejects_empty_list(staff_client, products):
+    """Uma lista vazia é recusada sem invalidar o catálogo."""
+
+    with patch('app.bulk.catalog_changed') as catalog_changed:
+        response = staff_client.patch(reverse("atualizar_produtos_lote"), [], format='json')
+
+    assert response.status_code == 400
+    catalog_changed.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_bulk_update_rejects_more_than_max_items(staff_client, products):
+    """O lote aceita no máximo 1000 itens."""
+
+    payload = [{"id": i, "preco": 1} for i in range(1, 1502)]
+
+    response = staff_client.patch(reverse("atualizar_produtos_lote"), payload, format='json')
+
+    assert response.status_code == 400
@@ -0,0 +1,67 @@
+import pytest
+from django.urls import reverse
+from app.models import Produto
+
+
+@pytest.mark.django_db
+def test_product_facets_counts(client, products):
+    """Retorna as contagens por valor de cada faceta e por faixa de preço."""
+
+    response = client.get(reverse("facetas_produtos"))
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data['total'] == 3
+    assert {f['valor']: f['total'] for f in data['categoria']} == {
+        "Camisetas": 1, "Calçados": 1, "Acessórios": 1,
+    }
+    assert {f['valor'] for f in data['cor_padrao']} == {"Preto", "Branco", "Azul"}
+    assert [b['total'] for b in data['preco']] == [0, 1, 1, 1, 0]
+    assert data['preco'][-1] == {'min': 400, 'max': None, 'total': 0}
+
+
+@pytest.mark.django_db
+def test_product_facets_respect_filters(client, products):
+    """As contagens consideram os filtros e a busca da query string."""
+
+    response = client.get(reverse("facetas_produtos"), {'categoria': 'Calçados'})
+    data = response.json()
+
+    assert data['total'] == 1
+    assert data['material'] == [{'valor': "Couro sintético", 'total': 1}]
+
+    response = client.get(reverse("facetas_produtos"), {'search': 'ideal'})
+
+    assert response.json()['total'] == 2
+
+
+@pytest.mark.django_db
+def test_product_facets_single_query_and_cache(client, products, django_assert_num_queries):
+    """A primeira chamada faz uma única consulta e a segunda vem do cache."""
+
+    url = reverse("facetas_produtos")
+
+    # A versão do catálogo e a agregação; depois, só a versão.
+    with django_assert_num_queries(2):
+        client.get(url)
+
+    with django_assert_num_queries(1):
+        client.get(url)
+
+
+@pytest.mark.django_db
+def test_product_facets_invalidated_on_write(client, products):
+    """Criar um produto invalida as facetas em cache."""
+
+    url = reverse("facetas_produtos")
+    assert client.get(url).json()['total'] == 3
+
+    Produto.objects.create( # pylint: disable=no-member
+        preco=20.0, quantidade=1, categoria="Acessórios", material="Lona",
+        cor_padrao="Azul", titulo="Necessaire"
+    )
+
+    data = client.get(url).json()
+
+    assert data['total'] == 4
+    assert data['categoria'][0] == {'valor': "Acessórios", 'total': 2}
@@ -0,0 +1,69 @@
+import pytest
+from django.urls import reverse
+from app.models import Produto, ProdutoImagem
+
+
+def _add_images(products, per_product=3):
+    """Cria algumas imagens para cada produto, na ordem de criação."""
+
+    for product in products:
+        for i in range(per_product):
+            ProdutoImagem.objects.create( # pylint: disable=no-member
+                produto=product, url=f"https://exemplo.com/{product.id}/{i}.jpg"
+            )
+
+
+@pytest.mark.django_db
+def test_products_list_query_count_is_constant(client, products, django_assert_num_queries):
+    """
+    Sem cache a listagem faz 4 consultas (versão do catálogo, validadores, produtos
+    e imagens), independente de quantos produtos existam.
+    """
+
+    _add_images(products)
+    url = reverse("lista_produtos")
+
+    with django_assert_num_queries(4):
+        response = client.get(url)
+    assert all(len(p['imagens']) == 3 for p in response.json())
+
+    extra = [
+        Produto.objects.create( # pylint: disable=no-member
+            preco=10.0 + i, quantidade=1, categoria="Acessórios", material="Lona",
+            cor_padrao="Azul", titulo=f"Produto {i}"
+        ) for i in range(5)
+    ]
+    _add_images(extra)
+
+    with django_assert_num_queries(4):
+        response = client.get(url)
+    assert len(response.json()) == len(products) + len(extra)
+
+
+@pytest.mark.django_db
+def test_products_list_images_first(client, products):
+    """'?images=first' retorna apenas a imagem mais antiga de cada produto."""
+
+    _add_images(products)
+
+    response = client.get(reverse("lista_produtos"), {'images': 'first'})
+
+    for item in response.json():
+        assert [img['url'] for img in item['imagens']] == [
+            f"https://exemplo.com/{item['id']}/0.jpg"
+        ]
+
+
+@pytest.mark.django_db
+def test_product_detail_images_ordered(client, products, django_assert_num_queries):
+    """O detalhe traz as imagens em ordem de criação com uma consulta só para elas."""
+
+    _add_images(products[:1])
+    url = reverse("detalhes_produto", args=[products[0].id])
+
+    with django_assert_num_queries(4):
+        response = client.get(url)
+
+    assert [img['url'] for img in response.json()['imagens']] == [
+        f"https://exemplo.com/{products[0].id}/{i}.jpg" for i in range(3)
+    ]
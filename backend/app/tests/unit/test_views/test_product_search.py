@@ -0,0 +1,73 @@
+import pytest
+from django.urls import reverse
+from app.models import Produto
+from app.search import product_index, stem, tokenize
+
+
+def test_tokenize_folds_accents_and_plurals():
+    """Acentos, caixa, plural e gênero caem no mesmo radical."""
+
+    assert tokenize("Bolsas Térmicas") == tokenize("bolsa termica")
+    assert tokenize("Mochila de Couro") == [stem("mochila"), stem("couro")]
+    assert stem("bolsoes") == stem("bolsao")
+
+
+@pytest.mark.django_db
+def test_products_search_ignores_accents(client, products):
+    """A busca encontra 'Boné' mesmo sem acento e ignora as stopwords."""
+
+    response = client.get(reverse("lista_produtos"), {'search': 'bone de marinho'})
+
+    assert response.status_code == 200
+    assert [p['id'] for p in response.json()] == [products[2].id]
+
+
+@pytest.mark.django_db
+def test_products_search_ranks_title_above_description(client, products):
+    """Produtos com o termo no título aparecem antes dos que só o têm na descrição."""
+
+    only_description = Produto.objects.create( # pylint: disable=no-member
+        preco=10.0, quantidade=1, categoria="Acessórios", material="Lona",
+        cor_padrao="Verde", titulo="Sacola", descricao="Combina com qualquer tênis."
+    )
+
+    response = client.get(reverse("lista_produtos"), {'search': 'tenis'})
+
+    assert [p['id'] for p in response.json()] == [products[1].id, only_description.id]
+
+
+@pytest.mark.django_db
+def test_products_search_with_explicit_ordering(client, products):
+    """Com '?ordering=' a ordenação pedida prevalece sobre a relevância."""
+
+    response = client.get(reverse("lista_produtos"), {'search': 'ideal', 'ordering': 'preco'})
+
+    assert [p['id'] for p in response.json()] == [products[0].id, products[1].id]
+
+
+@pytest.mark.django_db
+def test_products_search_index_refreshes_on_write(client, products):
+    """O índice em memória é descartado quando um produto é alterado."""
+
+    product_index.search("qualquer")
+    product = products[0]
+    product.titulo = "Mochila Escolar"
+    product.save()
+
+    response = client.get(reverse("lista_produtos"), {'search': 'mochilas'})
+
+    assert [p['id'] for p in response.json()] == [product.id]
+
+
+@pytest.mark.django_db
+def test_products_search_paginates_by_relevance(client, products):
+    """A paginação por cursor segue a ordem de relevância da busca."""
+
+    url = reverse("lista_produtos")
+    full = [p['id'] for p in client.get(url, {'search': 'ideal'}).json()]
+
+    first = client.get(url, {'search': 'ideal', 'page_size': 1}).json()
+    second = client.get(first['next']).json()
+
+    assert [p['id'] for p in first['results'] + second['results']] == full
+    assert second['next'] is None
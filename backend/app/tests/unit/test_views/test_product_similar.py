@@ -0,0 +1,130 @@
+import pytest
+from django.db import transaction
+from django.urls import reverse
+from app.models import Produto
+from app.similar import SimilarIndex, similar_index
+
+
+def make_product(**kwargs):
+    """Cria um produto com valores padrão para os campos não informados."""
+
+    data = {
+        'preco': 100.0, 'quantidade': 1, 'categoria': "feminino", 'material': "Couro",
+        'cor_padrao': "Preto", 'titulo': "Bolsa", 'descricao': "",
+        'altura': 30.0, 'comprimento': 40.0, 'largura': 10.0,
+    }
+    data.update(kwargs)
+    return Produto.objects.create(**data) # pylint: disable=no-member
+
+
+@pytest.fixture
+def catalog():
+    """Três bolsas de couro parecidas e uma mochila térmica bem diferente."""
+
+    return [
+        make_product(titulo="Bolsa A", preco=100.0),
+        make_product(titulo="Bolsa B", preco=110.0),
+        make_product(titulo="Bolsa C", preco=300.0, cor_padrao="Marrom"),
+        make_product(titulo="Mochila", preco=50.0, categoria="termicas", material="Lona",
+                     cor_padrao="Azul", altura=10.0, comprimento=10.0, largura=40.0),
+    ]
+
+
+@pytest.mark.django_db
+def test_similar_orders_by_similarity(client, catalog):
+    """O vizinho mais próximo é a bolsa quase igual; a mochila fica por último."""
+
+    response = client.get(reverse("produtos_similares", kwargs={'pk': catalog[0].id}))
+
+    assert response.status_code == 200
+    assert [p['id'] for p in response.json()] == [catalog[1].id, catalog[2].id, catalog[3].id]
+
+
+@pytest.mark.django_db
+def test_similar_limit_and_card_view(client, catalog):
+    """'limit' corta a lista e '?view=card' reduz os campos."""
+
+    response = client.get(
+        reverse("produtos_similares", kwargs={'pk': catalog[0].id}), {'limit': 1, 'view': 'card'}
+    )
+
+    assert [p['id'] for p in response.json()] == [catalog[1].id]
+    assert 'descricao' not in response.json()[0]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('limit', [-3, 0, 10000])
+def test_similar_limit_is_clamped(client, catalog, limit):
+    """'limit' fica entre 1 e o número de vizinhos guardados."""
+
+    response = client.get(
+        reverse("produtos_similares", kwargs={'pk': catalog[0].id}), {'limit': limit}
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()) == (1 if limit < 1 else len(catalog) - 1)
+
+
+@pytest.mark.django_db
+def test_similar_unknown_product(client, catalog): # pylint: disable=unused-argument
+    """Produto inexistente responde 404."""
+
+    response = client.get(reverse("produtos_similares", kwargs={'pk': 999999}))
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_similar_does_not_scan_the_table(client, catalog, django_assert_num_queries):
+    """Com o índice montado, a resposta só lê a versão e busca os vizinhos e suas imagens."""
+
+    url = reverse("produtos_similares", kwargs={'pk': catalog[0].id})
+    client.get(url)
+
+    # A versão do catálogo, o produto e os vizinhos.
+    with django_assert_num_queries(3):
+        client.get(url)
+
+
+@pytest.mark.django_db
+def test_similar_does_not_rebuild_after_committed_write(client, catalog, django_assert_num_queries,
+                                                        django_capture_on_commit_callbacks):
+    """Uma escrita confirmada numa transação não faz a próxima resposta remontar o índice."""
+
+    url = reverse("produtos_similares", kwargs={'pk': catalog[0].id})
+    client.get(url)
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            catalog[1].preco = 105.0
+            catalog[1].save()
+
+    # A versão do catálogo, o produto e os vizinhos.
+    with django_assert_num_queries(3):
+        client.get(url)
+
+
+@pytest.mark.django_db
+def test_incremental_update_matches_full_rebuild(catalog, django_assert_num_queries,
+                                                 django_capture_on_commit_callbacks):
+    """Criar, alterar e remover produtos dá o mesmo resultado que remontar o índice."""
+
+    similar_index.similar(catalog[0].id)
+    with django_capture_on_commit_callbacks(execute=True):
+        novo = make_product(titulo="Bolsa D", preco=105.0)
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            catalog[2].preco = 102.0
+            catalog[2].cor_padrao = "Preto"
+            catalog[2].save()
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog[1].delete()
+
+    remaining = [catalog[0], catalog[2], catalog[3], novo]
+    # Só a leitura da versão do catálogo em cada consulta.
+    with django_assert_num_queries(len(remaining)):
+        incremental = {p.id: similar_index.similar(p.id) for p in remaining}
+    rebuilt = SimilarIndex()
+
+    assert incremental == {p.id: rebuilt.similar(p.id) for p in remaining}
+    assert incremental[catalog[0].id] == [catalog[2].id, novo.id, catalog[3].id]
+    assert similar_index.similar(catalog[1].id) is None
@@ -0,0 +1,150 @@
+import pytest
+from django.db import transaction
+from django.urls import reverse
+from app.models import Produto
+from app.suggest import within_one_edit
+
+
+def test_within_one_edit():
+    """Aceita uma troca, inserção, remoção ou transposição, e nada além disso."""
+
+    assert within_one_edit("camisa", "camisa")
+    assert within_one_edit("camiza", "camisa")
+    assert within_one_edit("camsa", "camisa")
+    assert within_one_edit("caimsa", "camisa")
+    assert not within_one_edit("kamiza", "camisa")
+
+
+@pytest.mark.django_db
+def test_suggest_matches_prefix_without_accents(client, products):
+    """'ten' sugere o 'Tênis Esportivo Branco'."""
+
+    response = client.get(reverse("sugestoes_produtos"), {'q': 'ten'})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        'sugestoes': [{'id': products[1].id, 'titulo': products[1].titulo}]
+    }
+
+
+@pytest.mark.django_db
+def test_suggest_matches_category_and_material(client, products):
+    """Categoria e material também são indexados."""
+
+    by_material = client.get(reverse("sugestoes_produtos"), {'q': 'algod'}).json()
+    by_category = client.get(reverse("sugestoes_produtos"), {'q': 'acess'}).json()
+
+    assert [s['id'] for s in by_material['sugestoes']] == [products[0].id]
+    assert [s['id'] for s in by_category['sugestoes']] == [products[2].id]
+
+
+@pytest.mark.django_db
+def test_suggest_tolerates_a_typo(client, products):
+    """Um erro de digitação por termo ainda encontra o produto."""
+
+    response = client.get(reverse("sugestoes_produtos"), {'q': 'camizeta'})
+
+    assert [s['id'] for s in response.json()['sugestoes']] == [products[0].id]
+
+
+@pytest.mark.django_db
+def test_suggest_requires_every_term(client, products):
+    """Todos os termos digitados precisam casar com o mesmo produto."""
+
+    response = client.get(reverse("sugestoes_produtos"), {'q': 'bone marin'})
+    empty = client.get(reverse("sugestoes_produtos"), {'q': 'bone preta'})
+
+    assert [s['id'] for s in response.json()['sugestoes']] == [products[2].id]
+    assert empty.json() == {'sugestoes': []}
+
+
+@pytest.mark.django_db
+def test_suggest_ranks_title_matches_first_and_limits(client, products):
+    """Quem tem o termo no título vem antes; 'limit' corta o resultado."""
+
+    bolsa = Produto.objects.create( # pylint: disable=no-member
+        preco=10.0, quantidade=1, categoria="Bolsas", material="Lona",
+        cor_padrao="Verde", titulo="Sacola", descricao=""
+    )
+    couro = Produto.objects.create( # pylint: disable=no-member
+        preco=10.0, quantidade=1, categoria="Acessórios", material="Lona",
+        cor_padrao="Verde", titulo="Bolsa de Couro", descricao=""
+    )
+
+    response = client.get(reverse("sugestoes_produtos"), {'q': 'bols'})
+    limited = client.get(reverse("sugestoes_produtos"), {'q': 'bols', 'limit': 1})
+
+    assert [s['id'] for s in response.json()['sugestoes']] == [couro.id, bolsa.id]
+    assert [s['id'] for s in limited.json()['sugestoes']] == [couro.id]
+
+
+@pytest.mark.django_db
+def test_suggest_is_updated_incrementally(client, products, django_assert_num_queries,
+                                          django_capture_on_commit_callbacks):
+    """Depois de montado, o índice acompanha as escritas confirmadas sem voltar ao banco."""
+
+    url = reverse("sugestoes_produtos")
+    client.get(url, {'q': 'x'})
+
+    with django_capture_on_commit_callbacks(execute=True):
+        products[0].titulo = "Regata Lisa"
+        products[0].save()
+    with django_capture_on_commit_callbacks(execute=True):
+        products[2].delete()
+
+    # Só a leitura da versão do catálogo em cada requisição.
+    with django_assert_num_queries(3):
+        renamed = client.get(url, {'q': 'regata'}).json()
+        old = client.get(url, {'q': 'basica'}).json()
+        deleted = client.get(url, {'q': 'bone'}).json()
+
+    assert [s['titulo'] for s in renamed['sugestoes']] == ["Regata Lisa"]
+    assert old == {'sugestoes': []}
+    assert deleted == {'sugestoes': []}
+
+
+@pytest.mark.django_db
+def test_suggest_write_in_transaction_does_not_rebuild(client, products, django_assert_num_queries,
+                                                       django_capture_on_commit_callbacks):
+    """Uma escrita dentro de transaction.atomic() é aplicada no commit, sem remontar o índice."""
+
+    url = reverse("sugestoes_produtos")
+    client.get(url, {'q': 'x'})
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            products[0].titulo = "Regata Lisa"
+            products[0].save()
+
+    with django_assert_num_queries(1):  # Só a leitura da versão do catálogo.
+        renamed = client.get(url, {'q': 'regata'}).json()
+
+    assert [s['titulo'] for s in renamed['sugestoes']] == ["Regata Lisa"]
+
+
+@pytest.mark.django_db
+def test_suggest_ignores_rolled_back_write(client, products, django_assert_num_queries):
+    """Uma escrita desfeita não deixa sugestões fantasmas no índice."""
+
+    url = reverse("sugestoes_produtos")
+    client.get(url, {'q': 'x'})
+
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            products[0].titulo = "Regata Lisa"
+            products[0].save()
+            raise RuntimeError
+
+    with django_assert_num_queries(1):  # Só a leitura da versão do catálogo.
+        response = client.get(url, {'q': 'regata'}).json()
+
+    assert response == {'sugestoes': []}
+
+
+@pytest.mark.django_db
+def test_suggest_rejects_invalid_limit(client):
+    """'limit' precisa ser inteiro."""
+
+    response = client.get(reverse("sugestoes_produtos"), {'q': 'a', 'limit': 'muitos'})
+
+    assert response.status_code == 400
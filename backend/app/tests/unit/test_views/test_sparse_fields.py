@@ -0,0 +1,49 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+def test_products_list_fields_param(client, products):
+    """Com '?fields=' a resposta traz apenas os campos pedidos."""
+
+    response = client.get(reverse("lista_produtos"), {'fields': 'id,titulo,inexistente'})
+
+    assert response.status_code == 200
+    assert all(set(item) == {'id', 'titulo'} for item in response.json())
+
+
+@pytest.mark.django_db
+def test_products_list_card_view(client, products):
+    """A projeção 'card' omite descrição e dimensões."""
+
+    response = client.get(reverse("lista_produtos"), {'view': 'card'})
+    item = response.json()[0]
+
+    assert 'imagens' in item and 'preco' in item
+    assert not {'descricao', 'altura', 'comprimento', 'largura'} & set(item)
+
+
+@pytest.mark.django_db
+def test_products_list_card_view_selects_fewer_columns(client, products):
+    """A projeção é levada ao SELECT, sem buscar a descrição no banco."""
+
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(reverse("lista_produtos"), {'view': 'card'})
+
+    selects = [q['sql'] for q in ctx.captured_queries
+               if q['sql'].startswith('SELECT') and 'FROM "produto"' in q['sql']
+               and 'MAX(' not in q['sql']]
+
+    assert selects
+    assert all('"descricao"' not in sql for sql in selects)
+
+
+@pytest.mark.django_db
+def test_products_list_without_fields_returns_everything(client, products):
+    """Sem parâmetros a resposta continua completa."""
+
+    item = client.get(reverse("lista_produtos")).json()[0]
+
+    assert {'descricao', 'altura', 'imagens'} <= set(item)
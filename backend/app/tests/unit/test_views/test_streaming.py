@@ -0,0 +1,71 @@
+import json
+import pytest
+from django.urls import reverse
+from app.views import ProductList
+
+
+def streamed(response):
+    """Conteúdo completo de uma StreamingHttpResponse."""
+
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_product_list_stream_matches_regular_list(staff_client, products): # pylint: disable=unused-argument
+    """'?stream=1' envia o mesmo array JSON da listagem comum."""
+
+    regular = staff_client.get(reverse("lista_produtos"), {'categoria': 'Calçados'})
+    response = staff_client.get(reverse("lista_produtos"), {'categoria': 'Calçados', 'stream': '1'})
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Type'] == 'application/json'
+    assert json.loads(streamed(response)) == regular.json()
+
+
+@pytest.mark.django_db
+def test_product_list_ndjson(staff_client, products, monkeypatch):
+    """Com 'Accept: application/x-ndjson' cada produto vai numa linha, lendo em lotes."""
+
+    monkeypatch.setattr(ProductList, 'stream_chunk_size', 2)
+
+    response = staff_client.get(
+        reverse("lista_produtos"), {'view': 'card'}, HTTP_ACCEPT='application/x-ndjson'
+    )
+
+    lines = streamed(response).decode().splitlines()
+    assert response['Content-Type'] == 'application/x-ndjson'
+    assert [json.loads(line)['id'] for line in lines] == [p.id for p in
+                                                          sorted(products, key=lambda p: p.preco)]
+    assert 'descricao' not in json.loads(lines[0])
+
+
+@pytest.mark.django_db
+def test_product_list_ndjson_format_override(staff_client, products):
+    """'?format=ndjson' também escolhe NDJSON."""
+
+    response = staff_client.get(reverse("lista_produtos"), {'format': 'ndjson'})
+
+    assert len(streamed(response).splitlines()) == len(products)
+
+
+@pytest.mark.django_db
+def test_stream_requires_staff(client, common_client, products): # pylint: disable=unused-argument
+    """O modo streaming é só para admins; a listagem comum continua pública."""
+
+    assert client.get(reverse("lista_produtos"), {'stream': '1'}).status_code == 401
+    assert common_client.get(reverse("lista_produtos"), {'stream': '1'}).status_code == 403
+    assert client.get(reverse("lista_produtos")).status_code == 200
+
+
+@pytest.mark.django_db
+def test_order_list_stream(staff_client, orders):
+    """Pedidos filtrados saem em NDJSON com os itens do carrinho."""
+
+    response = staff_client.get(
+        reverse("lista_pedidos"), {'status': 'approved'}, HTTP_ACCEPT='application/x-ndjson'
+    )
+
+    rows = [json.loads(line) for line in streamed(response).splitlines()]
+    assert [row['id'] for row in rows] == [o.id for o in orders if o.status == 'approved']
+    assert 'produtos_do_carrinho' in rows[0]
@@ -5,8 +5,25 @@ from . import views
 
 urlpatterns = [
     path('products/', views.ProductList.as_view(), name="lista_produtos"),
+    path('products/suggest/', views.ProductSuggest.as_view(), name="sugestoes_produtos"),
+    path('products/best-sellers/', views.ProductBestSellers.as_view(), name="mais_vendidos"),
+    path('products/facets/', views.ProductFacets.as_view(), name="facetas_produtos"),
+    path('products/import/', views.ProductImportView.as_view(), name="importar_produtos"),
+    path('products/export/', views.ProductExportView.as_view(), name="exportar_produtos"),
+    path('products/bulk/', views.ProductPriceStockBulkView.as_view(), name="atualizar_produtos_lote"),
     path('product/<int:pk>/', views.ProductDetail.as_view(), name="detalhes_produto"),
+    path('product/<int:pk>/similar/', views.ProductSimilar.as_view(), name="produtos_similares"),
+    path(
+        'product/<int:pk>/bought-together/', views.ProductBoughtTogether.as_view(),
+        name="comprados_juntos"),
+    path('catalog/cache-stats/', views.CatalogCacheStats.as_view(), name="estatisticas_cache"),
     path('image/', views.ImageUploadView.as_view(), name='upload_image'),
+    path('image/batch/', views.ImageBatchUploadView.as_view(), name='upload_imagens_lote'),
+    path('image/direct/', views.DirectUploadView.as_view(), name='upload_direto'),
+    path(
+        'image/direct/finalize/', views.DirectUploadFinalizeView.as_view(),
+        name='finalizar_upload_direto'),
+    path('image/<int:pk>/', views.ImageStatusView.as_view(), name='status_imagem'),
     path(
         'product-image/<int:pk>/delete/', views.ImagemProdutoDeleteView.as_view(),
         name='product-image-delete'),
@@ -1,6 +1,9 @@
 from supabase import create_client, Client
+import hashlib
+import logging
 import os
-import uuid
+
+logger = logging.getLogger(__name__)
 
 # === Leitura das variáveis de ambiente ===
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
@@ -28,35 +31,63 @@ def insert_to_supabase(table_name: str, data: dict):
     except Exception as e:
         print(f"Erro ao inserir dados na tabela {table_name}: {e}")
 
+# === Hash do conteúdo, lido em blocos para não carregar o arquivo duas vezes ===
+def file_sha256(file_obj, chunk_size: int = 64 * 1024) -> str:
+    digest = hashlib.sha256()
+    file_obj.seek(0)
+    for chunk in iter(lambda: file_obj.read(chunk_size), b''):
+        digest.update(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
 # === Função NOVA para upload via objeto de arquivo (Django request.FILES['imagem']) ===
-def upload_file_object_to_supabase(file_obj, content_type: str) -> str | None:
-    bucket_name = 'imagens-produtos'
-    nome_arquivo = f"media/produtos/{uuid.uuid4()}.{file_obj.name.split('.')[-1]}"
+# O nome do objeto é o SHA-256 do conteúdo: um arquivo já enviado (registrado em
+# ArquivoImagem) reutiliza a URL existente sem reenviar o arquivo, desde que o objeto
+# ainda exista no bucket. O envio passa pelo storage 'product_images' (Supabase ou
+# pasta local), que lê o arquivo em blocos. Erros são registrados no log e repassados
+# ao chamador, que guarda a falha na imagem.
+def upload_file_object_to_supabase(file_obj, content_type: str) -> str:
+    from django.core.files.storage import storages # pylint: disable=import-outside-toplevel
+    from django.utils import timezone # pylint: disable=import-outside-toplevel
+    from app.models import ArquivoImagem # pylint: disable=import-outside-toplevel
+    from app.storage import UploadTooLarge # pylint: disable=import-outside-toplevel
 
     try:
-        data = file_obj.read()
-
-        result = supabase.storage.from_(bucket_name).upload(
-            path=nome_arquivo,
-            file=data,
-            file_options={"content-type": content_type}
+        sha256 = file_sha256(file_obj)
+        storage = storages['product_images']
+        existente = ArquivoImagem.objects.filter(sha256=sha256).first()
+        # A consulta ao bucket fica fora de qualquer trava. A coleta de órfãos
+        # (app/image_gc.py) apaga o objeto e a linha com a linha travada: se o UPDATE
+        # ainda encontra a linha, o objeto continua lá e o 'usado_em' novo o protege.
+        if existente and storage.exists(existente.caminho):
+            if ArquivoImagem.objects.filter(pk=existente.pk).update(usado_em=timezone.now()):
+                return existente.url
+        elif existente:
+            # O objeto foi apagado do bucket; o registro não vale mais e o arquivo é reenviado.
+            existente.delete()
+
+        nome_arquivo = f"media/produtos/{sha256}.{file_obj.name.split('.')[-1].lower()}"
+        if not getattr(file_obj, 'content_type', None):
+            file_obj.content_type = content_type
+        # Mesmo nome implica mesmo conteúdo, então sobrescrever é seguro.
+        storage.save(nome_arquivo, file_obj)
+
+        url = storage.url(nome_arquivo)
+        arquivo, _ = ArquivoImagem.objects.get_or_create(
+            sha256=sha256,
+            defaults={
+                'caminho': nome_arquivo, 'url': url,
+                'tamanho': getattr(file_obj, 'size', None) or storage.size(nome_arquivo),
+            }
         )
-
-        print("Resultado do upload:", result)
-
-        #  Checagem segura agora
-        if hasattr(result, "error") and result.error:
-            print("Erro no upload:", result.error)
-            return None
-
-        # Gera a URL pública corretamente
-        url = supabase.storage.from_(bucket_name).get_public_url(nome_arquivo)
-        print("URL pública gerada:", url)
-        return url
-
-    except Exception as e:
-        print(f"Erro ao fazer upload do arquivo para Supabase: {e}")
-        return None
+        return arquivo.url
+
+    except UploadTooLarge:
+        # Falha esperada; o chamador registra o erro específico e descarta o arquivo.
+        raise
+    except Exception:
+        logger.exception("Erro ao fazer upload do arquivo %s para o storage.", file_obj.name)
+        raise
 
 # === (Opcional) Obter URL pública de um arquivo já existente ===
 def get_public_url_from_supabase(file_name: str) -> str | None:
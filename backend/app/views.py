@@ -4,7 +4,7 @@ import logging
 import json
 from datetime import datetime
 from django.shortcuts import render
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.db import transaction, DatabaseError
 from rest_framework import generics, filters, status
 from django.core.mail import send_mail, EmailMultiAlternatives
@@ -18,9 +18,23 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.conf import settings
+from django.core.cache import cache
 from django.core.mail import send_mail
 from .utils.supabase_utils import fetch_from_supabase, insert_to_supabase
 from .services.mercadopago_service import MercadoPagoService
+from .pagination import KeysetCursorPagination
+from .search import ProductOrderingFilter, ProductSearchFilter
+from .facets import FACET_FIELDS, CACHE_TIMEOUT, compute_facets, facets_cache_key
+from .catalog_cache import CatalogCacheMixin, cache_stats
+from .suggest import suggest_index
+from .similar import TOP_K, similar_index
+from .conditional import ConditionalGetMixin
+from .streaming import StreamingListMixin
+from .direct_upload import DirectUploadError, finalize_upload, issue_upload, supports_direct_upload
+from .bulk import (
+    FORMATS, MissingProducts, detect_format, export_products, import_products,
+    update_prices_and_stock,
+)
 from . import models, serializers
 from .models import Carrinho, Cor, Personalizacao, Produto, ProdutoCarrinho, Pedido
 from .serializers import CarrinhoSerializer, CorSerializer, PersonalizacaoSerializer, ProdutoSerializer, ProdutoCarrinhoSerializer, OrderSerializer, ProdutoImagemSerializer
@@ -33,6 +47,7 @@ from rest_framework.response import Response
 from rest_framework.generics import DestroyAPIView
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
+from rest_framework.exceptions import ValidationError
 from botocore.exceptions import ClientError
 import mercadopago
 import json
@@ -40,7 +55,7 @@ import logging
 import uuid
 
 logger = logging.getLogger(__name__)
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, IsAdminUser
 
 def home_view(request):
     """Homepage de teste."""
@@ -109,34 +124,309 @@ def insert_data_view(request):
     return HttpResponse(status=405)
 
 
-class ProductList(generics.ListCreateAPIView):
+class ProductList(StreamingListMixin, CatalogCacheMixin, generics.ListCreateAPIView):
     """
     API view para listar e criar produtos.
     """
     queryset = models.Produto.objects.all() # pylint: disable=no-member
     serializer_class = serializers.ProductListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter, ProductOrderingFilter]
     filterset_fields = ['categoria', 'material', 'cor_padrao']
-    search_fields = ['titulo', 'descricao', 'material', 'categoria', 'cor_padrao']
-    ordering_fields = ['preco', 'quantidade']
+    ordering_fields = ['preco', 'quantidade', 'vendidos']
     ordering = ['preco']
+    pagination_class = KeysetCursorPagination
+    cache_prefix = 'lista'
+    validator_timestamps = ('atualizado_em', 'imagens__criado_em')
+    validator_counts = ('pk', 'imagens')
+
+    def get_queryset(self):
+        """
+        Pré-carrega as imagens e, com '?fields=' ou '?view=', carrega do banco só as
+        colunas usadas na resposta.
+        """
+        queryset = super().get_queryset()
+        fields = self.get_serializer_class().requested_fields(self.request)
+        if fields:
+            concrete = {f.name for f in models.Produto._meta.concrete_fields} # pylint: disable=protected-access
+            queryset = queryset.only('id', *self.ordering_fields, *(concrete & set(fields)))
+        if fields is None or 'imagens' in fields:
+            queryset = queryset.with_images(self.request.query_params.get('images') == 'first')
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        if self.wants_stream(request):
+            return self.streaming_list(request)
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+
+class ProductBestSellers(CatalogCacheMixin, generics.ListAPIView):
+    """
+    API view com os produtos mais vendidos ('?limit=', até 50; '?categoria=' opcional),
+    lidos do rollup Produto.vendidos pelo índice da coluna.
+    """
+    queryset = models.Produto.objects.filter(vendidos__gt=0).order_by('-vendidos', 'id') # pylint: disable=no-member
+    serializer_class = serializers.ProductListSerializer
+    permission_classes = [AllowAny]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['categoria']
+    cache_prefix = 'mais_vendidos'
+    validator_timestamps = ('atualizado_em', 'imagens__criado_em')
+    validator_counts = ('pk', 'imagens')
+    default_limit = 12
+    max_limit = 50
+
+    def get_queryset(self):
+        """Pré-carrega as imagens; '?images=first' traz só a imagem principal."""
+        return super().get_queryset().with_images(
+            self.request.query_params.get('images') == 'first'
+        )
+
+    def list(self, request, *args, **kwargs):
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            return Response({'detail': 'limit deve ser um número inteiro.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, self.max_limit))
+
+        def handler(request, *args, **kwargs): # pylint: disable=unused-argument
+            produtos = self.filter_queryset(self.get_queryset())[:limit]
+            return Response(self.get_serializer(produtos, many=True).data)
+
+        return self.cached_response(request, handler, *args, **kwargs)
 
 
-class ProductDetail(generics.RetrieveUpdateDestroyAPIView):
+class ProductFacets(generics.GenericAPIView):
+    """
+    API view que retorna quantos produtos existem por categoria, material, cor e
+    faixa de preço, respeitando os mesmos filtros e a busca da listagem.
+    """
+    queryset = models.Produto.objects.all() # pylint: disable=no-member
+    permission_classes = [AllowAny]
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter]
+    filterset_fields = FACET_FIELDS
+
+    def get(self, request):
+        """Retorna as facetas do cache ou as calcula em uma única consulta."""
+        relevant = set(self.filterset_fields) | {ProductSearchFilter.search_param}
+        key = facets_cache_key(
+            [(k, v) for k in relevant for v in request.query_params.getlist(k)]
+        )
+
+        data = cache.get(key)
+        if data is None:
+            data = compute_facets(self.filter_queryset(self.get_queryset()))
+            cache.set(key, data, CACHE_TIMEOUT)
+        return Response(data)
+
+
+class ProductSuggest(APIView):
+    """
+    API view de autocompletar: '?q=' com o texto digitado e '?limit=' (até 20)
+    retorna id e título dos produtos cujo título, categoria ou material começam
+    com os termos, a partir de um índice em memória.
+    """
+    permission_classes = [AllowAny]
+    default_limit = 8
+    max_limit = 20
+
+    def get(self, request):
+        """Retorna as sugestões sem consultar o banco (exceto ao montar o índice)."""
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            return Response({'detail': 'limit deve ser um número inteiro.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, self.max_limit))
+        query = request.query_params.get('q', '')[:100]
+        return Response({'sugestoes': suggest_index.suggest(query, limit)})
+
+
+class ProductSimilar(generics.GenericAPIView):
+    """
+    API view que lista os produtos mais parecidos com um produto ('?limit=', até 12),
+    na ordem de similaridade, a partir dos vizinhos pré-calculados em memória.
+    Aceita as mesmas projeções da listagem ('?view=card', '?fields=').
+    """
+    queryset = models.Produto.objects.all() # pylint: disable=no-member
+    serializer_class = serializers.ProductListSerializer
+    permission_classes = [AllowAny]
+    max_limit = TOP_K
+
+    def get(self, request, pk):
+        """Busca só os produtos vizinhos, pela chave primária."""
+        try:
+            limit = int(request.query_params.get('limit', self.max_limit))
+        except ValueError:
+            return Response({'detail': 'limit deve ser um número inteiro.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, self.max_limit))
+        ids = similar_index.similar(pk, limit)
+        if ids is None:
+            return Response({'detail': 'Produto não encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+
+        produtos = self.get_queryset().filter(pk__in=ids).with_images(
+            request.query_params.get('images') == 'first'
+        ).in_bulk()
+        ordered = [produtos[pid] for pid in ids if pid in produtos]
+        return Response(self.get_serializer(ordered, many=True).data)
+
+
+class ProductBoughtTogether(generics.GenericAPIView):
+    """
+    API view com os produtos mais comprados junto com um produto ('?limit=', até 10),
+    ordenados por lift, a partir da tabela gerada pelo comando minerar_associacoes.
+    """
+    queryset = models.Produto.objects.all() # pylint: disable=no-member
+    serializer_class = serializers.ProductListSerializer
+    permission_classes = [AllowAny]
+    max_limit = 10
+
+    def get(self, request, pk):
+        """Lê as associações do produto pelo índice (produto, -lift)."""
+        try:
+            limit = int(request.query_params.get('limit', self.max_limit))
+        except ValueError:
+            return Response({'detail': 'limit deve ser um número inteiro.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, self.max_limit))
+
+        ids = list(
+            models.ProdutoAssociacao.objects.filter(produto_id=pk) # pylint: disable=no-member
+            .order_by('-lift', '-ocorrencias', 'associado_id')
+            .values_list('associado_id', flat=True)[:limit]
+        )
+        produtos = self.get_queryset().filter(pk__in=ids).with_images(
+            request.query_params.get('images') == 'first'
+        ).in_bulk() if ids else {}
+        ordered = [produtos[pid] for pid in ids if pid in produtos]
+        return Response(self.get_serializer(ordered, many=True).data)
+
+
+class ProductDetail(CatalogCacheMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API view para recuperar, atualizar ou deletar um produto específico.
     """
     queryset = models.Produto.objects.all() # pylint: disable=no-member
     serializer_class = serializers.ProductDetailSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cache_prefix = 'detalhe'
+    validator_timestamps = ('atualizado_em', 'imagens__criado_em')
+    validator_counts = ('pk', 'imagens')
+
+    def get_queryset(self):
+        """Pré-carrega as imagens; '?images=first' traz só a imagem principal."""
+        return super().get_queryset().with_images(
+            self.request.query_params.get('images') == 'first'
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+
+class ProductImportView(APIView):
+    """
+    API view para importar produtos em lote a partir de um arquivo CSV ou NDJSON
+    enviado no campo 'arquivo'. Linhas com 'id' atualizam o produto existente.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        """Processa o arquivo em lotes e retorna o relatório com os erros por linha."""
+        arquivo = request.FILES.get('arquivo')
+        if arquivo is None:
+            return Response({'detail': 'Envie o arquivo no campo "arquivo".'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        fmt = request.data.get('formato') or detect_format(arquivo.name)
+        if fmt not in FORMATS:
+            return Response({'detail': f'Formato inválido. Use: {", ".join(FORMATS)}.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        report = import_products(arquivo.file, fmt)
+        return Response(report.as_dict(), status=status.HTTP_200_OK)
+
+
+class ProductExportView(APIView):
+    """API view que exporta o catálogo inteiro em CSV ou NDJSON, em streaming."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Retorna o catálogo no formato de '?formato=' (csv por padrão)."""
+        fmt = request.query_params.get('formato', 'csv')
+        if fmt not in FORMATS:
+            return Response({'detail': f'Formato inválido. Use: {", ".join(FORMATS)}.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        response = StreamingHttpResponse(
+            export_products(fmt), content_type=f'{content_type}; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="produtos.{fmt}"'
+        return response
+
+
+class ProductPriceStockBulkView(APIView):
+    """
+    API view para atualizar preço e/ou estoque de vários produtos de uma vez.
+    Recebe uma lista de {"id", "preco"?, "quantidade"?} e grava tudo em um único UPDATE.
+    """
+    permission_classes = [IsAdminUser]
+
+    def patch(self, request):
+        """Valida o lote e aplica as alterações em uma transação."""
+        serializer = serializers.ProductPriceStockListSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            updated = update_prices_and_stock(serializer.validated_data)
+        except MissingProducts as e:
+            return Response({'detail': 'Produtos não encontrados.', 'ids': e.ids},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response({'atualizados': updated})
+
+
+class CatalogCacheStats(APIView):
+    """API view que expõe a versão do catálogo e os contadores do cache."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Retorna versão, acertos, faltas e taxa de acerto do cache do catálogo."""
+        return Response(cache_stats())
 
 logger = logging.getLogger(__name__)
 
-class OrderList(generics.ListAPIView):
+class OrderConditionalMixin(ConditionalGetMixin):
+    """
+    Validadores das rotas de pedidos. O corpo traz os itens do carrinho com produtos e
+    imagens: o ETag cobre os timestamps e as contagens desses produtos e imagens e as
+    quantidades dos itens, que não têm timestamp. Como remoções e quantidades não
+    movem nenhum timestamp, as rotas não enviam Last-Modified.
+    """
+
+    validator_timestamps = (
+        'updated_at',
+        'codigo_carrinho__produtocarrinho__id_produto__atualizado_em',
+        'codigo_carrinho__produtocarrinho__id_produto__imagens__criado_em',
+    )
+    validator_counts = ('pk', 'codigo_carrinho__produtocarrinho__id_produto__imagens')
+    send_last_modified = False
+
+    def get_validator_rows(self, queryset):
+        return ProdutoCarrinho.objects.filter( # pylint: disable=no-member
+            id_carrinho__in=queryset.values('codigo_carrinho')
+        ).order_by('id_carrinho', 'id_produto').values_list(
+            'id_carrinho', 'id_produto', 'quantidade'
+        )
+
+
+class OrderList(StreamingListMixin, OrderConditionalMixin, generics.ListAPIView):
     """Classe que retorna uma lista de pedidos através do GET."""
 
-    queryset = models.Pedido.objects.all() # pylint: disable=no-member
+    queryset = models.Pedido.objects.with_cart_items() # pylint: disable=no-member
     serializer_class = serializers.OrderSerializer
     permission_classes = [IsAuthenticated]
 
@@ -151,15 +441,24 @@ class OrderList(generics.ListAPIView):
 
     ordering_fields = ['valor_total', 'created_at', 'updated_at']
     ordering = ['valor_total']
+    pagination_class = KeysetCursorPagination
+
+    def list(self, request, *args, **kwargs):
+        if self.wants_stream(request):
+            return self.streaming_list(request)
+        return self.conditional_response(request, super().list, *args, **kwargs)
 
 
-class OrderDetail(generics.RetrieveUpdateDestroyAPIView):
+class OrderDetail(OrderConditionalMixin, generics.RetrieveUpdateDestroyAPIView):
     """Classe que permite o GET/POST/DELETE de pedidos individualmente."""
 
-    queryset = models.Pedido.objects.all() # pylint: disable=no-member
+    queryset = models.Pedido.objects.with_cart_items() # pylint: disable=no-member
     serializer_class = serializers.OrderSerializer
     permission_classes = []
 
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().retrieve, *args, **kwargs)
+
     def update(self, request, *args, **kwargs):
         """Atualiza o status de um pedido e envia um e-mail informando o usuário."""
 
@@ -205,10 +504,12 @@ class ImageUploadView(APIView):
     """
 
     serializer_class = ProdutoImagemSerializer
+    permission_classes = [IsAdminUser]
 
     def post(self, request):
         """
-        Lida com upload de imagens de produto via POST.
+        Lida com upload de imagens de produto via POST. O arquivo vai para o pipeline
+        de imagens e a resposta (202) aponta para a rota de status da imagem.
         """
         serializer = self.serializer_class(data=request.data)
 
@@ -216,9 +517,17 @@ class ImageUploadView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            imagem = serializer.save()
+            status_url = reverse('status_imagem', args=[imagem.pk])
+            return Response(
+                serializers.ProdutoImagemStatusSerializer(imagem).data,
+                status=status.HTTP_202_ACCEPTED,
+                headers={'Location': request.build_absolute_uri(status_url)},
+            )
 
+        except ValidationError as e:
+            # Arquivo que passou do limite de tamanho ao ser gravado no spool.
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
         except DatabaseError:
             logger.exception("Erro ao salvar imagem no banco de dados.")
             return Response(
@@ -247,6 +556,88 @@ class ImageUploadView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+class ImageBatchUploadView(APIView):
+    """
+    Upload de várias imagens de um produto numa requisição ('imagens' repetido no
+    multipart). As imagens são criadas de uma vez e enviadas em paralelo pelo
+    pipeline de imagens; arquivos inválidos são listados em 'erros'.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        """Aceita os arquivos válidos e responde 202 com o status de cada imagem."""
+        serializer = serializers.ProdutoImagemLoteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        imagens = serializer.save()
+        return Response({
+            'imagens': serializers.ProdutoImagemStatusSerializer(imagens, many=True).data,
+            'erros': serializer.validated_data['erros'],
+        }, status=status.HTTP_202_ACCEPTED)
+
+class DirectUploadView(APIView):
+    """
+    Primeiro passo do upload direto: retorna a URL assinada do bucket para o
+    navegador enviar o arquivo e o ticket usado para finalizar.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        """Valida produto e extensão e reserva o caminho da imagem."""
+        if not supports_direct_upload():
+            return Response(
+                {'detail': 'O storage de imagens configurado não aceita upload direto.'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        serializer = serializers.UploadDiretoSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(issue_upload(
+            serializer.validated_data['produto'], serializer.validated_data['nome']
+        ))
+
+class DirectUploadFinalizeView(APIView):
+    """
+    Segundo passo do upload direto: confere o tamanho do objeto no bucket e cria a
+    imagem do produto em 'processando'. A verificação do conteúdo e as versões
+    reduzidas são feitas em segundo plano.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        """Cria a ProdutoImagem (201) ou retorna a já criada pelo mesmo ticket (200)."""
+        serializer = serializers.FinalizarUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        dados = serializer.validated_data['ticket']
+        try:
+            imagem, created = finalize_upload(dados['produto'], dados['caminho'])
+        except DirectUploadError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            serializers.ProdutoImagemStatusSerializer(imagem).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+class ImageStatusView(generics.RetrieveAPIView):
+    """
+    Status de uma imagem enviada: 'processando' enquanto o upload não termina,
+    depois 'pronta' (com a URL final) ou 'erro'.
+    """
+    queryset = models.ProdutoImagem.objects.all()
+    serializer_class = serializers.ProdutoImagemStatusSerializer
+    # Intervalo sugerido, em segundos, para consultar de novo uma imagem em processamento.
+    retry_after = 2
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        if response.data['status'] == models.ProdutoImagem.Status.PROCESSANDO:
+            response['Retry-After'] = str(self.retry_after)
+        return response
+
 class ImagemProdutoDeleteView(DestroyAPIView):
     """
     View para deletar uma imagem de produto.
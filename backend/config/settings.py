@@ -78,6 +78,9 @@ if DEBUG:
 else:
     EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 
+# API navegável do DRF; por padrão só com DEBUG (API_BROWSABLE=false no .env desliga).
+API_BROWSABLE = env.bool('API_BROWSABLE', default=DEBUG)
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -88,15 +91,21 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
        'rest_framework.permissions.IsAuthenticated',
     ),
-    # Opcional, mas útil para ter certeza que o BrowsableAPIRenderer está sempre lá
+    # JSON com orjson; a API navegável só é servida onde API_BROWSABLE estiver ligado.
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
-    )
+        'app.renderers.ORJSONRenderer',
+    ) + (('rest_framework.renderers.BrowsableAPIRenderer',) if API_BROWSABLE else ()),
+    'DEFAULT_PARSER_CLASSES': (
+        'app.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Brotli/gzip conforme o Accept-Encoding; fica no topo para comprimir a resposta final.
+    'app.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -211,6 +220,69 @@ AWS_LOCATION = 'media' # Cria uma pasta "media" dentro do bucket para organizar
 # URL pública para acessar os arquivos
 MEDIA_URL = f'{AWS_S3_ENDPOINT_URL}/object/public/{AWS_STORAGE_BUCKET_NAME}/{AWS_LOCATION}/'
 
+# Snapshot estático do catálogo (app/snapshots.py). Em desenvolvimento os arquivos vão
+# para uma pasta local; com CATALOG_SNAPSHOT_BACKEND=supabase, para um bucket público.
+CATALOG_SNAPSHOT_BACKEND = env('CATALOG_SNAPSHOT_BACKEND', default='local')
+
+IMAGE_STORAGE_BACKEND = env('IMAGE_STORAGE_BACKEND', default='supabase')
+# Limite, em bytes, de cada arquivo enviado ao storage de imagens; é conferido durante
+# a leitura em blocos, sem carregar o arquivo inteiro.
+IMAGE_UPLOAD_MAX_SIZE = env.int('IMAGE_UPLOAD_MAX_SIZE', default=10 * 1024 * 1024)
+
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    # Bucket das imagens de produtos (originais e versões reduzidas). Com
+    # IMAGE_STORAGE_BACKEND=local os arquivos ficam numa pasta, sem acesso à rede.
+    'product_images': {
+        'BACKEND': 'app.storage.SupabaseStorage',
+        'OPTIONS': {
+            'bucket': SUPABASE_BUCKET_NAME,
+            'cache_control': '31536000',
+            'max_upload_size': IMAGE_UPLOAD_MAX_SIZE,
+        },
+    } if IMAGE_STORAGE_BACKEND == 'supabase' else {
+        'BACKEND': 'app.storage.LocalStorage',
+        'OPTIONS': {
+            'location': BASE_DIR / 'media_local' / SUPABASE_BUCKET_NAME,
+            'base_url': f'/media/{SUPABASE_BUCKET_NAME}/',
+            'max_upload_size': IMAGE_UPLOAD_MAX_SIZE,
+        },
+    },
+    'catalog_snapshots': {
+        'BACKEND': 'app.storage.SupabaseStorage',
+        'OPTIONS': {
+            'bucket': env('CATALOG_SNAPSHOT_BUCKET', default='catalogo'),
+            # Os nomes das páginas mudam com o conteúdo; só o manifesto é sobrescrito.
+            'cache_control': '60',
+        },
+    } if CATALOG_SNAPSHOT_BACKEND == 'supabase' else {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {
+            'location': BASE_DIR / 'catalog_snapshots',
+            'base_url': '/catalogo-estatico/',
+            'allow_overwrite': True,
+        },
+    },
+}
+
+CATALOG_SNAPSHOTS = {
+    'PAGE_SIZE': env.int('CATALOG_SNAPSHOT_PAGE_SIZE', default=100),
+    # Atualiza o snapshot automaticamente, DELAY segundos após cada escrita no catálogo.
+    'AUTO': env.bool('CATALOG_SNAPSHOT_AUTO', default=False),
+    'DELAY': 10,
+}
+
+# Pipeline assíncrono de imagens (app/image_pipeline.py): os uploads ficam no spool local
+# até um dos WORKERS enviá-los ao Supabase. Com EAGER o envio roda logo após o commit,
+# na própria requisição.
+IMAGE_PIPELINE = {
+    # Também limita quantos arquivos de um upload em lote sobem ao mesmo tempo.
+    'WORKERS': env.int('IMAGE_PIPELINE_WORKERS', default=4),
+    'SPOOL_DIR': env('IMAGE_SPOOL_DIR', default=str(BASE_DIR / 'spool' / 'imagens')),
+    'EAGER': env.bool('IMAGE_PIPELINE_EAGER', default=False),
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 